@@ -0,0 +1,154 @@
+# 图片资源管理：每张图片只加载一次并转换为显示格式；缩放后的结果按 (源文件哈希, 目标尺寸)
+# 缓存在磁盘上，下次启动直接读取原始像素；各界面专用的图片在第一次使用时才加载。
+# 内存中缩放后的图片超出上限时淘汰最久未使用的；解码过的原图留在内存中，
+# 窗口缩放比例变化时直接从原图重新缩放，不再读取磁盘
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import pygame
+
+CACHE_VERSION = 2  # 2：改用平滑缩放
+IMAGE_CACHE_BYTES = 256 * 1024 * 1024  # 缩放后图片的内存上限（4K 竖屏下一套界面约 140 MB）
+HEADER = struct.Struct("<4sHHH?")  # 魔数、版本、宽、高、是否有透明通道
+MAGIC = b"TILE"
+
+
+class AssetManager:
+    def __init__(self, image_dir, cache_dir=None, max_bytes=IMAGE_CACHE_BYTES):
+        self.image_dir = image_dir
+        self.cache_dir = cache_dir  # 为 None 时不使用磁盘缓存
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()  # (文件名, 尺寸) -> Surface，按最近使用排序
+        self.bytes = 0
+        self.sources = {}  # 文件名 -> 解码后的原图
+        self.stats = {}  # (文件名, 尺寸) -> 加载统计
+        self.lock = threading.Lock()  # 允许后台线程预加载
+
+    # 获取缩放到 size 的图片（size 为 None 时保持原尺寸），首次调用时才加载
+    def image(self, name, size=None):
+        if size is not None:
+            size = tuple(size)
+        key = (name, size)
+        with self.lock:
+            surface = self.images.get(key)
+            if surface is not None:
+                self.images.move_to_end(key)
+                return surface
+            surface = self._load(name, size)
+            self.images[key] = surface
+            self.bytes += surface_bytes(surface)
+            while self.bytes > self.max_bytes and len(self.images) > 1:
+                _, old = self.images.popitem(last=False)
+                self.bytes -= surface_bytes(old)
+        return surface
+
+    # 预先加载一组图片，例如进入某个界面之前
+    def preload(self, names, size=None):
+        for name in names:
+            self.image(name, size)
+
+    def _load(self, name, size):
+        start = time.perf_counter()
+        source = self.sources.get(name)
+        if source is not None:
+            # 已经解码过的原图：只需按新尺寸缩放
+            surface = _scale(source, size)
+            self._record(name, size, start, surface, "原图")
+            return surface
+
+        path = os.path.join(self.image_dir, name)
+        with open(path, "rb") as file:
+            data = file.read()
+        cache_file = None
+        if self.cache_dir is not None:
+            digest = hashlib.sha1(data).hexdigest()
+            suffix = f"{size[0]}x{size[1]}" if size else "orig"
+            cache_file = os.path.join(self.cache_dir, f"{digest}_{suffix}.bin")
+
+        surface = self._read_cache(cache_file) if cache_file else None
+        if surface is not None:
+            surface = _convert(surface)
+            self._record(name, size, start, surface, "缓存")
+            return surface
+
+        surface = pygame.image.load(path)
+        if surface.get_colorkey() is not None:
+            surface = surface.convert_alpha()  # 透明色转为透明通道，缓存中只保存 RGB/RGBA
+        # 转换为显示格式，之后每次 blit 不再需要逐像素转换；缩放结果保持同样的格式
+        self.sources[name] = source = _convert(surface)
+        surface = _scale(source, size)
+        if cache_file:
+            self._write_cache(cache_file, surface)
+        self._record(name, size, start, surface, "解码")
+        return surface
+
+    def _record(self, name, size, start, surface, source):
+        self.stats[(name, size)] = {
+            "ms": (time.perf_counter() - start) * 1000,
+            "bytes": surface_bytes(surface),
+            "source": source,
+        }
+
+    def _read_cache(self, cache_file):
+        try:
+            with open(cache_file, "rb") as file:
+                magic, version, width, height, alpha = HEADER.unpack(file.read(HEADER.size))
+                pixels = file.read()
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != CACHE_VERSION:
+            return None
+        mode = "RGBA" if alpha else "RGB"
+        if len(pixels) != width * height * len(mode):
+            return None
+        return pygame.image.frombytes(pixels, (width, height), mode)
+
+    def _write_cache(self, cache_file, surface):
+        alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+        mode = "RGBA" if alpha else "RGB"
+        width, height = surface.get_size()
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_file, "wb") as file:
+                file.write(HEADER.pack(MAGIC, CACHE_VERSION, width, height, alpha))
+                file.write(pygame.image.tobytes(surface, mode))
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # 缓存写入失败不影响游戏
+
+    # 每张图片的加载耗时和内存占用
+    def report(self):
+        lines = []
+        total_bytes = 0
+        for (name, size), stat in list(self.stats.items()):  # 后台线程可能还在加载
+            total_bytes += stat["bytes"]
+            lines.append(f"{name:<20} {str(size):<12} {stat['ms']:8.1f} ms "
+                         f"{stat['bytes'] / 1024:10.1f} KB  {stat['source']}")
+        lines.append(f"共加载 {len(self.stats)} 次，{total_bytes / 1024 / 1024:.1f} MB；"
+                     f"内存中 {len(self.images)} 张，{self.bytes / 1024 / 1024:.1f} MB")
+        return "\n".join(lines)
+
+
+# 转换为显示格式
+def _convert(surface):
+    alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+# 缩放到 size（None 表示保持原尺寸）；平滑缩放只支持 24 位和 32 位的表面
+def _scale(surface, size):
+    if size is None or surface.get_size() == size:
+        return surface
+    if surface.get_bitsize() in (24, 32):
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+
+# 表面占用的内存字节数（文字缓存也按它计算上限）
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
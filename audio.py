@@ -0,0 +1,95 @@
+# 音频：长音轨（背景音乐、胜利音乐）通过 pygame.mixer.music 流式播放，不整首解码到内存；
+# 短音效第一次播放时才解码为 Sound 并缓存
+import os
+
+import pygame
+
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512  # 混音缓冲区的采样数，越小消除音效的延迟越低，太小可能出现爆音
+FADE_MS = 500  # 切换音轨时的淡入淡出时长
+MUSIC_END = pygame.USEREVENT + 1  # 音轨播放结束（包括淡出结束）时发出的事件
+
+
+class Audio:
+    def __init__(self, music_dir):
+        self.music_dir = music_dir
+        self.sounds = {}  # 文件名 -> 已解码的短音效
+        self.missing = set()  # 加载失败的音轨，不再重复尝试
+        self.current = None  # 正在播放的音轨
+        self.pending = None  # 当前音轨淡出后要播放的 (音轨, 循环次数, 淡入时长)
+        self.ready = False  # 混音器初始化之前，所有播放请求都会被忽略
+
+    # 打开音频设备，可以在后台线程中调用，避免拖慢启动
+    def init(self, buffer=MIXER_BUFFER):
+        try:
+            pygame.mixer.init(MIXER_FREQUENCY, -16, 2, buffer)
+        except pygame.error as e:
+            print(f"无法初始化音频设备: {e}")
+            return
+        pygame.mixer.music.set_endevent(MUSIC_END)
+        self.ready = True
+
+    # 预先解码一组短音效
+    def preload(self, names):
+        for name in names:
+            self._sound(name)
+
+    # 切换到另一条音轨：正在播放时先淡出，淡出结束后再淡入新音轨
+    def play_music(self, name, loops=-1, fade_ms=FADE_MS):
+        if not self.ready:
+            return
+        if pygame.mixer.music.get_busy():
+            if name == self.current and self.pending is None:
+                return
+            self.pending = (name, loops, fade_ms)
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            self._start(name, loops, fade_ms)
+
+    def stop_music(self, fade_ms=0):
+        self.pending = None
+        self.current = None
+        if not self.ready:
+            return
+        if fade_ms:
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            pygame.mixer.music.stop()
+
+    # 各界面的事件循环把事件转交给这里，用于在淡出结束后开始下一条音轨
+    def handle_event(self, event):
+        if event.type == MUSIC_END and self.pending is not None and not pygame.mixer.music.get_busy():
+            name, loops, fade_ms = self.pending
+            self.pending = None
+            self._start(name, loops, fade_ms)
+
+    def _start(self, name, loops, fade_ms):
+        self.current = None
+        if name in self.missing:
+            return
+        path = os.path.join(self.music_dir, name)
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.play(loops, fade_ms=fade_ms)
+            self.current = name
+        except pygame.error as e:
+            self.missing.add(name)
+            print(f"无法加载音乐 {path}: {e}")
+
+    # 播放短音效，第一次使用时解码
+    def play_sound(self, name):
+        sound = self._sound(name)
+        if sound is not None:
+            sound.play()
+
+    def _sound(self, name):
+        if not self.ready:
+            return None
+        if name not in self.sounds:
+            path = os.path.join(self.music_dir, name)
+            try:
+                self.sounds[name] = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError) as e:
+                self.sounds[name] = None  # 不再重复尝试加载
+                print(f"无法加载音效 {path}: {e}")
+        return self.sounds[name]
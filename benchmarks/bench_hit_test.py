@@ -0,0 +1,69 @@
+# 点击命中测试的微基准：对比逐格扫描（原 get_tile_at_pos 的实现）与基于高度图的常数时间查找
+# 用法：python benchmarks/bench_hit_test.py
+import os
+import random
+import sys
+import timeit
+
+import pygame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import EMPTY, LAYER_OFFSET, Game  # noqa: E402
+
+TILE_SIZE = 100
+
+# (层数, 行数, 列数)
+BOARD_SIZES = [
+    (2, 7, 7),
+    (5, 7, 7),
+    (8, 15, 15),
+    (12, 30, 30),
+]
+
+
+# 旧实现：从上到下扫描每一层的每个格子，并为每个非空图案创建 Rect
+def scan_tile_at(game, x, y):
+    layers = game.layers
+    for layer in reversed(range(layers)):
+        for row in range(game.rows):
+            for col in range(game.cols):
+                if game.boards[layer][row][col] != EMPTY:
+                    tile_x = col * TILE_SIZE + (layers - layer - 1) * LAYER_OFFSET
+                    tile_y = row * TILE_SIZE + (layers - layer - 1) * LAYER_OFFSET
+                    rect = pygame.Rect(tile_x, tile_y, TILE_SIZE, TILE_SIZE)
+                    if rect.collidepoint(x, y):
+                        return layer, row, col
+    return None
+
+
+# 随机移除一半图案，得到高低不平的棋盘
+def make_game(layers, rows, cols):
+    game = Game(layers, rows, cols, seed=0)
+    rng = random.Random(0)
+    for _ in range(layers * rows * cols // 2):
+        game.remove_tile(*rng.choice(game.available_tiles()))
+    return game
+
+
+def bench(func, game, points, repeat=3):
+    number = max(1, 2000 // len(points))
+    best = min(timeit.repeat(lambda: [func(game, x, y) for x, y in points], number=number, repeat=repeat))
+    return best / (number * len(points)) * 1e6  # 每次点击的微秒数
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'棋盘':>12} {'逐格扫描(us)':>14} {'高度图(us)':>12} {'加速比':>8}")
+    for layers, rows, cols in BOARD_SIZES:
+        game = make_game(layers, rows, cols)
+        points = [(rng.randrange(cols * TILE_SIZE), rng.randrange(rows * TILE_SIZE)) for _ in range(200)]
+        for x, y in points:
+            assert scan_tile_at(game, x, y) == game.tile_at(x, y, TILE_SIZE)
+        scan = bench(scan_tile_at, game, points[:20] if layers * rows * cols > 2000 else points)
+        fast = bench(lambda g, x, y: g.tile_at(x, y, TILE_SIZE), game, points)
+        print(f"{layers:>4}x{rows:>3}x{cols:<3} {scan:>14.2f} {fast:>12.2f} {scan / fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# 按钮输入延迟测试：在无窗口环境下向主菜单发送点击事件，测量从松开鼠标到按钮动作执行的耗时和帧数，
+# 并检查按住鼠标不会重复触发、鼠标在同一按钮内移动不会重绘
+# 用法：python benchmarks/bench_input_latency.py
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import game  # noqa: E402
+from scenes import SceneManager  # noqa: E402
+
+
+def post(event_type, pos, **attrs):
+    pygame.event.post(pygame.event.Event(event_type, pos=pos, **attrs))
+
+
+# 进入新的主菜单并完成第一次绘制（静态界面没有事件时会一直等待，先移动一下鼠标）
+def enter_menu(manager):
+    menu = game.MenuScene()
+    manager.switch(menu)
+    post(pygame.MOUSEMOTION, (0, 0), rel=(0, 0), buttons=(0, 0, 0))
+    manager.step()
+    return menu
+
+
+# 在主菜单上点击第一个难度按钮，返回 (松开到动作执行的毫秒数, 动作执行时所在的帧, 进入游戏场景的帧)
+def click_latency(manager):
+    menu = enter_menu(manager)
+    clicked = []
+    button = menu.widgets.widgets[0]
+    action = button.action
+    button.action = lambda: (clicked.append(time.perf_counter()), action())
+
+    pos = button.rect.center
+    post(pygame.MOUSEBUTTONDOWN, pos, button=1)
+    post(pygame.MOUSEBUTTONUP, pos, button=1)
+    released = time.perf_counter()
+    action_frame = None
+    frame = 0
+    while not isinstance(manager.scene, game.GameScene):
+        frame += 1
+        manager.step()
+        if clicked and action_frame is None:
+            action_frame = frame
+    return (clicked[0] - released) * 1000, action_frame, frame
+
+
+# 按住鼠标拖动 frames 帧再松开，返回动作执行的次数
+def held_clicks(manager, frames=30):
+    menu = enter_menu(manager)
+    count = []
+    button = menu.widgets.widgets[0]
+    button.action = lambda: count.append(1)
+    pos = button.rect.center
+    post(pygame.MOUSEBUTTONDOWN, pos, button=1)
+    for _ in range(frames):
+        post(pygame.MOUSEMOTION, pos, rel=(0, 0), buttons=(1, 0, 0))
+        manager.step()
+    post(pygame.MOUSEBUTTONUP, pos, button=1)
+    manager.step()
+    return len(count)
+
+
+# 鼠标移入按钮后在按钮内移动 moves 次，返回屏幕更新的次数
+def hover_updates(manager, moves=100):
+    menu = enter_menu(manager)
+    updates = []
+    display_update = pygame.display.update
+    pygame.display.update = lambda *args: (updates.append(args), display_update(*args))
+    try:
+        x, y = menu.widgets.widgets[0].rect.center
+        for i in range(moves):
+            post(pygame.MOUSEMOTION, (x + i % 20 - 10, y), rel=(1, 0), buttons=(0, 0, 0))
+            manager.step()
+    finally:
+        pygame.display.update = display_update
+    return len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量按钮的输入延迟")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    game.init(telemetry=False)
+    game.SAVE_PATH = os.path.join(tempfile.mkdtemp(), "current.sav")  # 不覆盖真正的存档
+    manager = SceneManager(game.scheduler, game.audio.handle_event)
+    frame_ms = 1000 / game.FPS
+
+    results = [click_latency(manager) for _ in range(args.runs)]
+    latencies = [ms for ms, _, _ in results]
+    action_frames = {frame for _, frame, _ in results}
+    scene_frames = {frame for _, _, frame in results}
+    print(f"点击到动作执行: 中位数 {statistics.median(latencies):.3f} ms，最大 {max(latencies):.3f} ms "
+          f"（一帧为 {frame_ms:.1f} ms）")
+    print(f"动作在第 {sorted(action_frames)} 帧执行，第 {sorted(scene_frames)} 帧进入游戏场景")
+
+    held = held_clicks(manager)
+    print(f"按住 30 帧后松开，动作执行 {held} 次")
+    updates = hover_updates(manager)
+    print(f"在按钮内移动 100 次，屏幕更新 {updates} 次")
+
+    manager.quit()
+    manager.step()
+    if max(latencies) > frame_ms or action_frames != {1} or held != 1 or updates > 1:
+        print("失败")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# 通用布局的微基准：构建空间索引和遮挡关系的耗时，以及移除图案后更新可点击集合的耗时
+# （增量更新 vs 每次重新扫描所有图案）和点击命中测试的耗时
+# 用法：python benchmarks/bench_layout.py
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import SUBDIV, LayoutGame, offset_layout  # noqa: E402
+
+TILE_SIZE = 100
+
+# (层数, 行数, 列数)
+LAYOUT_SIZES = [
+    (4, 7, 7),
+    (10, 8, 8),
+    (12, 9, 9),
+    (16, 12, 12),
+]
+
+
+# 重新扫描：对每个剩余图案检查上方是否还有与它重叠的图案
+def rescan_free(game):
+    layout = game.layout
+    present = game.boards != -1
+    free = set()
+    for tile in present.nonzero()[0].tolist():
+        if not any(present[other] and layout.layer[other] > layout.layer[tile]
+                   for other in layout.overlapping(layout.x[tile], layout.y[tile])):
+            free.add(tile)
+    return free
+
+
+# 按随机顺序取走所有可点击的图案，返回每次移除的平均微秒数
+def play_out(layout, rescan):
+    game = LayoutGame(layout, seed=0)
+    rng = random.Random(0)
+    removed = 0
+    start = time.perf_counter()
+    while game.free:
+        game.remove_tile(rng.choice(sorted(game.free)))
+        if rescan:
+            assert rescan_free(game) == game.free
+        removed += 1
+    return (time.perf_counter() - start) / removed * 1e6
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'布局':>12} {'图案数':>6} {'构建(ms)':>10} {'增量(us)':>10} {'重新扫描(us)':>14} {'命中测试(us)':>14}")
+    for layers, rows, cols in LAYOUT_SIZES:
+        start = time.perf_counter()
+        layout = offset_layout(layers, rows, cols)
+        build = (time.perf_counter() - start) * 1000
+        incremental = play_out(layout, False)
+        rescan = play_out(layout, True)
+
+        game = LayoutGame(layout, seed=0)
+        points = [(rng.uniform(0, layout.width * TILE_SIZE / SUBDIV), rng.uniform(0, layout.height * TILE_SIZE / SUBDIV))
+                  for _ in range(200)]
+        hit = min(timeit.repeat(lambda: [game.tile_at(x, y, TILE_SIZE) for x, y in points], number=10, repeat=3))
+        hit = hit / (10 * len(points)) * 1e6
+        print(f"{layers:>4}x{rows:>3}x{cols:<3} {len(layout):>6} {build:>10.1f} {incremental:>10.2f} "
+              f"{rescan:>14.2f} {hit:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# 游戏服务器的压力测试：在子进程中启动 server.py，用若干连接模拟大量同时在线的玩家
+# （每个玩家平均每 think 秒点击一次，随机选择可点的图案，一局结束后立即开始下一局），
+# 统计点击往返延迟的分布，以及服务器进程的 CPU 占用，换算出单核能承载的会话数
+# 用法：python benchmarks/load_server.py --sessions 2000 --duration 30
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from core import REVIVE, Game  # noqa: E402
+
+
+class Connection:
+    # 一个连接上并发多个请求，按 "id" 把回复交给对应的请求
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = {}  # 请求 id -> Future
+        self.timeouts = 0  # 收到的超时通知数
+        self.task = asyncio.get_running_loop().create_task(self.read())
+
+    async def read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if "event" in message:
+                self.timeouts += message["event"] == "timeout"
+                continue
+            self.waiting.pop(message["id"]).set_result(message)
+
+    async def request(self, **message):
+        message["id"] = request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        reply = await future
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+# 一个玩家：在 deadline 之前不停地开新局、点击；measure_from 之后的点击延迟记入 latencies（毫秒）
+async def player(conn, rng, difficulty, think, measure_from, deadline, latencies, counters):
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(rng.uniform(0, think))  # 错开开局时间
+    while loop.time() < deadline:
+        reply = await conn.request(op="new", difficulty=difficulty)
+        session = reply["session"]
+        # 客户端自己保存一份游戏板，用来选择可以点击的图案
+        shape = (reply["layers"], reply["rows"], reply["cols"])
+        mirror = Game(*shape, seed=0, boards=np.array(reply["board"], dtype=np.int8).reshape(shape))
+        mirror.rng = None
+        counters["games"] += 1
+        state = "playing"
+        while state == "playing" and loop.time() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / think))
+            tiles = mirror.available_tiles()
+            if not tiles:
+                break
+            tile = rng.choice(tiles)
+            start = time.perf_counter()
+            reply = await conn.request(op="click", session=session, tile=tile)
+            if loop.time() >= measure_from:
+                latencies.append((time.perf_counter() - start) * 1000)
+            if reply["picked"]:
+                mirror.remove_tile(*tile)
+            state = reply["state"]
+            if state == REVIVE:
+                state = (await conn.request(op="revive", session=session, accept=rng.random() < 0.5))["state"]
+        await conn.request(op="close", session=session)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args):
+    port = args.port or free_port()
+    server = None
+    if not args.port:
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port)],
+                                  stdout=subprocess.PIPE, text=True)
+        server.stdout.readline()  # 等待服务器启动
+    try:
+        conns = []
+        for _ in range(args.connections):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 20)
+            conns.append(Connection(reader, writer))
+        control = conns[0]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        measure_from = start + args.warmup
+        deadline = measure_from + args.duration
+        latencies = []
+        counters = {"games": 0}
+        rng = random.Random(args.seed)
+        players = [player(conns[i % len(conns)], random.Random(rng.getrandbits(32)), args.difficulty, args.think,
+                          measure_from, deadline, latencies, counters)
+                   for i in range(args.sessions)]
+        tasks = asyncio.gather(*players)
+
+        await asyncio.sleep(args.warmup)
+        before = await control.request(op="stats")
+        await asyncio.sleep(args.duration)
+        after = await control.request(op="stats")
+        await tasks
+
+        timeouts = sum(conn.timeouts for conn in conns)
+        for conn in conns:
+            await conn.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    wall = after["uptime"] - before["uptime"]
+    cpu = after["cpu"] - before["cpu"]
+    moves = after["moves"] - before["moves"]
+    utilization = cpu / wall
+    latencies.sort()
+    print(f"会话 {args.sessions}（{args.connections} 个连接），难度 {args.difficulty}，"
+          f"每个玩家平均 {args.think:.1f} 秒点击一次，测量 {wall:.1f} 秒")
+    print(f"共 {counters['games']} 局，{moves} 次点击（{moves / wall:.0f} 次/秒），服务器推送超时 {timeouts} 次")
+    print(f"服务器 CPU 占用 {utilization:.1%}，单核约可承载 {args.sessions / utilization:.0f} 个会话"
+          if utilization else "服务器 CPU 占用 0%")
+    if latencies:
+        print(f"点击延迟: p50 {statistics.median(latencies):.2f} ms，"
+              f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms，最大 {latencies[-1]:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="游戏服务器压力测试")
+    parser.add_argument("--sessions", type=int, default=2000, help="同时在线的玩家数")
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--think", type=float, default=1.0, help="每个玩家两次点击之间的平均秒数")
+    parser.add_argument("--difficulty", default="hell")
+    parser.add_argument("--warmup", type=float, default=3.0, help="开始统计之前的秒数")
+    parser.add_argument("--duration", type=float, default=20.0, help="统计的秒数")
+    parser.add_argument("--port", type=int, help="连接已经在运行的服务器；不指定时自动启动一个")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# 基准测试套件：在无窗口、无声卡的环境下（SDL dummy 驱动）测量游戏热点路径的耗时——
+# 牌局生成、点击命中测试、遮挡判断、槽的插入与消除、游戏板和槽的绘制、补间动画的取值，
+# 各难度和超大棋盘下完整的一帧（没有动画和每次点击都播放槽的动画），以及信息亭竖屏分辨率下调整窗口大小和完整一帧的耗时。
+# 结果写成 JSON，并与保存的基线比较，比基线慢超过阈值的项目标记为退化（此时退出码为 1）。
+# 基线与机器有关，换机器后先用 --save-baseline 重新生成
+# 用法：python benchmarks/run_benchmarks.py                   运行并与 benchmarks/baseline.json 比较
+#       python benchmarks/run_benchmarks.py --save-baseline   运行并把结果保存为新的基线
+#       python benchmarks/run_benchmarks.py --filter frame    只运行名字包含 frame 的项目
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+import game  # noqa: E402
+from core import DIFFICULTIES, REVIVE, Game, Slot, generate_boards  # noqa: E402
+from generator import BoardPool, generate_solvable_boards  # noqa: E402
+from renderer import BoardRenderer  # noqa: E402
+import savegame  # noqa: E402
+from scenes import SceneManager  # noqa: E402
+from tween import Tweens  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+THRESHOLD = 0.25  # 比基线慢 25% 以上视为退化
+
+# 微基准的棋盘：四个难度和两个超大棋盘 (名字, 层数, 行数, 列数)
+BOARD_SIZES = [(difficulty, layers, 7, 7) for difficulty, layers in DIFFICULTIES.items()] + [
+    ("8x15x15", 8, 15, 15),
+    ("12x30x30", 12, 30, 30),
+]
+# 完整帧的棋盘：四个难度和两个层数超大的棋盘（行列数受窗口大小限制）
+OVERSIZED_LAYERS = {"10x7x7": 10, "20x7x7": 20}
+# 信息亭的竖屏分辨率
+KIOSK_SIZES = {"1080p": (1080, 1920), "4k": (2160, 3840)}
+CLICK_EVERY = 3  # 完整帧测试中每隔几帧点击一次
+RECHECKS = 2  # 退化的项目最多重测几次
+TWEEN_COUNTS = [8, 64]  # 同时进行的补间数
+
+
+# 每次调用 func 包含 calls 次操作，返回每次操作的微秒数（取多轮中最快的一轮）
+def measure(func, calls=1, repeat=5):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / (number * calls) * 1e6
+
+
+# 随机移除一半图案，得到高低不平的棋盘
+def half_cleared_game(layers, rows, cols):
+    board = Game(layers, rows, cols, seed=0)
+    rng = random.Random(0)
+    for _ in range(layers * rows * cols // 2):
+        board.remove_tile(*rng.choice(board.available_tiles()))
+    return board
+
+
+# 以下每个函数返回一组 (名字, 测量函数)，测量函数返回每次操作的微秒数
+def generate_cases(repeat):
+    for name, layers, rows, cols in BOARD_SIZES:
+        rng = random.Random(0)
+        yield (f"generate_boards/{name}",
+               lambda layers=layers, rows=rows, cols=cols, rng=rng: measure(
+                   lambda: generate_boards(layers, rows, cols, rng=rng), repeat=repeat))
+        yield (f"generate_solvable_boards/{name}",
+               lambda layers=layers, rows=rows, cols=cols, rng=rng: measure(
+                   lambda: generate_solvable_boards(layers, rows, cols, rng=rng), repeat=repeat))
+
+
+def hit_test_cases(repeat):
+    rng = random.Random(1)
+    for name, layers, rows, cols in BOARD_SIZES:
+        board = half_cleared_game(layers, rows, cols)
+        points = [(rng.randrange(cols * game.TILE_SIZE), rng.randrange(rows * game.TILE_SIZE))
+                  for _ in range(200)]
+        yield (f"get_tile_at_pos/{name}", lambda board=board, points=points: measure(
+            lambda: [game.get_tile_at_pos(x, y, board) for x, y in points], len(points), repeat))
+
+
+def covered_cases(repeat):
+    for name, layers, rows, cols in BOARD_SIZES:
+        board = half_cleared_game(layers, rows, cols)
+        positions = np.argwhere(board.boards != -1).tolist()
+        yield (f"is_covered/{name}", lambda board=board, positions=positions: measure(
+            lambda: [board.is_covered(*pos) for pos in positions], len(positions), repeat))
+
+
+# 槽的插入与凑齐三个的检测（原 check_slot），槽满时清空
+def slot_cases(repeat):
+    rng = random.Random(2)
+    tiles = [rng.randrange(game.pattern_count) for _ in range(1000)]
+    slot = Slot()
+
+    def fill():
+        for tile in tiles:
+            slot.add(tile)
+            if slot.is_full:
+                slot.clear()
+
+    yield "slot_add", lambda: measure(fill, len(tiles), repeat)
+
+
+def draw_cases(repeat):
+    for name, layers, rows, cols in BOARD_SIZES:
+        board = Game(layers, rows, cols, seed=0)
+        yield f"draw_board/{name}", lambda board=board: measure(lambda: game.draw_board(board), repeat=repeat)
+    board = Game(DIFFICULTIES["easy"], seed=0)
+    for tile in [0, 0, 1, 1, 2, 3]:
+        board.slot.add(tile)
+    yield "draw_slot", lambda: measure(lambda: game.draw_slot(board), repeat=repeat)
+
+
+# 一帧中所有精灵的补间取值：count 个精灵同时在移动，每个精灵还排着一段尚未开始的补间
+def tween_cases(repeat):
+    for count in TWEEN_COUNTS:
+        tweens = Tweens()
+        for sprite in range(count):
+            tweens.place(sprite, 0, sprite, 0)
+            tweens.move(sprite, 0, 1e9, sprite, 700)
+            tweens.move(sprite, 1e9, 100, 0, 0, 0.0, remove=True)
+        yield f"tween_sample/{count}", lambda tweens=tweens: measure(lambda: tweens.sample(5e8), repeat=repeat)
+
+
+# 撤销后立即重做一步（两次操作）
+def undo_cases(repeat):
+    for name, layers, rows, cols in BOARD_SIZES:
+        board = half_cleared_game(layers, rows, cols)
+        board.pick(*board.available_tiles()[0])
+
+        def undo_redo(board=board):
+            board.undo()
+            board.redo()
+
+        yield f"undo_redo/{name}", lambda undo_redo=undo_redo: measure(undo_redo, 2, repeat)
+
+
+class NullWriter:
+    # 只测量主线程上编码检查点的耗时，不写文件
+    def write(self, path, data, truncate=False):
+        pass
+
+
+# 检查点：记录 5 次取走图案后追加一帧；续玩：读取一局随机对局到结束的存档并重放
+def save_cases(repeat, directory):
+    for name, layers, rows, cols in BOARD_SIZES:
+        save = savegame.SaveGame(None, NullWriter(), 0, "easy", layers, game.pattern_count, False)
+
+        def checkpoint(save=save, position=(layers - 1, rows - 1, cols - 1)):
+            for _ in range(5):
+                save.add(savegame.PICK, position)
+            save.checkpoint(1000)
+
+        yield f"checkpoint/{name}", lambda checkpoint=checkpoint: measure(checkpoint, repeat=repeat)
+
+        writer = savegame.CheckpointWriter()
+        writer.start()
+        path = os.path.join(directory, f"{name}.sav")
+        save = savegame.SaveGame(path, writer, 0, "easy", layers, game.pattern_count, False)
+        save.start()
+        board = save.new_game()
+        rng = random.Random(0)
+        while not board.finished:
+            if board.state == REVIVE:
+                board.revive(True)
+                save.add(savegame.REVIVE_ACCEPT)
+                continue
+            position = rng.choice(board.available_tiles())
+            board.pick(*position)
+            save.add(savegame.PICK, position)
+            if board.moves % 10 == 0:
+                save.checkpoint(board.moves * 100)
+        save.checkpoint(board.moves * 100)
+        writer.flush()
+        yield f"resume/{name}", lambda path=path, writer=writer: measure(
+            lambda: savegame.load(path, writer), repeat=repeat)
+
+
+# 连续运行 frames 帧游戏场景（每隔 CLICK_EVERY 帧点击一个可点的图案），返回每帧耗时的中位数（微秒）。
+# 一局进入复活或结算时直接开始下一局，进入场景的第一帧不计时。animations 为 True 时播放槽的动画：
+# 不限帧率时点击比真人密集得多，每一帧都有二十个左右的精灵在飞行或消失，是动画的最坏情况
+def run_frames(difficulty, frames, dirty, animations=False):
+    game.DIRTY_RECTS = dirty
+    game.ANIMATIONS = animations
+    manager = SceneManager(game.scheduler)
+    rng = random.Random(0)
+    times = []
+    scene = None
+    while len(times) < frames:
+        if scene is None or manager.pending or manager.scene is not scene:
+            manager.pending.clear()  # 丢弃复活或结算界面的请求
+            manager.quit()
+            manager.step()
+            scene = game.GameScene(difficulty)
+            manager.switch(scene)
+            manager.step()
+            continue
+        if len(times) % CLICK_EVERY == 0:
+            layer, row, col = rng.choice(scene.game.available_tiles())
+            pos = game.get_tile_rect(scene.game, layer, row, col).center
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        start = time.perf_counter()
+        manager.step()
+        times.append((time.perf_counter() - start) * 1e6)
+    manager.pending.clear()
+    manager.quit()
+    manager.step()
+    game.DIRTY_RECTS = True
+    game.ANIMATIONS = True
+    return statistics.median(times)
+
+
+def frame_cases(frames):
+    for difficulty in game.DIFFICULTIES:
+        yield f"frame_dirty/{difficulty}", lambda difficulty=difficulty: run_frames(difficulty, frames, True)
+        yield f"frame_full/{difficulty}", lambda difficulty=difficulty: run_frames(difficulty, frames, False)
+        yield f"frame_animated/{difficulty}", lambda difficulty=difficulty: run_frames(
+            difficulty, frames, True, animations=True)
+
+
+# 改变窗口大小（dummy 驱动下没有窗口事件，直接通知游戏）
+def set_window(size):
+    pygame.display.set_mode(size, pygame.RESIZABLE)
+    game.window_changed()
+
+
+# 在 size 大小的窗口中运行 run_frames，结束后恢复默认窗口
+def run_scaled_frames(size, difficulty, frames, dirty):
+    set_window(size)
+    try:
+        return run_frames(difficulty, frames, dirty)
+    finally:
+        set_window((game.WIDTH, game.HEIGHT))
+
+
+# 窗口在默认大小和信息亭分辨率之间来回调整（两次操作），每次调整后按新比例重新合成地狱难度的游戏板。
+# 缩放后的图片已经在缓存中，测量的是调整大小时必须重建的部分；以及该分辨率下完整的一帧
+def resize_cases(repeat, frames):
+    board = Game(DIFFICULTIES["hell"], seed=0)
+
+    def resize(size):
+        set_window(size)
+        BoardRenderer(game.screen, game.load_patterns(), game.TILE_SIZE, game.LAYER_OFFSET,
+                      game.BG_COLOR).rebuild(board)
+
+    for name, size in KIOSK_SIZES.items():
+        yield f"resize/{name}", lambda size=size: measure(
+            lambda: (resize(size), resize((game.WIDTH, game.HEIGHT))), 2, repeat)
+        yield f"frame_dirty_{name}/hell", lambda size=size: run_scaled_frames(size, "hell", frames, True)
+        yield f"frame_full_{name}/hell", lambda size=size: run_scaled_frames(size, "hell", frames, False)
+
+
+# 打开无窗口的显示，等后台资源加载完，换成不在后台生成、种子固定的牌局池（包括超大棋盘），
+# 存档和统计数据写到临时目录
+def setup(directory):
+    game.FPS = game.ANIMATION_FPS = 0  # 不限帧率
+    game.SAVE_PATH = os.path.join(directory, "current.sav")  # 不覆盖真正的存档
+    game.TELEMETRY_DIR = os.path.join(directory, "telemetry")
+    game.init()
+    while not any(stage == "后台资源" for stage, _ in game.startup_times):
+        time.sleep(0.01)
+    game.board_pool.stop()
+    game.DIFFICULTIES = dict(DIFFICULTIES, **OVERSIZED_LAYERS)
+    game.board_pool = BoardPool(game.DIFFICULTIES, solvable=False, num_patterns=game.pattern_count)
+    game.board_pool.seeds = random.Random(0)  # 每次运行使用相同的牌局
+    game.load_patterns()
+    game.screen.fill(game.BG_COLOR)
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(map(str, pygame.get_sdl_version())),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+# 比基线慢超过 threshold 的项目
+def regressed(results, baseline, threshold):
+    return [name for name, value in results.items() if name in baseline and value > baseline[name] * (1 + threshold)]
+
+
+# 打印与基线的对比表
+def print_comparison(results, baseline, regressions):
+    print(f"{'项目':<36} {'基线(us)':>12} {'本次(us)':>12} {'变化':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<36} {'-':>12} {value:>12.2f} {'新增':>8}")
+        else:
+            flag = "  退化" if name in regressions else ""
+            print(f"{name:<36} {base:>12.2f} {value:>12.2f} {value / base - 1:>+8.0%}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="运行基准测试套件并与基线比较")
+    parser.add_argument("--output", default=RESULTS_PATH, help="结果 JSON 的保存路径")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线 JSON 的路径")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="比基线慢多少（比例）视为退化")
+    parser.add_argument("--filter", default="", help="只运行名字包含该字符串的项目")
+    parser.add_argument("--quick", action="store_true", help="减少重复次数，快速得到粗略结果")
+    args = parser.parse_args()
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    repeat = 2 if args.quick else 5
+    frames = 60 if args.quick else 300
+    directory = tempfile.TemporaryDirectory()
+    setup(directory.name)
+    cases = {}
+    for suite in (generate_cases(repeat), hit_test_cases(repeat), covered_cases(repeat), slot_cases(repeat),
+                  undo_cases(repeat), save_cases(repeat, directory.name), draw_cases(repeat), tween_cases(repeat),
+                  frame_cases(frames), resize_cases(repeat, frames)):
+        cases.update((name, run) for name, run in suite if args.filter in name)
+    results = {name: run() for name, run in cases.items()}
+
+    regressions = []
+    if baseline is not None:
+        # 系统偶尔的抖动也会超过阈值：退化的项目再测几次，取最好的一次
+        for _ in range(RECHECKS):
+            for name in regressed(results, baseline, args.threshold):
+                results[name] = min(results[name], cases[name]())
+        regressions = regressed(results, baseline, args.threshold)
+
+    report = {"environment": environment(), "threshold": args.threshold, "results": results,
+              "regressions": regressions}
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"结果已保存到 {path}")
+
+    if baseline is None:
+        if not args.save_baseline:
+            print(f"没有找到基线 {args.baseline}，先用 --save-baseline 生成")
+        return
+    print_comparison(results, baseline, regressions)
+    if regressions:
+        print(f"失败：{len(regressions)} 个项目比基线慢 {args.threshold:.0%} 以上: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# 场景切换的浸泡测试：在无窗口、无声卡的环境下连续玩几千局（主菜单 -> 游戏 -> 复活/广告 -> 结算 -> 主菜单），
+# 检查场景栈深度、存活的 Game 对象数和 Python 分配的内存是否保持平稳
+# 用法：python benchmarks/soak_scenes.py --games 2000
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import game  # noqa: E402
+from core import DIFFICULTIES, Game  # noqa: E402
+from leaderboard import Leaderboard  # noqa: E402
+from scenes import SceneManager  # noqa: E402
+
+MAX_GROWTH_KB = 1024  # 预热之后允许的内存增长
+
+
+# 当前栈顶场景需要的输入：主菜单选难度，游戏中随机点击可点的图案，复活界面随机选择，广告结束后按键
+def drive(manager, rng):
+    scene = manager.scene
+    if isinstance(scene, game.MenuScene):
+        scene.start(rng.choice(sorted(DIFFICULTIES)))
+    elif isinstance(scene, game.GameScene) and scene.game is not None and not scene.game.finished:
+        layer, row, col = rng.choice(scene.game.available_tiles())
+        pos = game.get_tile_rect(scene.game, layer, row, col).center
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+    elif isinstance(scene, game.ReviveScene):
+        scene.choose(rng.random() < 0.5)
+    elif isinstance(scene, game.AdScene):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    # 静态场景没有事件时会一直等待，移动一下鼠标把它唤醒
+    pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0), rel=(0, 0), buttons=(0, 0, 0)))
+
+
+def live_games():
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Game))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="连续对局，检查内存和调用栈是否保持平稳")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-every", type=int, default=200)
+    args = parser.parse_args()
+
+    # 不限帧率，跳过广告和结算界面的等待；槽的动画照常播放，但缩短到 1 毫秒
+    game.FPS = game.ANIMATION_FPS = 0
+    game.FLIGHT_MS = game.CLEAR_MS = game.SLIDE_MS = 1
+    game.AD_SECONDS = 0
+    game.RESULT_SECONDS = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        game.TELEMETRY_DIR = os.path.join(tmp, "telemetry")
+        game.init()
+        game.leaderboard = Leaderboard(os.path.join(tmp, "scores.db"))
+        game.SAVE_PATH = os.path.join(tmp, "current.sav")
+        manager = SceneManager(game.scheduler, game.audio.handle_event)
+        manager.switch(game.MenuScene())
+        rng = random.Random(args.seed)
+
+        tracemalloc.start()
+        baseline = None
+        finished = 0
+        max_stack = 0
+        start = time.perf_counter()
+        print(f"{'对局':>6} {'内存(KB)':>10} {'存活 Game':>10} {'最大场景栈':>10} {'局/秒':>8}")
+        while finished < args.games:
+            previous = manager.scene
+            drive(manager, rng)
+            manager.step()
+            max_stack = max(max_stack, len(manager.stack))
+            if isinstance(manager.scene, game.ResultScene) and manager.scene is not previous:
+                finished += 1
+                if finished % args.report_every == 0:
+                    gc.collect()
+                    current = tracemalloc.get_traced_memory()[0] / 1024
+                    if baseline is None:
+                        baseline = current  # 第一次报告之前视为预热
+                    rate = finished / (time.perf_counter() - start)
+                    print(f"{finished:>6} {current:>10.0f} {live_games():>10} {max_stack:>10} {rate:>8.1f}")
+        manager.quit()
+        manager.step()
+        game.leaderboard.close()
+        game.game_stats.close()
+        stats = game.game_stats
+
+    gc.collect()
+    growth = tracemalloc.get_traced_memory()[0] / 1024 - baseline
+    games_alive = live_games()
+    print(f"预热后内存增长 {growth:.0f} KB，结束后存活的 Game 对象 {games_alive} 个，最大场景栈深度 {max_stack}")
+    print(f"统计事件 {stats.emitted} 个，写入 {stats.written} 个，丢弃 {stats.dropped} 个")
+    if growth > MAX_GROWTH_KB or games_alive or max_stack > 2:
+        print("失败：内存或场景栈随对局数增长")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# 游戏规则核心：不依赖 pygame，可在无显示/无音频的环境中运行（批量模拟、CI 回归测试）
+import random
+
+import numpy as np
+
+# 定义常量
+ROWS, COLS = 7, 7  # 游戏区域的行数和列数
+SLOT_CAPACITY = 7  # 槽最多容纳 7 个图案
+NUM_PATTERNS = 5  # 使用的图案种类数
+SCORE_PER_TILE = 10  # 每次点击得分
+TIME_LIMIT = 120  # 倒计时（秒）
+LAYER_OFFSET = 5  # 每往下一层，图案向右下偏移的像素数（制造 3D 效果）
+
+# 难度与层数的对应关系
+DIFFICULTIES = {
+    "easy": 2,
+    "hard": 3,
+    "hell": 4,
+    "purgatory": 5,
+}
+
+# 游戏状态
+PLAYING = "playing"
+REVIVE = "revive"  # 槽已溢出，等待玩家选择是否复活
+WON = "won"
+LOST = "lost"
+TIMEOUT = "timeout"
+
+EMPTY = -1  # 游戏板中空格子的取值
+
+
+# 生成游戏板：int8 数组 [层, 行, 列]，格子中保存图案编号（EMPTY 表示空）
+def generate_boards(layers, rows=ROWS, cols=COLS, num_patterns=NUM_PATTERNS, rng=random):
+    total_tiles = layers * rows * cols
+
+    # 创建所有图案的数量，确保可以被3整除，每种图案出现三次
+    num_tiles = ((total_tiles + 2) // 3) * 3  # 调整为大于等于 total_tiles 的最小3的倍数
+    tile_pool = np.repeat((np.arange(num_tiles // 3) % num_patterns).astype(np.int8), 3)
+    np.random.default_rng(rng.getrandbits(64)).shuffle(tile_pool)
+
+    # 将图案随机放置在游戏板上，多出的图案不使用
+    return tile_pool[:total_tiles].reshape(layers, rows, cols)
+
+
+# 计算每个格子最上层图案所在的层（空格子为 -1）
+def top_layers(boards):
+    layers = boards.shape[0]
+    filled = boards[::-1] != EMPTY
+    top = layers - 1 - filled.argmax(axis=0)
+    top[~filled.any(axis=0)] = -1
+    return top.astype(np.int8)
+
+
+class Slot:
+    # 槽：按图案编号计数的多重集合。相同图案挨在一起（与原版羊了个羊一致），
+    # 插入、凑齐三个的检测和溢出判断都是 O(1)（槽的大小有上限）
+    def __init__(self, capacity=SLOT_CAPACITY, num_patterns=NUM_PATTERNS):
+        self.capacity = capacity
+        self.counts = [0] * num_patterns  # 每种图案在槽中的数量
+        self.groups = []  # 槽中的图案种类，按首次放入的顺序排列
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    # 按显示顺序逐个返回槽中的图案编号
+    def __iter__(self):
+        for tile in self.groups:
+            for _ in range(self.counts[tile]):
+                yield tile
+
+    # 放入一个图案，凑齐三个时立即消除，返回是否发生了消除
+    def add(self, tile):
+        count = self.counts[tile] + 1
+        if count == 3:
+            self.counts[tile] = 0
+            self.groups.remove(tile)
+            self.size -= 2
+            return True
+        if count == 1:
+            self.groups.append(tile)
+        self.counts[tile] = count
+        self.size += 1
+        return False
+
+    # 撤销一次凑齐三个的消除：两个图案放回 groups 中原来的位置 index
+    def unmatch(self, tile, index):
+        self.counts[tile] = 2
+        self.groups.insert(index, tile)
+        self.size += 2
+
+    # 取出一个图案（不触发消除）
+    def remove(self, tile):
+        count = self.counts[tile] - 1
+        if count < 0:
+            raise ValueError(f"槽中没有图案 {tile}")
+        if count == 0:
+            self.groups.remove(tile)
+        self.counts[tile] = count
+        self.size -= 1
+
+    def clear(self):
+        self.counts = [0] * len(self.counts)
+        self.groups = []
+        self.size = 0
+
+    @property
+    def is_full(self):
+        return self.size >= self.capacity
+
+    @property
+    def overflow(self):
+        return self.size > self.capacity
+
+
+class Game:
+    # 一局游戏的完整状态：游戏板、槽、得分与复活标记
+    def __init__(self, layers, rows=ROWS, cols=COLS, num_patterns=NUM_PATTERNS,
+                 slot_capacity=SLOT_CAPACITY, seed=None, time_limit=TIME_LIMIT, boards=None):
+        self.layers = layers
+        self.rows = rows
+        self.cols = cols
+        self.num_patterns = num_patterns
+        self.slot_capacity = slot_capacity
+        self.seed = seed
+        self.rng = random.Random(seed)  # 每局独立的随机数生成器，相同种子得到相同的牌局
+        if boards is None:
+            boards = generate_boards(layers, rows, cols, num_patterns, self.rng)
+        self.boards = np.array(boards, dtype=np.int8)  # 复制一份，预先生成的牌局可能被复用
+        self.top = top_layers(self.boards)  # 每个格子最上层图案的层号
+        self.remaining = int(np.count_nonzero(self.boards != EMPTY))  # 棋盘上剩余的图案数
+        self._init_play(slot_capacity, num_patterns, time_limit)
+
+    # 与游戏板表示无关的状态：槽、得分、计时与复活标记
+    def _init_play(self, slot_capacity, num_patterns, time_limit):
+        self.slot = Slot(slot_capacity, num_patterns)
+        self.score = 0
+        self.moves = 0
+        self.revive_used = False
+        self.time_limit = time_limit
+        self.elapsed = 0.0  # 已用时间（毫秒），由前端按固定步长推进
+        self.state = PLAYING
+        self.last_matched = []  # 最近一次点击消除的图案编号
+        # 每一步的增量 (位置, 图案, 消除前该图案在槽中的位置；没有消除为 -1)，撤销和重做都是 O(1)
+        self.history = []
+        self.redo_stack = []  # 被撤销的位置，新的点击会清空
+
+    # 检查图案是否被遮挡：同一格子上方还有图案即被遮挡
+    def is_covered(self, layer, row, col):
+        return layer < self.top[row, col]
+
+    # 未被遮挡的图案掩码，形状与游戏板相同
+    def uncovered_mask(self):
+        mask = np.zeros(self.boards.shape, dtype=bool)
+        rows, cols = np.nonzero(self.top >= 0)
+        mask[self.top[rows, cols], rows, cols] = True
+        return mask
+
+    # 当前所有可以点击的图案位置，按层、行、列排序
+    def available_tiles(self):
+        return [tuple(pos) for pos in np.argwhere(self.uncovered_mask()).tolist()]
+
+    # 根据像素坐标找到被点中的最上层图案，返回 (层, 行, 列) 或 None
+    # 第 layer 层的图案位于 (col * tile_size + k * layer_offset, row * tile_size + k * layer_offset)，
+    # 其中 k = layers - layer - 1。只需检查坐标附近的少数几个格子，并借助高度图直接算出
+    # 每个格子中能被点中的最高层，耗时与棋盘大小无关
+    def tile_at(self, x, y, tile_size, layer_offset=LAYER_OFFSET):
+        span = (self.layers - 1) * layer_offset  # 最底层相对最上层的偏移
+        best = None
+        for row in range(max((y - span) // tile_size, 0), min(y // tile_size, self.rows - 1) + 1):
+            for col in range(max((x - span) // tile_size, 0), min(x // tile_size, self.cols - 1) + 1):
+                top = int(self.top[row, col])
+                if top < 0:
+                    continue
+                # 偏移量 k * layer_offset 需落在 (lo, hi] 内，图案的矩形才包含该点
+                dx, dy = x - col * tile_size, y - row * tile_size
+                hi = min(dx, dy)
+                lo = max(dx, dy) - tile_size
+                k = self.layers - 1 - top  # 最上层图案对应的 k，k 越小层越高
+                if layer_offset:
+                    if lo >= 0:
+                        k = max(k, lo // layer_offset + 1)
+                    if k >= self.layers or k * layer_offset > hi:
+                        continue
+                elif lo >= 0 or hi < 0:
+                    continue
+                layer = self.layers - 1 - k
+                if best is None or layer > best[0]:
+                    best = (layer, row, col)
+        return best
+
+    # 第 layer 层 (row, col) 处图案左上角的像素坐标，与 tile_at 使用同样的摆放方式
+    def tile_origin(self, layer, row, col, tile_size, layer_offset=LAYER_OFFSET):
+        offset = (self.layers - layer - 1) * layer_offset
+        return col * tile_size + offset, row * tile_size + offset
+
+    # 游戏板上的所有图案，按从下到上的绘制顺序：返回图案编号、左上角的 x 和 y 三个数组
+    def tile_origins(self, tile_size, layer_offset=LAYER_OFFSET):
+        layer, row, col = np.nonzero(self.boards != EMPTY)
+        offset = (self.layers - layer - 1) * layer_offset
+        return self.boards[layer, row, col], col * tile_size + offset, row * tile_size + offset
+
+    # 可能与 (layer, row, col) 处的图案重叠的图案位置（包括它自己），按从下到上的绘制顺序排列。
+    # 层偏移只有几个像素，只需检查相邻几个格子
+    def nearby_tiles(self, layer, row, col, tile_size, layer_offset=LAYER_OFFSET):
+        reach = (self.layers - 1) * layer_offset // tile_size + 1
+        rows = range(max(row - reach, 0), min(row + reach, self.rows - 1) + 1)
+        cols = range(max(col - reach, 0), min(col + reach, self.cols - 1) + 1)
+        return [(tile_layer, tile_row, tile_col) for tile_layer in range(self.layers)
+                for tile_row in rows for tile_col in cols if self.boards[tile_layer, tile_row, tile_col] != EMPTY]
+
+    # 图案是否在游戏板上且没有被遮挡
+    def is_free(self, layer, row, col):
+        return self.top[row, col] == layer
+
+    # 点击指定位置的图案，成功放入槽中返回 True
+    def pick(self, layer, row, col):
+        if self._pick((layer, row, col)):
+            self.redo_stack.clear()
+            return True
+        return False
+
+    def _pick(self, position):
+        if self.state != PLAYING or not self.is_free(*position):
+            return False  # 格子为空或被遮挡
+        tile = int(self.boards[position])
+        slot = self.slot
+        index = slot.groups.index(tile) if slot.counts[tile] == 2 else -1
+        # 将图案添加到槽中，并从游戏板中移除
+        self.remove_tile(*position)
+        self.last_matched = [tile] if slot.add(tile) else []
+        self.score += SCORE_PER_TILE
+        self.moves += 1
+        self.history.append((position, tile, index))
+        self.check_game_over()
+        return True
+
+    # 撤销上一步，返回被放回的图案位置；没有可撤销的步骤时返回 None。
+    # 槽溢出、等待复活时也可以撤销，撤销后回到游戏中，复活机会仍然保留
+    def undo(self):
+        if self.state not in (PLAYING, REVIVE) or not self.history:
+            return None
+        position, tile, index = self.history.pop()
+        self.restore_tile(position, tile)
+        if index >= 0:
+            self.slot.unmatch(tile, index)
+        else:
+            self.slot.remove(tile)
+        self.score -= SCORE_PER_TILE
+        self.moves -= 1
+        self.state = PLAYING
+        self.last_matched = []
+        self.redo_stack.append(position)
+        return position
+
+    # 重做最近撤销的一步，返回再次取走的图案位置；没有可重做的步骤时返回 None
+    def redo(self):
+        if self.state != PLAYING or not self.redo_stack:
+            return None
+        position = self.redo_stack.pop()
+        self._pick(position)
+        return position
+
+    # 把取走的图案放回原处（撤销时按相反的顺序调用，它上方的图案都已取走）
+    def restore_tile(self, position, tile):
+        layer, row, col = position
+        self.boards[layer, row, col] = tile
+        self.remaining += 1
+        self.top[row, col] = layer
+
+    # 移除最上层的图案，同时维护高度图和剩余数量
+    def remove_tile(self, layer, row, col):
+        self.boards[layer, row, col] = EMPTY
+        self.remaining -= 1
+        below = layer - 1
+        while below >= 0 and self.boards[below, row, col] == EMPTY:
+            below -= 1
+        self.top[row, col] = below
+
+    def is_board_empty(self):
+        return self.remaining == 0
+
+    # 检查游戏是否结束，并更新状态
+    def check_game_over(self):
+        if self.is_board_empty():
+            self.state = WON
+        elif self.slot.overflow:
+            # 只有一次复活机会
+            self.state = LOST if self.revive_used else REVIVE
+        return self.state
+
+    # 玩家在复活界面做出选择
+    def revive(self, accept):
+        self.revive_used = True
+        self.state = PLAYING if accept else LOST
+        return accept
+
+    # 推进游戏时间，超时后结束游戏；等待复活（复活界面和广告）期间不计时，单机版和服务器一致
+    def advance(self, ms):
+        if self.state == REVIVE:
+            return
+        self.elapsed += ms
+        if self.seconds_left <= 0:
+            self.expire()
+
+    # 倒计时剩余的整秒数
+    @property
+    def seconds_left(self):
+        return self.time_limit - int(self.elapsed // 1000)
+
+    # 倒计时结束
+    def expire(self):
+        if self.state == PLAYING:
+            self.state = TIMEOUT
+
+    @property
+    def finished(self):
+        return self.state in (WON, LOST, TIMEOUT)
@@ -0,0 +1,49 @@
+# 字体与文字缓存：每种字号只打开一次字体文件，渲染好的文字表面按 (文字, 字号, 颜色) 缓存，
+# 超出内存上限时淘汰最久未使用的条目
+from collections import OrderedDict
+
+import pygame
+
+from assets import surface_bytes
+
+TEXT_CACHE_BYTES = 8 * 1024 * 1024  # 文字缓存的内存上限
+
+
+class TextCache:
+    def __init__(self, font_path, max_bytes=TEXT_CACHE_BYTES):
+        self.font_path = font_path
+        self.max_bytes = max_bytes
+        self.fonts = {}  # 字号 -> Font
+        self.surfaces = OrderedDict()  # (文字, 字号, 颜色) -> Surface，按最近使用排序
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # 获取指定字号的字体，首次使用时才解析字体文件
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.font_path, size)
+            self.fonts[size] = font
+        return font
+
+    # 渲染文字（抗锯齿），相同的文字、字号和颜色直接返回缓存的表面
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        self.bytes += surface_bytes(surface)
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
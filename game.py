@@ -1,615 +1,1163 @@
-import pygame
-import random
-import time
-import os
-
-# 初始化 Pygame
-pygame.init()
-
-# 定义常量
-WIDTH, HEIGHT = 700, 850  # 窗口尺寸
-ROWS, COLS = 7, 7  # 游戏区域的行数和列数
-TILE_SIZE = WIDTH // COLS  # 根据列数计算图块大小
-FPS = 30
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BG_COLOR = (245, 222, 179)  # 背景色：小麦色
-SLOT_BG_COLOR = (210, 180, 140)  # 槽区背景色：巧克力色
-SLOT_BORDER_COLOR = (139, 69, 19)  # 槽区边框颜色：褐色
-
-# 获取当前文件所在目录
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# 创建窗口
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("星穹铁道，启动！")
-
-# 定义资源路径
-image_path = os.path.join(BASE_DIR, "images")
-font_path = os.path.join(BASE_DIR, "fonts", "方正大雅宋简体.TTF")  # 请确保字体文件存在于指定路径
-music_path = os.path.join(BASE_DIR, "music")
-
-# 加载图案图片 (0.png 到 4.png)
-patterns = []
-for i in range(5):
-    image_file = os.path.join(image_path, f"{i}.png")
-    try:
-        image = pygame.image.load(image_file)
-        image = pygame.transform.scale(image, (TILE_SIZE, TILE_SIZE))
-        patterns.append(image)
-    except pygame.error as e:
-        print(f"无法加载图片 {image_file}: {e}")
-        pygame.quit()
-        quit()
-
-# 加载支持中文的字体
-try:
-    font = pygame.font.Font(font_path, 36)  # 设置字体大小为36
-except FileNotFoundError:
-    print(f"无法找到字体文件：{font_path}")
-    pygame.quit()
-    quit()
-
-# 加载广告图片
-ad_image_path = os.path.join(image_path, "ad.png")
-try:
-    ad_image = pygame.image.load(ad_image_path)
-    ad_image = pygame.transform.scale(ad_image, (WIDTH, HEIGHT))
-except pygame.error as e:
-    print(f"无法加载广告图片 {ad_image_path}: {e}")
-    pygame.quit()
-    quit()
-
-
-# 加载背景图片
-def load_image(path, width=WIDTH, height=HEIGHT):
-    try:
-        image = pygame.image.load(path)
-        image = pygame.transform.scale(image, (width, height))
-        return image
-    except pygame.error as e:
-        print(f"无法加载图片 {path}: {e}")
-        pygame.quit()
-        quit()
-
-
-game_bg_image = load_image(os.path.join(image_path, "game_bg.png"))
-revive_bg_image = load_image(os.path.join(image_path, "revive_bg.png"))
-ad_bg_image = load_image(os.path.join(image_path, "ad_bg.png"))
-game_win_bg_image = load_image(os.path.join(image_path, "game_win_bg.png"))
-game_lose_bg_image = load_image(os.path.join(image_path, "game_lose_bg.png"))
-
-# 初始化混音器
-pygame.mixer.init()
-
-# 加载背景音乐和音效
-bg_music_path = os.path.join(music_path, "HOYO-MiX - A Dramatic Irony.mp3")
-match_sound_path = os.path.join(music_path, "ui.mp3")
-victory_sound_path = os.path.join(music_path, "张杰 _ HOYO-MiX - 不眠之夜.mp3")
-defeat_sound_path = os.path.join(music_path, "out.mp3")
-
-try:
-    pygame.mixer.music.load(bg_music_path)
-except pygame.error as e:
-    print(f"无法加载背景音乐 {bg_music_path}: {e}")
-    pygame.quit()
-    quit()
-
-try:
-    match_sound = pygame.mixer.Sound(match_sound_path)
-except pygame.error as e:
-    print(f"无法加载音效 {match_sound_path}: {e}")
-    pygame.quit()
-    quit()
-
-try:
-    victory_sound = pygame.mixer.Sound(victory_sound_path)
-except pygame.error as e:
-    print(f"无法加载胜利音效 {victory_sound_path}: {e}")
-    pygame.quit()
-    quit()
-
-try:
-    defeat_sound = pygame.mixer.Sound(defeat_sound_path)
-except pygame.error as e:
-    print(f"无法加载失败音效 {defeat_sound_path}: {e}")
-    pygame.quit()
-    quit()
-
-# 播放背景音乐
-pygame.mixer.music.play(-1)  # -1 表示循环播放
-
-# 定义槽，最多容纳7个图案
-slot = []
-SLOT_CAPACITY = 7
-SLOT_X = (WIDTH - SLOT_CAPACITY * TILE_SIZE) // 2
-SLOT_Y = HEIGHT - TILE_SIZE - 20  # 槽区位置调整到最底部
-
-# 定义游戏板尺寸
-LAYERS = 1  # 层数，可以根据需要调整
-
-# 定义复活次数
-revive_used = False
-
-
-# 生成游戏板，三维列表表示层、行、列
-# 生成游戏板，三维列表表示层、行、列
-def generate_boards():
-    total_tiles = LAYERS * ROWS * COLS  # 根据选择的层数生成游戏板
-    tile_pool = []
-
-    # 创建所有图案的数量，确保可以被3整除
-    num_tiles = ((total_tiles + 2) // 3) * 3  # 调整为大于等于 total_tiles 的最小3的倍数
-    for i in range(num_tiles // 3):
-        tile = patterns[i % len(patterns)]
-        tile_pool.extend([tile, tile, tile])  # 每种图案出现三次
-
-    random.shuffle(tile_pool)
-
-    boards = [[[None for _ in range(COLS)] for _ in range(ROWS)] for _ in range(LAYERS)]
-
-    # 将图案随机放置在游戏板上
-    for layer in range(LAYERS):
-        for row in range(ROWS):
-            for col in range(COLS):
-                if tile_pool:
-                    boards[layer][row][col] = tile_pool.pop()
-                else:
-                    boards[layer][row][col] = None
-    return boards
-
-# 读取排行榜数据，区分难度
-def read_scores(difficulty):
-    try:
-        # 根据难度读取不同的排行榜文件
-        filename = f"scores_{difficulty}.txt"
-        with open(filename, "r") as file:
-            scores = [int(line.strip()) for line in file.readlines()]
-    except FileNotFoundError:
-        scores = []  # 如果文件不存在，返回一个空列表
-    return scores
-
-# 保存排行榜数据，区分难度
-def save_scores(scores, difficulty):
-    # 根据难度保存到不同的排行榜文件
-    filename = f"scores_{difficulty}.txt"
-    with open(filename, "w") as file:
-        for score in scores:
-            file.write(f"{score}\n")
-
-
-
-
-# 绘制游戏板
-def draw_board(boards):
-    for layer in range(LAYERS):
-        for row in range(ROWS):
-            for col in range(COLS):
-                tile = boards[layer][row][col]
-                if tile:
-                    x = col * TILE_SIZE
-                    y = row * TILE_SIZE
-                    # 为了体现层次感，可以根据 layer 调整 x 和 y
-                    offset = (LAYERS - layer - 1) * 5  # 每层偏移，制造3D效果
-                    screen.blit(tile, (x + offset, y + offset))
-
-
-# 绘制槽
-def draw_slot():
-    # 绘制槽背景
-    pygame.draw.rect(screen, SLOT_BG_COLOR,
-                     (SLOT_X - 5, SLOT_Y - 5, SLOT_CAPACITY * TILE_SIZE + 10, TILE_SIZE + 10))
-    # 绘制槽边框
-    pygame.draw.rect(screen, SLOT_BORDER_COLOR,
-                     (SLOT_X - 5, SLOT_Y - 5, SLOT_CAPACITY * TILE_SIZE + 10, TILE_SIZE + 10), 2)
-
-    # 绘制槽中的图案
-    for i, tile in enumerate(slot):
-        x = SLOT_X + i * TILE_SIZE
-        y = SLOT_Y
-        screen.blit(tile, (x, y))
-
-
-# 处理点击事件
-def handle_click(x, y, boards):
-    tile_info = get_tile_at_pos(x, y, boards)
-    if tile_info:
-        layer, row, col = tile_info
-        tile = boards[layer][row][col]
-        if tile and not is_tile_covered(layer, row, col, boards):
-            # 将图案添加到槽中
-            slot.append(tile)
-            # 从游戏板中移除
-            boards[layer][row][col] = None
-            # 检查槽中是否有三个相同的图案
-            check_slot()
-            return True
-    return False
-
-
-# 获取点击的图案位置
-def get_tile_at_pos(x, y, boards):
-    for layer in reversed(range(LAYERS)):  # 从上到下检查
-        for row in range(ROWS):
-            for col in range(COLS):
-                tile = boards[layer][row][col]
-                if tile:
-                    tile_x = col * TILE_SIZE + (LAYERS - layer - 1) * 5
-                    tile_y = row * TILE_SIZE + (LAYERS - layer - 1) * 5
-                    rect = pygame.Rect(tile_x, tile_y, TILE_SIZE, TILE_SIZE)
-                    if rect.collidepoint(x, y):
-                        return layer, row, col
-    return None
-
-
-# 检查图案是否被遮挡
-def is_tile_covered(layer, row, col, boards):
-    # 只检查上层同一位置的图案
-    if layer + 1 >= LAYERS:
-        return False
-    upper_layer = layer + 1
-    upper_tile = boards[upper_layer][row][col]
-    if upper_tile:
-        upper_tile_center = (
-            col * TILE_SIZE + (LAYERS - upper_layer - 1) * 5 + TILE_SIZE // 2,
-            row * TILE_SIZE + (LAYERS - upper_layer - 1) * 5 + TILE_SIZE // 2
-        )
-        current_tile_center = (
-            col * TILE_SIZE + (LAYERS - layer - 1) * 5 + TILE_SIZE // 2,
-            row * TILE_SIZE + (LAYERS - layer - 1) * 5 + TILE_SIZE // 2
-        )
-        if abs(upper_tile_center[0] - current_tile_center[0]) < TILE_SIZE // 2 and \
-                abs(upper_tile_center[1] - current_tile_center[1]) < TILE_SIZE // 2:
-            return True
-    return False
-
-
-# 检查槽中的图案，是否可以消除
-def check_slot():
-    global slot
-    counts = {}
-    # 统计槽中每种图案的数量
-    for tile in slot:
-        key = patterns.index(tile)  # 使用图案在 patterns 中的索引作为唯一标识
-        counts[key] = counts.get(key, 0) + 1
-    # 找到数量达到3的图案，进行消除
-    to_remove_keys = [key for key, count in counts.items() if count >= 3]
-    if to_remove_keys:
-        match_sound.play()  # 播放消除音效
-    # 从槽中移除消除的图案
-    for key in to_remove_keys:
-        remove_count = 0
-        new_slot = []
-        for tile in slot:
-            if patterns.index(tile) == key and remove_count < 3:
-                remove_count += 1
-            else:
-                new_slot.append(tile)
-        slot = new_slot
-
-
-# 检查游戏是否结束
-# 检查游戏是否结束
-def check_game_over(boards, score, difficulty):
-    # 检查是否胜利
-    if all(tile is None for layer in boards for row in layer for tile in row):
-        draw_game_over("你赢了！", score, difficulty)  # 传递当前分数和难度
-        return True
-    # 检查是否失败
-    if len(slot) > SLOT_CAPACITY:
-        # 检查是否可以复活
-        if not revive():
-            draw_game_over("游戏失败！", score, difficulty)  # 传递当前分数和难度
-            return True
-        else:
-            return False
-    return False
-
-
-
-
-# 显示排行榜
-def draw_scoreboard(scores):
-    title_font = pygame.font.Font(font_path, 36)
-    title_text = title_font.render("排行榜", True, WHITE)
-    screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 2 + 100))
-
-    score_font = pygame.font.Font(font_path, 30)
-    for i, score in enumerate(scores[:3]):  # 只显示前3个分数
-        score_text = score_font.render(f"{i + 1}. {score}", True, WHITE)
-        screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 + 150 + i * 40))
-
-
-# 复活功能
-def revive():
-    global revive_used, slot
-    if not revive_used:
-        revive_used = True
-        # 显示复活界面
-        return show_revive_screen()
-    else:
-        return False
-
-
-def show_revive_screen():
-    waiting = True
-    choice_made = False
-    choice = False
-
-    def set_choice(value):
-        nonlocal choice_made, choice
-        choice_made = True
-        choice = value
-
-    while waiting:
-        # 显示复活界面的背景图片
-        screen.blit(revive_bg_image, (0, 0))
-
-        title_font = pygame.font.Font(font_path, 50)
-        text = title_font.render("观看3s广告复活", True, WHITE)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 3))
-
-        # 绘制按钮
-        draw_button("观看广告", WIDTH // 2 - 100, HEIGHT // 2, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: set_choice(True))
-        draw_button("放弃", WIDTH // 2 - 100, HEIGHT // 2 + 100, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: set_choice(False))
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-
-        if choice_made:
-            if choice:
-                # 显示广告图片，等待3秒
-                show_ad()
-                return True
-            else:
-                return False
-
-
-def show_ad():
-    start_time = time.time()
-    ad_duration = 3  # 广告时长 3 秒
-    skip_allowed = False  # 是否允许跳过广告
-
-    while True:
-        elapsed_time = time.time() - start_time
-        screen.blit(ad_bg_image, (0, 0))
-        screen.blit(ad_image, (0, 0))
-
-        # 显示倒计时
-        remaining_time = max(0, int(ad_duration - elapsed_time))
-        countdown_text = font.render(f"广告剩余 {remaining_time} 秒", True, WHITE)
-        screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2, HEIGHT - 100))
-
-        # 如果允许跳过，显示跳过按钮
-        if skip_allowed or elapsed_time >= ad_duration:
-            draw_button("关闭广告", WIDTH - 150, 20, 120, 40,
-                        (200, 0, 0), (255, 0, 0), lambda: return_from_ad())
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            elif (event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.KEYDOWN) and (
-                    skip_allowed or elapsed_time >= ad_duration):
-                return
-
-        # 广告播放完毕，允许跳过
-        if elapsed_time >= ad_duration:
-            skip_allowed = True
-
-        pygame.time.Clock().tick(FPS)
-
-
-def return_from_ad():
-    # 返回游戏
-    pass  # 这里只是占位，函数体为空
-
-
-# 游戏结束界面
-
-# 游戏结束界面
-def draw_game_over(message, score, difficulty):
-    global running
-    # 停止背景音乐
-    pygame.mixer.music.stop()
-
-    # 读取排行榜
-    scores = read_scores(difficulty)
-
-    # 添加当前分数并排序，保留前 3 名
-    scores.append(score)
-    scores = sorted(scores, reverse=True)[:3]  # 只保留最高的3个分数
-
-    # 保存更新后的排行榜
-    save_scores(scores, difficulty)
-
-    # 根据游戏结果选择背景图片并播放对应的音效
-    if message == "你赢了！":
-        pygame.mixer.music.stop()  # 停止背景音乐，防止重叠
-        victory_sound.play()  # 播放胜利音效
-        screen.blit(game_win_bg_image, (0, 0))
-    else:
-        defeat_sound.play()
-        screen.blit(game_lose_bg_image, (0, 0))
-
-    large_font = pygame.font.Font(font_path, 60)  # 使用更大的字体
-    text_color = WHITE  # 根据背景图片调整文字颜色
-    text = large_font.render(message, True, text_color)
-    screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 30))
-
-    # 显示当前分数和排行榜
-    draw_scoreboard(scores)
-
-    # 倒计时逻辑
-    countdown_time = 6  # 倒计时 6 秒
-    font = pygame.font.Font(font_path, 30)  # 设置倒计时字体
-    start_ticks = pygame.time.get_ticks()  # 获取倒计时开始时间
-
-    # 循环更新倒计时
-    while countdown_time > 0:
-        screen.fill(BLACK)
-
-        # 根据游戏结果重新绘制背景和结束文字
-        if message == "你赢了！":
-            screen.blit(game_win_bg_image, (0, 0))
-        else:
-            screen.blit(game_lose_bg_image, (0, 0))
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 30))
-        draw_scoreboard(scores)
-
-        # 计算剩余时间
-        seconds_passed = (pygame.time.get_ticks() - start_ticks) // 1000
-        countdown_time = 6 - seconds_passed  # 3秒倒计时
-
-        # 显示倒计时
-        countdown_text = font.render(f"返回主菜单 {countdown_time} 秒", True, WHITE)
-        screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2, HEIGHT // 2 + 50))
-
-        pygame.display.update()
-
-        # 等待一帧
-        pygame.time.Clock().tick(30)
-
-    # 胜利音效播放完成后，不再播放背景音乐
-    if message != "你赢了！":
-        pygame.mixer.music.play(-1)  # 如果是失败，重新播放背景音乐
-
-    # 返回主菜单
-    return_to_menu()
-
-
-# 返回主菜单
-def return_to_menu():
-    # 清除当前游戏状态
-    global slot, revive_used
-    slot = []
-    revive_used = False
-    # 调用主菜单
-    main_menu()
-
-
-# 绘制顶部信息（例如标题）
-def draw_top_info():
-    pass  # 当前未显示任何信息，可以在此添加得分等
-
-# 主函数
-def start_game(layers, difficulty):
-    global slot, revive_used, LAYERS
-    LAYERS = layers
-    slot = []
-    revive_used = False
-    boards = generate_boards()
-    game_over = False
-    score = 0  # 初始化得分
-    timer = 120  # 定义倒计时
-    start_ticks = pygame.time.get_ticks()  # 获取游戏开始的时间
-
-    while not game_over:
-        screen.fill(BG_COLOR)
-
-        # 计算剩余时间
-        seconds = timer - (pygame.time.get_ticks() - start_ticks) // 1000
-        if seconds <= 0:
-            draw_game_over("时间到了！", score, difficulty)
-            game_over = True
-
-        draw_board(boards)
-        draw_slot()
-        draw_timer(seconds)
-
-        pygame.display.update()
-        pygame.time.Clock().tick(FPS)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = event.pos
-                if handle_click(x, y, boards):
-                    score += 10  # 每次消除得 10 分
-                    if check_game_over(boards, score, difficulty):  # 传递 difficulty 参数
-                        game_over = True
-
-
-
-
-
-
-# 绘制倒计时
-def draw_timer(seconds):
-    timer_font = pygame.font.Font(font_path, 36)
-    timer_text = timer_font.render(f"时间: {seconds}", True, BLACK)
-    screen.blit(timer_text, (WIDTH - 200, 0))  # 显示在右上角
-
-
-# 主菜单
-def main_menu():
-    menu = True
-    while menu:
-        screen.blit(game_bg_image, (0, 0))
-
-        title_font = pygame.font.Font(font_path, 60)
-        text = title_font.render("  星穹铁道，启动！", True, WHITE)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 4))
-
-        # 绘制难度选择按钮
-        draw_button("简单", WIDTH // 2 - 100, HEIGHT // 2 - 80, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: start_game(2, "easy"))
-        draw_button("困难", WIDTH // 2 - 100, HEIGHT // 2, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: start_game(3, "hard"))
-        draw_button("地狱", WIDTH // 2 - 100, HEIGHT // 2 + 80, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: start_game(4, "hell"))
-        draw_button("炼狱", WIDTH // 2 - 100, HEIGHT // 2 + 160, 200, 50,
-                    (200, 200, 200), (150, 150, 150), lambda: start_game(5, "purgatory"))
-        draw_button("退出", WIDTH // 2 - 100, HEIGHT // 2 + 240, 200, 50,
-                    (200, 200, 200), (150, 150, 150), quit_game)
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-
-
-
-def draw_button(text, x, y, w, h, inactive_color, active_color, action=None):
-    mouse = pygame.mouse.get_pos()
-    click = pygame.mouse.get_pressed()
-
-    if x + w > mouse[0] > x and y + h > mouse[1] > y:
-        pygame.draw.rect(screen, active_color, (x, y, w, h))
-        if click[0] == 1 and action is not None:
-            pygame.time.wait(200)  # 防止过快点击
-            action()
-    else:
-        pygame.draw.rect(screen, inactive_color, (x, y, w, h))
-
-    text_surface = font.render(text, True, WHITE)
-    screen.blit(
-        text_surface,
-        (x + (w - text_surface.get_width()) // 2, y + (h - text_surface.get_height()) // 2),
-    )
-
-
-
-
-# 退出游戏函数
-def quit_game():
-    pygame.quit()
-    quit()
-
-
-# 启动主菜单
-main_menu()
-
-pygame.quit()
+import argparse
+import os
+import random
+import struct
+import threading
+import time
+
+# 启动耗时从导入 pygame、numpy 和游戏各模块之前算起，导入本身往往是启动中最慢的一段
+IMPORT_START = time.perf_counter()
+
+import pygame
+
+import numpy as np
+
+from assets import AssetManager
+from audio import Audio
+from core import COLS, DIFFICULTIES, LAYER_OFFSET, NUM_PATTERNS, Game, LOST, PLAYING, REVIVE, SLOT_CAPACITY, WON
+from fonts import TextCache
+from generator import BoardPool, make_tiles
+from layout import LAYOUTS, LayoutGame
+from leaderboard import Leaderboard
+from profiler import ENV_VAR as PROFILE_ENV_VAR, profiler
+from renderer import BoardRenderer
+from replay import CLICK, HINT, REDO, REVIVE_ACCEPT, REVIVE_DECLINE, UNDO, Recording, advance_to
+import savegame
+from scenes import Scene, SceneManager
+from scheduler import FrameScheduler
+from solver import Solver
+from telemetry import GameTracker, Telemetry
+from tween import Tweens
+from viewport import Viewport
+from widgets import Button, WidgetGroup
+
+# 定义常量
+WIDTH, HEIGHT = 700, 850  # 逻辑尺寸：界面按它布局，窗口可以任意大小，按比例缩放
+TILE_SIZE = WIDTH // COLS  # 根据列数计算图块大小
+FPS = 30  # 没有动画时的帧率（只有倒计时在变化）
+ANIMATION_FPS = 144  # 有动画在播放时的帧率上限，--fps 可以改为显示器的刷新率
+FLIGHT_MS = 200  # 图案从游戏板飞进槽中的时长
+CLEAR_MS = 160  # 凑齐三个的图案缩小消失的时长
+SLIDE_MS = 140  # 槽中的图案移动到新位置（或撤销后放大出现）的时长
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BG_COLOR = (245, 222, 179)  # 背景色：小麦色
+SLOT_BG_COLOR = (210, 180, 140)  # 槽区背景色：巧克力色
+SLOT_BORDER_COLOR = (139, 69, 19)  # 槽区边框颜色：褐色
+HINT_COLOR = (255, 0, 0)  # 提示框颜色：红色
+HINT_MS_PER_FRAME = 5  # 提示搜索每帧最多占用的毫秒数
+CHECKPOINT_MS = 2000  # 游戏中每隔多少毫秒的游戏时间写一次存档检查点
+AD_SECONDS = 3  # 复活广告的时长
+RESULT_SECONDS = 6  # 结算界面停留的时长，之后返回主菜单
+LEADERBOARD_POLL_MS = 50  # 排行榜在后台写入期间，结算界面每隔多少毫秒检查一次是否已经读到前几名
+PROFILER_KEY = pygame.K_F3  # 开关性能浮层和 trace 记录的按键
+FULLSCREEN_KEY = pygame.K_F11  # 切换全屏和窗口的按键
+# 需要完整重绘的事件：窗口被遮挡后重新显示、窗口大小变化
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED)
+HUD_FONT_SIZE = 16
+HUD_WIDTH = 320
+HUD_COLOR = (0, 255, 0)
+
+# 获取当前文件所在目录
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 定义资源路径
+image_path = os.path.join(BASE_DIR, "images")
+font_path = os.path.join(BASE_DIR, "fonts", "方正大雅宋简体.TTF")  # 请确保字体文件存在于指定路径
+music_path = os.path.join(BASE_DIR, "music")
+RECORDINGS_DIR = os.path.join(BASE_DIR, "recordings")  # --record 时每局的录像保存在这里
+TRACE_PATH = os.path.join(BASE_DIR, "trace.json")  # 关闭性能分析或退出时写出的 Chrome trace
+SAVE_PATH = os.path.join(BASE_DIR, "saves", "current.sav")  # 未完成的一局，崩溃或断电后从主菜单继续
+TELEMETRY_DIR = os.path.join(BASE_DIR, "telemetry")  # 游戏数据统计，用 python telemetry.py telemetry/ 汇总
+
+# 音乐和音效：长音轨流式播放，短音效第一次使用时才解码
+BG_MUSIC = "HOYO-MiX - A Dramatic Irony.mp3"
+VICTORY_MUSIC = "张杰 _ HOYO-MiX - 不眠之夜.mp3"
+MATCH_SOUND = "ui.mp3"
+DEFEAT_SOUND = "out.mp3"
+
+# images/ 中的图案图片数量（0.png 到 10.png），--patterns 最多可以使用这么多种
+PATTERN_IMAGES = 11
+
+# 启动后在后台线程加载的图片（复活、广告和结束界面）
+BACKGROUND_IMAGES = ["revive_bg.png", "ad_bg.png", "ad.png", "game_win_bg.png", "game_lose_bg.png"]
+
+# 槽区位置，最多容纳 SLOT_CAPACITY 个图案
+SLOT_X = (WIDTH - SLOT_CAPACITY * TILE_SIZE) // 2
+SLOT_Y = HEIGHT - TILE_SIZE - 20  # 槽区位置调整到最底部
+SLOT_RECT = pygame.Rect(SLOT_X - 5, SLOT_Y - 5, SLOT_CAPACITY * TILE_SIZE + 10, TILE_SIZE + 10)
+
+# 脏矩形渲染：只重绘变化的区域；设为 False 时每帧完整重绘
+DIRTY_RECTS = True
+# 槽的动画：图案飞进槽中、消除和移动；设为 False 时图案直接出现在槽中
+ANIMATIONS = True
+
+# 以下对象在 init() 中创建，导入本模块不会打开窗口或加载任何资源
+screen = None  # 窗口的 Viewport，绘制时使用逻辑坐标
+fullscreen = False
+windowed_size = (WIDTH, HEIGHT)  # 退出全屏时恢复的窗口大小
+scheduler = None  # 全局共用的帧调度器
+assets = None  # 图片资源管理，缩放后的图片缓存在 .cache/assets 目录
+text_cache = None  # 所有界面共用同一个字体和文字缓存
+font = None
+audio = None
+patterns = []  # 图案图片，第一次开始游戏时按窗口的缩放比例加载
+pattern_count = NUM_PATTERNS  # 每局使用的图案种类数
+board_pool = None  # 后台预先生成的牌局
+board_layout = None  # --layout 指定的通用布局名称，为 None 时使用经典的网格游戏板
+layouts = {}  # (布局名称, 层数) -> 通用布局，每种只构建一次
+record_games = False  # 是否录制每一局
+save_writer = None  # 在后台线程中写入存档检查点
+game_stats = None  # 游戏数据统计，在后台线程中写入；关闭统计时为 None
+leaderboard = None
+TIMER_RECT = None  # 倒计时文字所在区域（右上角）
+
+# 启动各阶段完成的时间 (阶段, 自导入本模块开始的毫秒数)
+startup_times = []
+startup_begin = None
+
+
+# 记录启动阶段的完成时间，每个阶段只记录第一次
+def mark_startup(stage):
+    if startup_begin is None or any(done == stage for done, _ in startup_times):
+        return
+    startup_times.append((stage, (time.perf_counter() - startup_begin) * 1000))
+
+
+# 启动耗时报告，以及每张图片的加载耗时和内存占用
+def startup_report():
+    lines = [f"{stage:<12} {ms:8.1f} ms" for stage, ms in startup_times]
+    if assets is not None:
+        lines += ["", assets.report()]
+    return "\n".join(lines)
+
+
+# 加载图片并按窗口的缩放比例缩放到逻辑尺寸 width x height，失败时退出游戏
+def load_image(name, width=WIDTH, height=HEIGHT):
+    try:
+        return assets.image(name, screen.scaled_size(width, height))
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"无法加载图片 {os.path.join(image_path, name)}: {e}")
+        pygame.quit()
+        quit()
+
+
+# 加载图案图片 0.png 到 (count - 1).png，已经加载的不再重复加载；count 默认为 --patterns 指定的种类数。
+# 回放录像和继续存档时使用当时的种类数，可能比新的一局多，pattern_count 本身不变
+def load_patterns(count=None):
+    count = pattern_count if count is None else count
+    if len(patterns) < count:
+        patterns.extend(load_image(f"{i}.png", TILE_SIZE, TILE_SIZE) for i in range(len(patterns), count))
+    return patterns
+
+
+# 按窗口的缩放比例渲染文字，size 为逻辑字号
+def render_text(text, size, color):
+    return text_cache.render(text, screen.font_size(size), color)
+
+
+# 切换全屏（使用桌面分辨率）或可以调整大小的窗口
+def set_window_mode(full):
+    global fullscreen, windowed_size
+    if full and not fullscreen and screen.surface is not None:
+        windowed_size = screen.window_size
+    fullscreen = full
+    if full:
+        pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        pygame.display.set_mode(windowed_size, pygame.RESIZABLE)
+    window_changed()
+
+
+# 窗口创建、调整大小或切换全屏之后：重新计算缩放比例。比例变化时立即按新比例重新缩放已加载的图案，
+# 其他图片和文字在下次使用时才按新比例缩放、渲染；当前场景收到 WINDOWSIZECHANGED 后完整重绘
+def window_changed():
+    surface = pygame.display.get_surface()
+    if surface is screen.surface and surface.get_size() == screen.window_size:
+        return
+    if screen.resize(surface) and patterns:
+        count = len(patterns)
+        patterns.clear()
+        load_patterns(count)
+    screen.fill(BLACK)
+
+
+# 初始化显示主菜单所需的最少内容：窗口、字体和主菜单背景，其余资源交给后台线程。
+# solvable 为 True 时只生成保证有解的牌局，record 为 True 时把每一局的录像保存到 RECORDINGS_DIR，
+# profile 为 True（或设置了环境变量 YLGY_PROFILE=1）时一启动就打开性能分析，fullscreen 为 True 时全屏，
+# telemetry 为 True 时把每一局的统计事件写到 TELEMETRY_DIR，layout 为 LAYOUTS 中的名称时新的一局使用该通用布局
+def init(num_patterns=NUM_PATTERNS, solvable=False, record=False, profile=False, fullscreen=False, telemetry=True,
+         layout=None):
+    global screen, scheduler, assets, text_cache, font, audio, leaderboard, TIMER_RECT
+    global startup_begin, pattern_count, board_pool, board_layout, record_games, save_writer, game_stats
+    startup_begin = IMPORT_START
+    mark_startup("导入模块")
+    pattern_count = num_patterns
+    board_layout = layout
+    profiler.trace_path = TRACE_PATH
+    if profile or os.environ.get(PROFILE_ENV_VAR) == "1":
+        profiler.enable()
+    record_games = record
+
+    # 只初始化显示和字体，音频设备在后台线程中打开
+    pygame.display.init()
+    pygame.font.init()
+    screen = Viewport((WIDTH, HEIGHT), TILE_SIZE)  # 缩放后图块恰好是整数像素
+    set_window_mode(fullscreen)
+    pygame.display.set_caption("星穹铁道，启动！")
+    scheduler = FrameScheduler()
+    mark_startup("创建窗口")
+
+    # 加载支持中文的字体
+    text_cache = TextCache(font_path)
+    try:
+        font = text_cache.font(36)  # 设置字体大小为36
+    except FileNotFoundError:
+        print(f"无法找到字体文件：{font_path}")
+        pygame.quit()
+        quit()
+    TIMER_RECT = pygame.Rect(WIDTH - 200, 0, 200, font.get_linesize())
+    mark_startup("加载字体")
+
+    assets = AssetManager(image_path, os.path.join(BASE_DIR, ".cache", "assets"))
+    load_image("game_bg.png")
+    mark_startup("主菜单背景")
+
+    # 排行榜数据库保存在程序目录下，与启动时的工作目录无关
+    leaderboard = Leaderboard(os.path.join(BASE_DIR, "scores.db"), BASE_DIR, DIFFICULTIES)
+
+    audio = Audio(music_path)
+    board_pool = BoardPool(DIFFICULTIES, solvable=solvable, num_patterns=pattern_count)
+    save_writer = savegame.CheckpointWriter()
+    save_writer.start()
+    if telemetry:
+        game_stats = Telemetry(TELEMETRY_DIR)
+        game_stats.start()
+    threading.Thread(target=load_background_assets, daemon=True).start()
+
+
+# 后台线程：打开音频设备、播放背景音乐，并预加载图案、音效和其他界面的图片
+def load_background_assets():
+    audio.init()
+    audio.play_music(BG_MUSIC)  # 默认循环播放
+    audio.preload([MATCH_SOUND, DEFEAT_SOUND])
+    mark_startup("音频")
+    for name in BACKGROUND_IMAGES:
+        try:
+            assets.image(name, screen.scaled_size(WIDTH, HEIGHT))
+        except (pygame.error, FileNotFoundError):
+            pass  # 第一次显示时再报告错误
+    for i in range(pattern_count):
+        try:
+            assets.image(f"{i}.png", screen.scaled_size(TILE_SIZE, TILE_SIZE))
+        except (pygame.error, FileNotFoundError):
+            pass
+    mark_startup("后台资源")
+    board_pool.start()  # 资源加载完后开始为每个难度预先生成牌局
+
+
+# 绘制游戏板
+def draw_board(game):
+    with profiler.span("draw_board"):
+        _draw_board(game)
+
+
+def _draw_board(game):
+    # 只绘制非空格子，按从下到上的顺序一次提交；网格游戏板每层向右下偏移，制造3D效果
+    tiles, xs, ys = game.tile_origins(TILE_SIZE, LAYER_OFFSET)
+    screen.blits([patterns[tile] for tile in tiles.tolist()], xs, ys)
+
+
+# 绘制槽；tiles 为 False 时只绘制背景和边框，槽中的图案由 SlotSprites 按动画绘制
+def draw_slot(game, tiles=True):
+    with profiler.span("draw_slot"):
+        _draw_slot(game, tiles)
+
+
+def _draw_slot(game, tiles):
+    # 绘制槽背景
+    screen.draw_rect(SLOT_BG_COLOR, SLOT_RECT)
+    # 绘制槽边框
+    screen.draw_rect(SLOT_BORDER_COLOR, SLOT_RECT, 2)
+
+    # 绘制槽中的图案
+    if tiles:
+        for i, tile in enumerate(game.slot):
+            screen.blit(patterns[tile], get_slot_pos(i))
+
+
+# 槽中第 index 个位置的逻辑坐标
+def get_slot_pos(index):
+    return SLOT_X + index * TILE_SIZE, SLOT_Y
+
+
+# 槽的动画：槽中的每个图案是一个精灵，用补间动画移动到它在槽中的位置。点击时游戏逻辑立即更新，
+# 精灵只是追赶逻辑状态，动画播放期间的点击照常生效，新的动画从精灵当前所在的位置接着开始
+class SlotSprites:
+    def __init__(self):
+        self.tweens = Tweens()
+        self.tiles = []  # 槽中图案的精灵编号，顺序与 game.slot 一致（包括还在飞行中的）
+        self.patterns = {}  # 精灵编号 -> 图案编号（包括正在消失的）
+        self.next_sprite = 0
+        self.drawn = []  # 上一帧绘制精灵的窗口矩形，动画播放时下一帧先擦除
+        self.animating = False  # 上一帧绘制时是否还有动画没播放完
+
+    def _new_sprite(self, tile):
+        sprite = self.next_sprite
+        self.next_sprite += 1
+        self.patterns[sprite] = tile
+        return sprite
+
+    # 不播放动画，直接按 game.slot 摆好（新的一局或继续存档）
+    def reset(self, game, now):
+        self.tweens = Tweens()
+        self.patterns = {}
+        self.tiles = []
+        for i, tile in enumerate(game.slot):
+            sprite = self._new_sprite(tile)
+            self.tweens.place(sprite, now, *get_slot_pos(i))
+            self.tiles.append(sprite)
+
+    # 从游戏板上取走 position 处的图案之后：它从原来的位置飞进槽中同种图案之后，后面的图案右移一格让出位置；
+    # 凑齐三个时，三个图案在落下后缩小消失，其余图案再左移补上空位
+    def picked(self, game, position, now):
+        tile = game.history[-1][1]
+        index = len(self.tiles)
+        for i, sprite in enumerate(self.tiles):
+            if self.patterns[sprite] == tile:
+                index = i + 1
+        sprite = self._new_sprite(tile)
+        self.tweens.place(sprite, now, *get_tile_rect(game, *position).topleft)
+        self.tiles.insert(index, sprite)
+        self.tweens.move(sprite, now, FLIGHT_MS, *get_slot_pos(index))
+        for i in range(index + 1, len(self.tiles)):
+            self.tweens.move(self.tiles[i], now, SLIDE_MS, *get_slot_pos(i))
+        if game.last_matched:
+            landed = now + FLIGHT_MS
+            remaining = []
+            for i, sprite in enumerate(self.tiles):
+                if self.patterns[sprite] == tile:
+                    self.tweens.move(sprite, landed, CLEAR_MS, *get_slot_pos(i), 0.0, remove=True)
+                else:
+                    remaining.append(sprite)
+            self.tiles = remaining
+            for i in range(index - 2, len(remaining)):
+                self.tweens.move(remaining[i], landed + CLEAR_MS, SLIDE_MS, *get_slot_pos(i))
+
+    # 撤销之后：按 game.slot 重新排列，已有的精灵移动到新位置，多出的缩小消失，新增的在槽中放大出现
+    def sync(self, game, now):
+        shown = {}  # 图案编号 -> 槽中这种图案的精灵
+        for sprite in self.tiles:
+            shown.setdefault(self.patterns[sprite], []).append(sprite)
+        tiles = []
+        for i, tile in enumerate(game.slot):
+            if shown.get(tile):
+                tiles.append(shown[tile].pop(0))
+            else:
+                sprite = self._new_sprite(tile)
+                self.tweens.place(sprite, now, *get_slot_pos(i), 0.0)
+                tiles.append(sprite)
+        for sprites in shown.values():
+            for sprite in sprites:
+                x, y, _ = self.tweens.state(sprite, now)
+                self.tweens.move(sprite, now, CLEAR_MS, x, y, 0.0, remove=True)
+        self.tiles = tiles
+        for i, sprite in enumerate(tiles):
+            self.tweens.move(sprite, now, SLIDE_MS, *get_slot_pos(i))
+
+    # 还有动画没播放完，或者动画结束后的最后一帧还没有绘制
+    def busy(self, now):
+        return self.animating or self.tweens.active(now)
+
+    # 按 now 时刻的状态绘制所有精灵，返回绘制的窗口矩形。没有缩放的精灵一次提交，
+    # 正在缩小或放大的（最多几个）按当前大小临时缩放，以图块的中心为中心
+    def draw(self, now):
+        sprites, xs, ys, scales = self.tweens.sample(now)
+        self.animating = self.tweens.active(now)
+        if len(sprites) < len(self.patterns):
+            self.patterns = {sprite: self.patterns[sprite] for sprite in sprites.tolist()}
+        tiles = [self.patterns[sprite] for sprite in sprites.tolist()]
+        whole = scales >= 1.0
+        if whole.all():
+            screen.blits([patterns[tile] for tile in tiles], xs, ys)
+        else:
+            for i in np.flatnonzero(~whole).tolist():
+                size = TILE_SIZE * scales[i]
+                image = pygame.transform.scale(patterns[tiles[i]], screen.scaled_size(size, size))
+                margin = (TILE_SIZE - size) / 2
+                screen.blit(image, (xs[i] + margin, ys[i] + margin))
+            index = np.flatnonzero(whole)
+            screen.blits([patterns[tiles[i]] for i in index.tolist()], xs[index], ys[index])
+        self.drawn = screen.rects(xs, ys, TILE_SIZE, TILE_SIZE)
+        return self.drawn
+
+
+# 按 now 时刻绘制槽的动画，返回绘制的窗口矩形
+def draw_sprites(sprites, now):
+    with profiler.span("animation"):
+        return sprites.draw(now)
+
+
+# 处理点击事件，成功时返回被移除图案的 (层, 行, 列)
+def handle_click(x, y, game):
+    tile_info = get_tile_at_pos(x, y, game)
+    if tile_info and game.pick(*tile_info):
+        if game.last_matched:
+            audio.play_sound(MATCH_SOUND)  # 播放消除音效
+        return tile_info
+    return None
+
+
+# 在 --layout 指定的通用布局上开始新的一局，牌局当场生成（比预先生成的网格牌局小得多）
+def new_layout_game(difficulty):
+    key = (board_layout, DIFFICULTIES[difficulty])
+    if key not in layouts:
+        layouts[key] = LAYOUTS[board_layout](key[1])
+    seed = random.getrandbits(32)
+    tiles = make_tiles(layouts[key], seed, board_pool.solvable, pattern_count)
+    return LayoutGame(layouts[key], num_patterns=pattern_count, seed=seed, tiles=tiles)
+
+
+# 获取点击的图案位置，x 和 y 为逻辑坐标（鼠标事件已经在 handle_global_event 中换算过）
+def get_tile_at_pos(x, y, game):
+    return game.tile_at(x, y, TILE_SIZE, LAYER_OFFSET)
+
+
+# 显示排行榜
+def draw_scoreboard(scores):
+    title_text = render_text("排行榜", 36, WHITE)
+    screen.blit_centered(title_text, WIDTH // 2, HEIGHT // 2 + 100)
+
+    for i, score in enumerate(scores[:3]):  # 只显示前3个分数
+        score_text = render_text(f"{i + 1}. {score}", 30, WHITE)
+        screen.blit_centered(score_text, WIDTH // 2, HEIGHT // 2 + 150 + i * 40)
+
+
+# 带按钮的静态界面：进入时完整绘制一次，之后只重绘悬停状态发生变化的按钮
+class WidgetScene(Scene):
+    def __init__(self):
+        super().__init__()
+        self.widgets = WidgetGroup()
+        self.redraw = True
+
+    def enter(self):
+        self.widgets.sync_hover(screen.to_logical(pygame.mouse.get_pos()))
+
+    # 绘制按钮以外的内容
+    def draw_background(self):
+        pass
+
+    def update(self):
+        if self.redraw:
+            self.redraw = False
+            with profiler.span("draw_background"):
+                screen.fill(BLACK)  # 留边区域
+                self.draw_background()
+            with profiler.span("draw_widgets"):
+                self.widgets.draw(screen, force=True)
+            with profiler.span("display.update"):
+                pygame.display.update()
+        else:
+            with profiler.span("draw_widgets"):
+                dirty = self.widgets.draw(screen)
+            if dirty:
+                with profiler.span("display.update"):
+                    pygame.display.update(dirty)
+
+    def handle_event(self, event):
+        if event.type in REDRAW_EVENTS:
+            self.redraw = True  # 窗口被遮挡后重新显示，或窗口大小变化
+            return False
+        return self.widgets.handle_event(event)
+
+
+# 复活界面：只有一次机会，由核心规则记录。覆盖在游戏场景上方，选择后回到游戏场景。
+# 也可以撤销让槽溢出的那一步（按钮或 Ctrl+Z），回到游戏场景后由游戏场景撤销，复活机会仍然保留
+class ReviveScene(WidgetScene):
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+        self.widgets.add(make_button("观看广告", WIDTH // 2 - 100, HEIGHT // 2, 200, 50,
+                                     (200, 200, 200), (150, 150, 150), lambda: self.choose(True)))
+        self.widgets.add(make_button("放弃", WIDTH // 2 - 100, HEIGHT // 2 + 100, 200, 50,
+                                     (200, 200, 200), (150, 150, 150), lambda: self.choose(False)))
+        self.widgets.add(make_button("撤销上一步", WIDTH // 2 - 100, HEIGHT // 2 + 200, 200, 50,
+                                     (200, 200, 200), (150, 150, 150), self.undo))
+
+    def exit(self):
+        self.game = None
+
+    def draw_background(self):
+        # 显示复活界面的背景图片
+        screen.blit(load_image("revive_bg.png"), (0, 0))
+
+        text = render_text("观看3s广告复活", 50, WHITE)
+        screen.blit_centered(text, WIDTH // 2, HEIGHT // 3)
+
+    # 观看广告后复活；放弃则直接判负，回到游戏场景后进入结算
+    def choose(self, accept):
+        if self.manager.pending:
+            return  # 已经做出选择
+        if accept:
+            self.manager.switch(AdScene(self.game))
+        else:
+            self.game.revive(False)
+            self.manager.pop()
+
+    # 不做选择，直接回到游戏场景；游戏仍在等待复活，游戏场景恢复时撤销上一步
+    def undo(self):
+        if not self.manager.pending:
+            self.manager.pop()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+            self.undo()
+            return True
+        return super().handle_event(event)
+
+
+# 广告界面：倒计时结束后按任意键或点击返回游戏并复活
+class AdScene(WidgetScene):
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+        self.start_time = None
+        self.shown_remaining = None  # 屏幕上显示的剩余秒数
+        self.close_button = None
+
+    def enter(self):
+        self.start_time = time.time()
+        super().enter()
+
+    def exit(self):
+        self.game = None
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def update(self):
+        elapsed_time = self.elapsed
+        remaining_time = max(0, int(AD_SECONDS - elapsed_time))
+        if remaining_time != self.shown_remaining:
+            self.shown_remaining = remaining_time
+            self.redraw = True
+        # 广告播放完毕，显示关闭按钮
+        if elapsed_time >= AD_SECONDS and self.close_button is None:
+            self.close_button = self.widgets.add(make_button("关闭广告", WIDTH - 150, 20, 120, 40,
+                                                             (200, 0, 0), (255, 0, 0), self.close))
+            self.redraw = True
+        super().update()
+
+    def draw_background(self):
+        screen.blit(load_image("ad_bg.png"), (0, 0))
+        screen.blit(load_image("ad.png"), (0, 0))
+
+        # 显示倒计时
+        countdown_text = render_text(f"广告剩余 {self.shown_remaining} 秒", 36, WHITE)
+        screen.blit_centered(countdown_text, WIDTH // 2, HEIGHT - 100)
+
+    # 倒计时期间等到下一秒再重绘，之后一直等待玩家操作
+    def wait_ms(self):
+        elapsed_time = self.elapsed
+        if elapsed_time >= AD_SECONDS:
+            return 0
+        return int((1 - elapsed_time % 1) * 1000) + 1
+
+    def handle_event(self, event):
+        if super().handle_event(event):
+            return True
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN) and self.elapsed >= AD_SECONDS:
+            self.close()
+        return False
+
+    # 关闭广告，返回游戏并复活
+    def close(self):
+        if not self.manager.pending:
+            self.game.revive(True)
+            self.manager.pop()
+
+
+# 结算界面：记录这一局并显示排行榜，倒计时结束后返回主菜单
+class ResultScene(Scene):
+    def __init__(self, message, difficulty, game):
+        super().__init__()
+        self.message = message
+        self.difficulty = difficulty
+        # 只保留需要记录的结果，不持有整局游戏
+        self.result = (game.score, game.layers, game.elapsed / 1000, game.state)
+        self.won = game.state == WON
+        self.scores = []
+        self.pending = None  # 后台线程记录这一局并读取前 3 名，完成前排行榜为空
+        self.start_ticks = None
+
+    def enter(self):
+        score, layers, seconds, state = self.result
+        self.pending = leaderboard.submit(self.difficulty, score, layers, seconds, state, k=3)
+
+        # 根据游戏结果播放对应的音乐或音效
+        if self.won:
+            audio.play_music(VICTORY_MUSIC, loops=0)  # 背景音乐淡出后播放胜利音乐
+        else:
+            audio.stop_music()  # 停止背景音乐
+            audio.play_sound(DEFEAT_SOUND)
+        self.start_ticks = pygame.time.get_ticks()  # 获取倒计时开始时间
+
+    def exit(self):
+        self.pending = None
+
+    def update(self):
+        if self.pending is not None and self.pending.done():
+            self.scores = self.pending.result()
+            self.pending = None
+        # 计算剩余时间
+        seconds_passed = (pygame.time.get_ticks() - self.start_ticks) // 1000
+        countdown_time = RESULT_SECONDS - seconds_passed
+        if countdown_time <= 0:
+            # 胜利音乐播放完成后，不再播放背景音乐
+            if not self.won:
+                audio.play_music(BG_MUSIC)  # 如果是失败，重新播放背景音乐
+            self.manager.switch(MenuScene())  # 返回主菜单
+            return
+
+        # 根据游戏结果绘制背景和结束文字
+        with profiler.span("draw_background"):
+            screen.fill(BLACK)
+            screen.blit(load_image("game_win_bg.png" if self.won else "game_lose_bg.png"), (0, 0))
+        with profiler.span("text"):
+            text = render_text(self.message, 60, WHITE)  # 使用更大的字体
+            screen.blit_centered(text, WIDTH // 2, HEIGHT // 2 - 30)
+            draw_scoreboard(self.scores)
+
+            # 显示倒计时
+            countdown_text = render_text(f"返回主菜单 {countdown_time} 秒", 30, WHITE)
+            screen.blit_centered(countdown_text, WIDTH // 2, HEIGHT // 2 + 50)
+
+        with profiler.span("display.update"):
+            pygame.display.update()
+
+    # 等到下一秒再更新倒计时；排行榜还在写入时隔一小段时间检查一次
+    def wait_ms(self):
+        remaining = 1000 - (pygame.time.get_ticks() - self.start_ticks) % 1000
+        if self.pending is not None:
+            return min(remaining, LEADERBOARD_POLL_MS)
+        return remaining
+
+
+# 绘制顶部信息（例如标题）
+def draw_top_info():
+    pass  # 当前未显示任何信息，可以在此添加得分等
+
+# 游戏场景：一局游戏的全部状态都属于这个场景，离开时释放。
+# replay 不为 None 时回放录像：玩家的输入被忽略，realtime 为 False 时每帧直接跳到下一个输入的时间。
+# saved 不为 None 时是从存档恢复的 (SaveGame, Game)。Ctrl+Z 撤销、Ctrl+Y 重做
+class GameScene(Scene):
+    def __init__(self, difficulty, replay=None, realtime=False, saved=None):
+        super().__init__()
+        self.difficulty = difficulty
+        self.replay = replay
+        self.realtime = realtime
+        self.saved = saved
+        self.next_input = 0  # 回放时下一个要送入的输入
+        self.recording = None  # 开启录像时记录这一局的输入
+        self.save = None  # 这一局的存档，回放时不存档
+        self.tracker = None  # 这一局的数据统计，回放时不统计
+        self.game = None
+        self.renderer = None
+        self.sprites = None  # 槽的动画，最快速度回放时不播放动画
+        self.settling = False  # 这一局已经结束或等待复活，等最后一步的动画播放完再切换界面
+        self.hint_solver = None  # 按 H 键请求提示后创建
+        self.hint = None  # 当前提示点击的 (层, 行, 列)
+        self.shown_hint = None
+        self.shown_seconds = None  # 屏幕上当前显示的倒计时
+        self.slot_changed = True
+
+    # 按原速度运行（正常游戏或按原速度回放），最快速度回放时为 False
+    @property
+    def animated(self):
+        return self.replay is None or self.realtime
+
+    @property
+    def fps(self):
+        if not self.animated:
+            return 0
+        return ANIMATION_FPS if self.sprites is not None and self.sprites.animating else FPS
+
+    def enter(self):
+        resumed = self.saved is not None
+        if self.replay is not None:
+            self.game = self.replay.new_game()
+        elif self.saved is not None:
+            self.save, self.game = self.saved
+            self.saved = None
+            if self.game.state == REVIVE:
+                self.manager.push(ReviveScene(self.game))  # 存档时停在复活界面
+        elif board_layout is not None:
+            self.game = new_layout_game(self.difficulty)  # 存档和录像只支持经典的网格游戏板
+        else:
+            seed, boards = board_pool.take(self.difficulty)  # 通常已经在后台生成好，无需等待
+            num_patterns = board_pool.num_patterns  # 录像和存档中记录的种类数与牌局一致
+            self.game = Game(DIFFICULTIES[self.difficulty], num_patterns=num_patterns, seed=seed, boards=boards)
+            if record_games:
+                self.recording = Recording(seed, self.difficulty, self.game.layers, num_patterns,
+                                           board_pool.solvable, TILE_SIZE, LAYER_OFFSET,
+                                           round(1000 / scheduler.step_ms), self.game.time_limit)
+            self.save = savegame.SaveGame(SAVE_PATH, save_writer, seed, self.difficulty, self.game.layers,
+                                          num_patterns, board_pool.solvable)
+            self.save.start()
+        if self.replay is None and game_stats is not None:
+            self.tracker = GameTracker(game_stats, self.difficulty, self.game, resumed)
+        load_patterns(self.game.num_patterns)
+        scheduler.reset()
+        if ANIMATIONS and self.animated:
+            self.sprites = SlotSprites()
+            self.sprites.reset(self.game, scheduler.now_ms)
+        if DIRTY_RECTS:
+            self.new_renderer()
+
+    # 释放这一局的游戏板、渲染缓存和提示搜索；开启录像时保存这一局（包括中途退出的）。
+    # 这一局结束时删除存档，中途退出时写入最后一个检查点，下次可以从主菜单继续
+    def exit(self):
+        if self.tracker is not None:
+            self.tracker.ended(self.game)
+            self.tracker = None
+        if self.save is not None:
+            if self.game.finished:
+                self.save.discard()
+            else:
+                self.save.checkpoint(self.game.elapsed)
+            self.save = None
+        if self.recording is not None:
+            self.recording.finish(self.game)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.difficulty}-{self.recording.seed}.rec"
+            try:
+                self.recording.save(os.path.join(RECORDINGS_DIR, name))
+            except (OSError, struct.error) as e:
+                print(f"无法保存录像: {e}")
+            self.recording = None
+        self.game = None
+        self.renderer = None
+        self.sprites = None
+        self.hint_solver = self.hint = self.shown_hint = None
+
+    # 从复活或广告界面返回
+    def resume(self):
+        scheduler.reset()  # 停在复活、广告界面的时间不计入这一局
+        if self.game.state == REVIVE:  # 在复活界面选择了撤销
+            self.redraw()
+            self.undo_redo(True)
+            return
+        if self.recording is not None:
+            self.recording.add(self.game.elapsed, REVIVE_DECLINE if self.game.state == LOST else REVIVE_ACCEPT)
+        if self.save is not None:
+            self.save.add(savegame.REVIVE_DECLINE if self.game.state == LOST else savegame.REVIVE_ACCEPT)
+        if self.tracker is not None:
+            self.tracker.revived(self.game.state != LOST)
+        if self.game.state == LOST:
+            self.finish("游戏失败！")
+            return
+        self.redraw()  # 复活界面覆盖了整个屏幕，需要完整重绘
+
+    # 按窗口当前的大小和缩放比例合成游戏板
+    def new_renderer(self):
+        self.renderer = BoardRenderer(screen, load_patterns(self.game.num_patterns), TILE_SIZE, LAYER_OFFSET, BG_COLOR)
+        self.renderer.rebuild(self.game)
+
+    # 下一帧完整重绘整个屏幕；窗口大小变化后重新合成游戏板
+    def redraw(self):
+        if self.renderer is not None:
+            if self.renderer.matches(screen):
+                self.renderer.invalidate()
+            else:
+                self.new_renderer()
+        self.shown_seconds = None
+        self.shown_hint = None
+        self.slot_changed = True
+
+    def finish(self, message):
+        if self.replay is not None:
+            self.manager.quit()  # 回放不进入结算界面，也不记录到排行榜
+            return
+        self.manager.switch(ResultScene(message, self.difficulty, self.game))
+
+    def update(self):
+        with profiler.span("logic"):
+            seconds = self.update_logic()
+        if seconds is None:
+            return
+
+        game = self.game
+        hint = self.hint
+        sprites = self.sprites
+        if self.renderer is None:
+            screen.fill(BG_COLOR)
+            draw_board(game)
+            draw_slot(game, sprites is None)
+            draw_timer(seconds)
+            draw_hint(game, hint)
+            if sprites is not None:
+                draw_sprites(sprites, scheduler.now_ms)
+            with profiler.span("display.update"):
+                pygame.display.update()
+        else:
+            if self.shown_hint is not None and hint != self.shown_hint:
+                self.renderer.mark_dirty(get_tile_rect(game, *self.shown_hint))  # 擦除旧的提示框
+            draw_dirty(self.renderer, game, seconds, self.slot_changed, seconds != self.shown_seconds,
+                       hint, hint != self.shown_hint, sprites, scheduler.now_ms)
+        self.shown_seconds = seconds
+        self.shown_hint = hint
+        self.slot_changed = False
+
+    # 推进游戏时间、送入回放的输入并搜索提示，返回剩余秒数；这一局结束或即将切换场景时返回 None
+    def update_logic(self):
+        game = self.game
+        # 按固定步长推进游戏时间（倒计时），计算剩余时间
+        if self.replay is None or self.realtime:
+            game.advance(scheduler.fixed_steps() * scheduler.step_ms)
+        else:
+            self.skip_to_next_input()
+        if self.settling:
+            if self.sprites.busy(scheduler.now_ms):
+                return max(game.seconds_left, 0)
+            self.settling = False
+            self.check_state()
+            if self.manager.pending:
+                return None
+        seconds = game.seconds_left
+        if seconds <= 0:
+            self.finish("时间到了！")
+            return None
+        if self.replay is not None:
+            self.play_inputs()
+            if self.manager.pending:
+                return None
+
+        # 提示：每帧只搜索一小段时间，帧率不受影响；没有找到完整解之前显示目前最好的一步
+        if self.hint_solver is not None:
+            if not self.hint_solver.done:
+                self.hint_solver.step(max_ms=HINT_MS_PER_FRAME)
+            self.hint = self.hint_solver.hint()
+        if self.save is not None and game.elapsed - self.save.saved_elapsed >= CHECKPOINT_MS:
+            self.save.checkpoint(game.elapsed)
+        return seconds
+
+    # 最快速度回放：游戏时间直接跳到下一个输入（没有输入时跳到录像结束）的时间
+    def skip_to_next_input(self):
+        inputs = self.replay.events
+        step = inputs[self.next_input][0] if self.next_input < len(inputs) else self.replay.result[3]
+        advance_to(self.game, self.replay, step)
+
+    # 送入已到时间的录像输入；最快速度回放时每帧只送入一个，录像结束后退出
+    def play_inputs(self):
+        inputs = self.replay.events
+        while self.next_input < len(inputs):
+            step, kind, x, y = inputs[self.next_input]
+            if step * self.replay.step_ms > self.game.elapsed + 1e-6:
+                return
+            self.next_input += 1
+            if kind == CLICK:
+                self.apply_input(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+            elif kind == HINT:
+                self.apply_input(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_h))
+            elif kind in (UNDO, REDO):
+                key = pygame.K_z if kind == UNDO else pygame.K_y
+                self.apply_input(pygame.event.Event(pygame.KEYDOWN, key=key, mod=pygame.KMOD_CTRL))
+            if not self.realtime or self.manager.pending:
+                return
+        if self.game.elapsed >= self.replay.result[3] * self.replay.step_ms - 1e-6:
+            self.manager.quit()  # 录像在这一局结束之前停止（例如中途退出）
+
+    def handle_event(self, event):
+        if event.type in REDRAW_EVENTS:
+            self.redraw()  # 窗口被遮挡后重新显示、窗口大小变化，或性能浮层关闭
+        elif self.replay is None and not self.settling:
+            self.apply_input(event)
+
+    def apply_input(self, event):
+        game = self.game
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_z, pygame.K_y) and event.mod & pygame.KMOD_CTRL:
+            self.undo_redo(event.key == pygame.K_z)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+            if self.recording is not None:
+                self.recording.add(game.elapsed, HINT)
+            if self.hint_solver is None and not isinstance(game, LayoutGame):  # 求解器只支持经典的网格游戏板
+                self.hint_solver = Solver(game)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            x, y = event.pos
+            if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+                return  # 窗口两侧或上下的留边，不会点中任何图案，也不录进录像
+            if self.recording is not None:
+                self.recording.add(game.elapsed, CLICK, x, y)
+            tile_info = handle_click(x, y, game)
+            if tile_info:  # 每次点击得 10 分，由核心规则累计
+                if self.save is not None:
+                    self.save.add(savegame.PICK, tile_info)
+                if self.tracker is not None:
+                    self.tracker.moved(game)
+                self.board_changed(tile_info)
+
+    # 撤销（undo 为 True）或重做一步，记入录像和存档
+    def undo_redo(self, undo):
+        game = self.game
+        if self.recording is not None:
+            self.recording.add(game.elapsed, UNDO if undo else REDO)
+        tile_info = game.undo() if undo else game.redo()
+        if tile_info:
+            if self.save is not None:
+                self.save.add(savegame.UNDO if undo else savegame.REDO)
+            self.board_changed(tile_info, picked=not undo)
+
+    # 图案被取走（picked 为 True）或放回之后：重绘该位置和槽，开始槽的动画，并处理复活、胜负。
+    # 播放动画时，最后一步飞进槽中（和消除）的动画播放完才进入复活或结算界面
+    def board_changed(self, tile_info, picked=True):
+        game = self.game
+        if self.renderer is not None:
+            self.renderer.redraw_tile(game, *tile_info)
+        self.slot_changed = True
+        self.hint_solver = self.hint = None  # 局面变了，之前的提示作废
+        if self.sprites is not None:
+            if picked:
+                self.sprites.picked(game, tile_info, scheduler.now_ms)
+            else:
+                self.sprites.sync(game, scheduler.now_ms)
+        # 回放时紧接着的复活选择已经在录像中，不等待动画
+        self.settling = self.sprites is not None and self.replay is None and game.state != PLAYING
+        if not self.settling:
+            self.check_state()
+
+    # 进入复活界面，或这一局结束时进入结算界面
+    def check_state(self):
+        game = self.game
+        if game.state == REVIVE:
+            if self.replay is None:
+                self.manager.push(ReviveScene(game))
+            else:
+                self.replay_revive()
+        elif game.state == WON:
+            self.finish("你赢了！")
+        elif game.state == LOST:
+            self.finish("游戏失败！")
+
+    # 回放时不显示复活界面，直接使用录像中紧接着的复活选择；紧接着的是撤销时由 play_inputs 照常送入
+    def replay_revive(self):
+        inputs = self.replay.events
+        if self.next_input < len(inputs) and inputs[self.next_input][1] == UNDO:
+            return
+        if self.next_input < len(inputs) and inputs[self.next_input][1] in (REVIVE_ACCEPT, REVIVE_DECLINE):
+            accept = inputs[self.next_input][1] == REVIVE_ACCEPT
+            self.next_input += 1
+            self.game.revive(accept)
+            if not accept:
+                self.finish("游戏失败！")
+            elif self.renderer is not None:
+                self.renderer.invalidate()
+        else:
+            self.manager.quit()  # 录制时在复活界面退出
+
+
+# 无窗口或按原速度回放一局录像，返回 (回放结束时的游戏, 每帧耗时列表)；按原速度回放时不统计帧耗时
+def run_replay(recording, realtime=False):
+    scene = GameScene(recording.difficulty, replay=recording, realtime=realtime)
+    manager = SceneManager(scheduler, handle_global_event, draw_profiler_hud)
+    manager.switch(scene)
+    manager.step()  # 进入场景并绘制第一帧
+    game = scene.game
+    frame_times = []
+    while True:
+        start = time.perf_counter()
+        if not manager.step():
+            break
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return game, [] if realtime else frame_times
+
+
+# 脏矩形模式下绘制一帧：只把变化的游戏板区域、槽和倒计时提交给显示器（脏矩形都是窗口像素）。
+# sprites 不为 None 时槽中的图案按 now 时刻的动画绘制：动画播放时先用缓存擦除上一帧的精灵
+# （槽内的精灵由重绘的槽背景覆盖，不必擦除），被擦除区域覆盖的槽、倒计时和提示框随之重绘，
+# 最后在最上层绘制所有精灵
+def draw_dirty(renderer, game, seconds, slot_changed, timer_changed, hint=None, hint_changed=False,
+               sprites=None, now=0.0):
+    with profiler.span("draw_board"):
+        dirty = renderer.flush(screen.surface)
+    moving = sprites is not None and sprites.busy(now)
+    slot_rect = screen.rect(SLOT_RECT)
+    if moving:
+        for rect in sprites.drawn:
+            if not slot_rect.contains(rect):
+                renderer.restore(screen.surface, rect)
+                dirty.append(rect)
+        slot_changed = True
+    slot_drawn = slot_changed or slot_rect.collidelist(dirty) != -1
+    if slot_drawn:
+        draw_slot(game, sprites is None)
+        dirty.append(slot_rect)
+    timer_rect = screen.rect(TIMER_RECT)
+    if timer_changed or timer_rect.collidelist(dirty) != -1:
+        renderer.restore(screen.surface, timer_rect)
+        draw_timer(seconds)
+        dirty.append(timer_rect)
+    if hint is not None:
+        rect = screen.rect(get_tile_rect(game, *hint))
+        if hint_changed or rect.collidelist(dirty) != -1:
+            draw_hint(game, hint)
+            dirty.append(rect)
+    if sprites is not None and (moving or slot_drawn):
+        dirty.extend(draw_sprites(sprites, now))
+    if dirty:
+        with profiler.span("display.update"):
+            pygame.display.update(dirty)
+
+
+# position 处（(层, 行, 列)，通用布局为 (编号,)）图案的逻辑矩形
+def get_tile_rect(game, *position):
+    x, y = game.tile_origin(*position, TILE_SIZE, LAYER_OFFSET)
+    return pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
+
+
+# 在提示的图案上绘制边框
+def draw_hint(game, hint):
+    if hint is not None:
+        screen.draw_rect(HINT_COLOR, get_tile_rect(game, *hint), 4)
+
+
+# 绘制倒计时
+def draw_timer(seconds):
+    with profiler.span("text"):
+        timer_text = render_text(f"时间: {seconds}", 36, BLACK)
+        screen.blit(timer_text, (WIDTH - 200, 0))  # 显示在右上角
+
+
+# 所有场景共用的事件处理：鼠标坐标换算为逻辑坐标，窗口大小变化，音轨切换，
+# 按 F3 开关性能分析，按 F11 切换全屏
+def handle_global_event(event):
+    if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        event.pos = screen.to_logical(event.pos)  # 之后的场景、按钮和录像只看到逻辑坐标
+    elif event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+        window_changed()
+    audio.handle_event(event)
+    if event.type == pygame.KEYDOWN and event.key == FULLSCREEN_KEY:
+        set_window_mode(not fullscreen)
+        pygame.event.post(pygame.event.Event(pygame.VIDEOEXPOSE))
+    elif event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+        if profiler.enabled:
+            path = profiler.disable()
+            if path is not None:
+                print(f"性能分析记录已保存到 {path}")
+        else:
+            profiler.enable()
+        pygame.event.post(pygame.event.Event(pygame.VIDEOEXPOSE))  # 重绘被浮层覆盖的区域
+
+
+# 性能浮层：左上角显示帧率和最近若干帧各阶段的平均、最大耗时。
+# 数字每帧都在变化，直接用字体渲染，不放进文字缓存
+def draw_profiler_hud():
+    if not profiler.enabled:
+        return
+    with profiler.span("hud"):
+        hud_font = text_cache.font(screen.font_size(HUD_FONT_SIZE))
+        line_height = hud_font.get_linesize() / screen.scale  # 逻辑行高
+        lines = [f"FPS {scheduler.fps:.1f}   空闲 {scheduler.idle_percent:.0f}%   (平均 / 最大 ms)"]
+        lines += [f"{name}  {avg:.2f} / {peak:.2f}" for name, avg, peak in profiler.summary()]
+        rect = screen.fill(BLACK, (0, 0, HUD_WIDTH, len(lines) * line_height + 4))
+        for i, line in enumerate(lines):
+            screen.blit(hud_font.render(line, True, HUD_COLOR), (4, 2 + i * line_height))
+        pygame.display.update(rect)
+
+
+# 主菜单
+class MenuScene(WidgetScene):
+    def __init__(self):
+        super().__init__()
+        # 难度选择按钮
+        for i, (text, difficulty) in enumerate([("简单", "easy"), ("困难", "hard"),
+                                                ("地狱", "hell"), ("炼狱", "purgatory")]):
+            self.widgets.add(make_button(text, WIDTH // 2 - 100, HEIGHT // 2 - 80 + i * 80, 200, 50,
+                                         (200, 200, 200), (150, 150, 150),
+                                         lambda difficulty=difficulty: self.start(difficulty)))
+        self.widgets.add(make_button("退出", WIDTH // 2 - 100, HEIGHT // 2 + 240, 200, 50,
+                                     (200, 200, 200), (150, 150, 150), lambda: self.manager.quit()))
+        # 上一局没有玩完（中途退出、崩溃或断电）时可以继续
+        if os.path.exists(SAVE_PATH):
+            self.widgets.add(make_button("继续上一局", WIDTH // 2 - 100, HEIGHT // 2 - 150, 200, 50,
+                                         (200, 200, 200), (150, 150, 150), self.continue_saved))
+
+    def update(self):
+        super().update()
+        mark_startup("主菜单首帧")
+
+    def draw_background(self):
+        screen.blit(load_image("game_bg.png"), (0, 0))
+
+        text = render_text("  星穹铁道，启动！", 60, WHITE)
+        screen.blit_centered(text, WIDTH // 2, HEIGHT // 4)
+
+    def start(self, difficulty):
+        if not self.manager.pending:
+            self.manager.switch(GameScene(difficulty))
+
+    # 读取存档，重放到最后一个检查点后继续；存档损坏或这一局已经结束时删除存档
+    def continue_saved(self):
+        if self.manager.pending:
+            return
+        save_writer.flush()
+        try:
+            save, game = savegame.load(SAVE_PATH, save_writer)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"无法读取存档: {e}")
+            game = None
+        if game is None or game.finished or save.difficulty not in DIFFICULTIES:
+            save_writer.delete(SAVE_PATH)
+            save_writer.flush()
+            self.manager.switch(MenuScene())  # 重新创建主菜单，去掉继续按钮
+            return
+        self.manager.switch(GameScene(save.difficulty, saved=(save, game)))
+
+
+# 创建按钮，文字按绘制时的缩放比例渲染（由文字缓存缓存）
+def make_button(text, x, y, w, h, inactive_color, active_color, action=None):
+    return Button((x, y, w, h), lambda: render_text(text, 36, WHITE), inactive_color, active_color, action)
+
+
+def main():
+    global ANIMATION_FPS
+    parser = argparse.ArgumentParser(description="星穹铁道，启动！")
+    parser.add_argument("--startup-report", action="store_true", help="退出时打印启动各阶段耗时和每张图片的加载耗时、内存占用")
+    parser.add_argument("--solvable", action="store_true", help="只生成保证有解的牌局")
+    parser.add_argument("--patterns", type=int, default=NUM_PATTERNS, choices=range(3, PATTERN_IMAGES + 1),
+                        metavar=f"3-{PATTERN_IMAGES}", help=f"使用的图案种类数（默认 {NUM_PATTERNS}）")
+    parser.add_argument("--record", action="store_true", help="把每一局的录像保存到 recordings/ 目录")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"启动即打开性能浮层，退出时把记录写到 {os.path.basename(TRACE_PATH)}（游戏中按 F3 开关）")
+    parser.add_argument("--fullscreen", action="store_true", help="以桌面分辨率全屏运行（游戏中按 F11 切换）")
+    parser.add_argument("--fps", type=int, default=ANIMATION_FPS, choices=range(30, 241), metavar="30-240",
+                        help=f"动画播放时的帧率上限，设为显示器的刷新率（默认 {ANIMATION_FPS}）")
+    parser.add_argument("--no-telemetry", action="store_true",
+                        help=f"不记录游戏数据统计（默认写到 {os.path.basename(TELEMETRY_DIR)}/ 目录）")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS),
+                        help="在通用布局上游戏（默认为经典网格游戏板；通用布局不支持提示、存档和录像）")
+    args = parser.parse_args()
+
+    ANIMATION_FPS = args.fps
+    init(args.patterns, args.solvable, args.record, args.profile, args.fullscreen, not args.no_telemetry,
+         args.layout)
+    try:
+        # 从主菜单开始，所有界面共用同一个主循环
+        SceneManager(scheduler, handle_global_event, draw_profiler_hud).run(MenuScene())
+    finally:
+        if args.startup_report:
+            print(startup_report())
+        if profiler.enabled:
+            path = profiler.disable()
+            if path is not None:
+                print(f"性能分析记录已保存到 {path}")
+        if save_writer is not None:
+            save_writer.close()  # 等最后一个检查点写入磁盘
+        if leaderboard is not None:
+            leaderboard.close()  # 等结算界面提交的记录写入数据库
+        if game_stats is not None:
+            game_stats.close()  # 写入缓冲中剩余的统计事件
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
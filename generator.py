@@ -0,0 +1,148 @@
+# 保证有解的牌局生成，以及在后台线程中为每个难度预先生成牌局的牌局池
+import collections
+import random
+import threading
+
+import numpy as np
+
+from core import COLS, NUM_PATTERNS, ROWS, SLOT_CAPACITY, generate_boards
+from layout import generate_tiles
+
+MAX_OPEN_GROUPS = 3  # 解的过程中槽里最多同时存在的未凑齐图案种类，越大越难
+POOL_SIZE = 2  # 每个难度预先生成的牌局数
+
+
+# 从一个解倒推出牌局：先随机决定取走图案的顺序（每个格子从上往下取），
+# 再沿着这个顺序分配图案，因此按这个顺序点击一定能清空游戏板
+def generate_solvable_boards(layers, rows=ROWS, cols=COLS, num_patterns=NUM_PATTERNS, rng=random,
+                             max_open=MAX_OPEN_GROUPS, slot_capacity=SLOT_CAPACITY):
+    # 取走顺序：每个格子出现 layers 次，第 k 次出现对应从上往下第 k 层
+    order = [cell for cell in range(rows * cols) for _ in range(layers)]
+    rng.shuffle(order)
+    patterns = _solution_patterns(len(order), num_patterns, rng, max_open, slot_capacity)
+
+    boards = np.empty((layers, rows, cols), dtype=np.int8)
+    taken = [0] * (rows * cols)
+    for cell, pattern in zip(order, patterns):
+        row, col = divmod(cell, cols)
+        boards[layers - 1 - taken[cell], row, col] = pattern
+        taken[cell] += 1
+    return boards
+
+
+# 通用布局的有解牌局：取走顺序是每次随机取一个未被遮挡的图案，借助布局的遮挡计数逐步更新
+def generate_solvable_tiles(layout, num_patterns=NUM_PATTERNS, rng=random,
+                            max_open=MAX_OPEN_GROUPS, slot_capacity=SLOT_CAPACITY):
+    covers = list(layout.covers)
+    free = [tile for tile, count in enumerate(covers) if count == 0]
+    order = []
+    while free:
+        index = rng.randrange(len(free))
+        free[index], free[-1] = free[-1], free[index]
+        tile = free.pop()
+        order.append(tile)
+        for other in layout.below[tile]:
+            covers[other] -= 1
+            if covers[other] == 0:
+                free.append(other)
+    patterns = _solution_patterns(len(order), num_patterns, rng, max_open, slot_capacity)
+
+    tiles = np.empty(len(layout), dtype=np.int8)
+    tiles[order] = patterns
+    return tiles
+
+
+# 沿着取走顺序为每一步分配图案，使槽里始终不超过 max_open 种未凑齐的图案。
+# 图案总数不是 3 的倍数时，最后剩下的几个留在槽里
+def _solution_patterns(total_tiles, num_patterns, rng, max_open, slot_capacity):
+    max_open = min(max_open, num_patterns, (slot_capacity - 1) // 2)
+
+    # 需要凑齐的组：每组 3 个，多出的图案单独成最后一组
+    groups = [3] * (total_tiles // 3)
+    if total_tiles % 3:
+        groups.append(total_tiles % 3)
+    next_group = 0
+    open_groups = []  # [图案, 已放入数量, 目标数量]
+
+    patterns = []
+    for _ in range(total_tiles):
+        can_open = next_group < len(groups) and len(open_groups) < max_open
+        if can_open and (not open_groups or rng.random() < 0.5):
+            used = {group[0] for group in open_groups}
+            pattern = rng.choice([p for p in range(num_patterns) if p not in used])
+            group = [pattern, 0, groups[next_group]]
+            next_group += 1
+            open_groups.append(group)
+        else:
+            group = rng.choice(open_groups)
+        group[1] += 1
+        if group[1] == group[2]:
+            open_groups.remove(group)
+        patterns.append(group[0])
+    return patterns
+
+
+# 根据种子生成牌局，相同的参数总是得到相同的牌局
+def make_boards(layers, seed, solvable=False, num_patterns=NUM_PATTERNS, rows=ROWS, cols=COLS):
+    rng = random.Random(seed)
+    if solvable:
+        return generate_solvable_boards(layers, rows, cols, num_patterns, rng)
+    return generate_boards(layers, rows, cols, num_patterns, rng)
+
+
+# 根据种子为通用布局生成图案
+def make_tiles(layout, seed, solvable=False, num_patterns=NUM_PATTERNS):
+    rng = random.Random(seed)
+    if solvable:
+        return generate_solvable_tiles(layout, num_patterns, rng)
+    return generate_tiles(layout, num_patterns, rng)
+
+
+class BoardPool:
+    # 后台线程为每个难度保持 size 个预先生成好的 (种子, 牌局)，开始游戏时直接取用
+    def __init__(self, difficulties, size=POOL_SIZE, solvable=True, num_patterns=NUM_PATTERNS):
+        self.difficulties = difficulties  # 难度 -> 层数
+        self.size = size
+        self.solvable = solvable
+        self.num_patterns = num_patterns
+        self.queues = {difficulty: collections.deque() for difficulty in difficulties}
+        self.condition = threading.Condition()
+        self.seeds = random.SystemRandom()
+        self.thread = None
+        self.stopped = False
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._fill, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def _generate(self, difficulty):
+        seed = self.seeds.getrandbits(32)
+        return seed, make_boards(self.difficulties[difficulty], seed, self.solvable, self.num_patterns)
+
+    def _fill(self):
+        while True:
+            with self.condition:
+                while not self.stopped and all(len(q) >= self.size for q in self.queues.values()):
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                difficulty = min(self.queues, key=lambda d: len(self.queues[d]))
+            item = self._generate(difficulty)  # 生成时不持有锁
+            with self.condition:
+                self.queues[difficulty].append(item)
+
+    # 取出一个牌局，池中暂时没有时当场生成
+    def take(self, difficulty):
+        with self.condition:
+            queue = self.queues[difficulty]
+            item = queue.popleft() if queue else None
+            self.condition.notify_all()
+        if item is None:
+            item = self._generate(difficulty)
+        return item
@@ -0,0 +1,184 @@
+# 通用布局：每个图案有任意的位置和层号，上层图案的矩形与下层图案重叠就会遮挡它，
+# 可以表达羊了个羊那样跨格子错开半格的摆法。均匀网格空间索引回答“哪些图案与这个区域重叠”，
+# 每个图案记录上方仍在的遮挡图案数，移除图案时只更新与它重叠的下层图案
+import random
+
+import numpy as np
+
+from core import COLS, EMPTY, NUM_PATTERNS, ROWS, SLOT_CAPACITY, TIME_LIMIT, Game, generate_boards
+
+SUBDIV = 2  # 每个格子划分的坐标单位数，2 表示图案可以错开半个格子；图案边长为 SUBDIV 个单位
+
+
+class Layout:
+    # positions 为 (层, x, y) 列表，坐标以格子的 1/SUBDIV 为单位。布局创建后不再改变，可被多局游戏共用
+    def __init__(self, positions):
+        # 图案编号按层、y、x 排序，编号顺序即从下到上的绘制顺序
+        positions = sorted(positions, key=lambda p: (p[0], p[2], p[1]))
+        self.layer = [layer for layer, _, _ in positions]
+        self.x = [x for _, x, _ in positions]
+        self.y = [y for _, _, y in positions]
+        self.layers = max(self.layer, default=-1) + 1
+        self.width = max(self.x, default=-SUBDIV) + SUBDIV  # 布局的宽和高（单位）
+        self.height = max(self.y, default=-SUBDIV) + SUBDIV
+
+        # 空间索引：边长为一个图案的网格桶，每个图案登记在左上角所在的桶中，
+        # 与某个矩形重叠的图案只可能位于它周围 3x3 个桶里
+        self.buckets = {}
+        for tile in range(len(positions)):
+            key = (self.x[tile] // SUBDIV, self.y[tile] // SUBDIV)
+            self.buckets.setdefault(key, []).append(tile)
+
+        # 遮挡关系：below[i] 为被图案 i 直接压住的图案，covers[i] 为压在图案 i 上方的图案数
+        self.below = [[] for _ in positions]
+        self.covers = [0] * len(positions)
+        for tile in range(len(positions)):
+            for other in self.overlapping(self.x[tile], self.y[tile]):
+                if self.layer[other] > self.layer[tile]:
+                    self.below[other].append(tile)
+                    self.covers[tile] += 1
+
+    def __len__(self):
+        return len(self.layer)
+
+    # 与左上角位于 (x, y) 的图案大小的矩形重叠的所有图案
+    def overlapping(self, x, y):
+        bx, by = x // SUBDIV, y // SUBDIV
+        result = []
+        for key_y in (by - 1, by, by + 1):
+            for key_x in (bx - 1, bx, bx + 1):
+                for tile in self.buckets.get((key_x, key_y), ()):
+                    if abs(self.x[tile] - x) < SUBDIV and abs(self.y[tile] - y) < SUBDIV:
+                        result.append(tile)
+        return result
+
+    # 包含点 (x, y) 的所有图案（坐标单位，可以是小数）
+    def tiles_at(self, x, y):
+        bx, by = int(x // SUBDIV), int(y // SUBDIV)
+        result = []
+        for key_y in (by - 1, by):
+            for key_x in (bx - 1, bx):
+                for tile in self.buckets.get((key_x, key_y), ()):
+                    if self.x[tile] <= x < self.x[tile] + SUBDIV and self.y[tile] <= y < self.y[tile] + SUBDIV:
+                        result.append(tile)
+        return result
+
+
+# 经典布局：每层都是 rows x cols 的整齐网格，只有同一格子上方的图案才会遮挡
+def grid_layout(layers, rows=ROWS, cols=COLS):
+    return Layout([(layer, col * SUBDIV, row * SUBDIV)
+                   for layer in range(layers) for row in range(rows) for col in range(cols)])
+
+
+# 错位布局：从最上层往下，每隔一层向右下错开半格并少一行一列，
+# 每个错开的图案同时压住下层相邻的四个图案
+def offset_layout(layers, rows=ROWS, cols=COLS):
+    half = SUBDIV // 2
+    positions = []
+    for layer in range(layers):
+        shift = half if (layers - 1 - layer) % 2 else 0
+        for row in range(rows - (1 if shift else 0)):
+            for col in range(cols - (1 if shift else 0)):
+                positions.append((layer, col * SUBDIV + shift, row * SUBDIV + shift))
+    return Layout(positions)
+
+
+LAYOUTS = {
+    "grid": grid_layout,
+    "offset": offset_layout,
+}
+
+
+# 为布局中的每个图案随机分配图案编号，规则与 generate_boards 相同
+def generate_tiles(layout, num_patterns=NUM_PATTERNS, rng=random):
+    return generate_boards(1, 1, len(layout), num_patterns, rng).reshape(-1)
+
+
+class LayoutGame(Game):
+    # 使用通用布局的一局游戏。图案的位置用 (编号,) 表示，与 Game 的 (层, 行, 列) 一样可以直接传给 pick，
+    # boards 是按编号保存图案的一维数组，因此批量模拟的策略函数不需要区分两种游戏
+    def __init__(self, layout, num_patterns=NUM_PATTERNS, slot_capacity=SLOT_CAPACITY, seed=None,
+                 time_limit=TIME_LIMIT, tiles=None):
+        self.layout = layout
+        self.layers = layout.layers
+        self.num_patterns = num_patterns
+        self.slot_capacity = slot_capacity
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if tiles is None:
+            tiles = generate_tiles(layout, num_patterns, self.rng)
+        self.boards = np.array(tiles, dtype=np.int8)
+        self.covers = list(layout.covers)  # 每个图案上方仍在的遮挡图案数
+        self.free = {tile for tile, count in enumerate(self.covers) if count == 0}  # 可以点击的图案
+        self.remaining = len(layout)
+        self._init_play(slot_capacity, num_patterns, time_limit)
+
+    def is_covered(self, tile):
+        return self.covers[tile] > 0
+
+    def uncovered_mask(self):
+        mask = np.zeros(len(self.boards), dtype=bool)
+        mask[list(self.free)] = True
+        return mask
+
+    # 当前所有可以点击的图案，按层、y、x 排序
+    def available_tiles(self):
+        return [(tile,) for tile in sorted(self.free)]
+
+    # 根据像素坐标找到被点中的最上层图案，返回 (编号,) 或 None；该图案可能仍被其他图案压住一部分。
+    # 布局中的位置就是真实位置，不再按层偏移，layer_offset 只为与 Game.tile_at 的参数一致
+    def tile_at(self, x, y, tile_size, layer_offset=0):
+        best = None
+        for tile in self.layout.tiles_at(x * SUBDIV / tile_size, y * SUBDIV / tile_size):
+            if self.boards[tile] != EMPTY and (best is None or tile > best):
+                best = tile  # 编号越大层越高
+        return None if best is None else (best,)
+
+    # 图案左上角的像素坐标；与 tile_at 一样不按层偏移
+    def tile_origin(self, tile, tile_size, layer_offset=0):
+        return self.layout.x[tile] * tile_size // SUBDIV, self.layout.y[tile] * tile_size // SUBDIV
+
+    # 布局中剩余的所有图案，按编号（即从下到上的绘制顺序）：返回图案编号、左上角的 x 和 y 三个数组
+    def tile_origins(self, tile_size, layer_offset=0):
+        tiles = np.flatnonzero(self.boards != EMPTY)
+        xs = np.take(self.layout.x, tiles) * tile_size // SUBDIV
+        ys = np.take(self.layout.y, tiles) * tile_size // SUBDIV
+        return self.boards[tiles], xs, ys
+
+    # 与图案重叠的剩余图案（包括它自己），由空间索引查出，按绘制顺序排列
+    def nearby_tiles(self, tile, tile_size, layer_offset=0):
+        layout = self.layout
+        return [(other,) for other in sorted(layout.overlapping(layout.x[tile], layout.y[tile]))
+                if self.boards[other] != EMPTY]
+
+    def is_free(self, tile):
+        return tile in self.free  # 已被取走或被遮挡时不在其中
+
+    def pick(self, tile):
+        if self._pick((tile,)):
+            self.redo_stack.clear()
+            return True
+        return False
+
+    # 移除图案，只更新它压住的下层图案，返回因此变为可点击的图案
+    def remove_tile(self, tile):
+        self.boards[tile] = EMPTY
+        self.remaining -= 1
+        self.free.discard(tile)
+        uncovered = []
+        for other in self.layout.below[tile]:
+            self.covers[other] -= 1
+            if self.covers[other] == 0:
+                self.free.add(other)
+                uncovered.append(other)
+        return uncovered
+
+    # 把取走的图案放回原处，它压住的图案重新被遮挡
+    def restore_tile(self, position, pattern):
+        tile, = position
+        self.boards[tile] = pattern
+        self.remaining += 1
+        self.free.add(tile)
+        for other in self.layout.below[tile]:
+            self.covers[other] += 1
+            self.free.discard(other)
@@ -0,0 +1,149 @@
+# 排行榜：SQLite 数据库保存每一局的完整记录（得分、用时、层数），按难度建立索引查询前 k 名。
+# 使用 WAL 模式和事务写入，多个游戏实例可以共享同一个本地数据库文件。
+# 游戏中通过 submit 在后台线程写入，其他实例持有写锁时渲染循环也不会等待
+import concurrent.futures
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    layers INTEGER,
+    seconds REAL,
+    result TEXT,
+    played_at REAL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (difficulty, score DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+BUSY_TIMEOUT = 5.0  # 其他实例正在写入时最多等待的秒数
+
+
+class Leaderboard:
+    # legacy_dir 不为 None 时，第一次打开数据库会导入该目录下旧版的排行榜文件
+    def __init__(self, path, legacy_dir=None, difficulties=None):
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self.difficulties = difficulties or {}
+        self.conn = None  # 第一次使用时才打开数据库
+        self.jobs = queue.Queue()  # 交给后台线程的 (Future, 记录的字段, 前 k 名)
+        self.thread = None  # 第一次 submit 时启动；之后数据库只在这个线程中使用
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self.conn = conn
+            if self.legacy_dir is not None:
+                self.import_legacy(self.legacy_dir, self.difficulties)
+        return self.conn
+
+    # 记录一局游戏
+    def record(self, difficulty, score, layers=None, seconds=None, result=None, played_at=None):
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO games (difficulty, score, layers, seconds, result, played_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (difficulty, score, layers, seconds, result, time.time() if played_at is None else played_at),
+            )
+
+    # 在后台线程中记录一局并读取该难度的前 k 名，返回 Future，结果为分数列表（从高到低）。
+    # 数据库出错时打印原因，结果为空列表
+    def submit(self, difficulty, score, layers=None, seconds=None, result=None, k=3):
+        future = concurrent.futures.Future()
+        self.jobs.put((future, (difficulty, score, layers, seconds, result), k))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self._close()
+                return
+            future, fields, k = job
+            try:
+                self.record(*fields)
+                scores = self.top_scores(fields[0], k)
+            except sqlite3.Error as e:
+                print(f"无法写入排行榜: {e}")
+                scores = []
+            future.set_result(scores)
+
+    # 指定难度的前 k 名分数，从高到低
+    def top_scores(self, difficulty, k=3):
+        rows = self._connect().execute(
+            "SELECT score FROM games WHERE difficulty = ? ORDER BY score DESC LIMIT ?", (difficulty, k))
+        return [score for score, in rows]
+
+    # 指定难度的历史记录，最近的在前
+    def history(self, difficulty, limit=100):
+        rows = self._connect().execute(
+            "SELECT score, layers, seconds, result, played_at FROM games "
+            "WHERE difficulty = ? ORDER BY id DESC LIMIT ?", (difficulty, limit))
+        return [dict(zip(("score", "layers", "seconds", "result", "played_at"), row)) for row in rows]
+
+    # 一次性导入旧版的 scores_{difficulty}.txt 文件，返回导入的记录数；
+    # 导入标记和数据在同一个事务中写入，多个实例同时启动也只会导入一次
+    def import_legacy(self, directory, difficulties):
+        conn = self._connect()
+        imported = 0
+        with _transaction(conn):
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+                return 0
+            for difficulty, layers in difficulties.items():
+                filename = os.path.join(directory, f"scores_{difficulty}.txt")
+                try:
+                    with open(filename, "r") as file:
+                        scores = [int(line) for line in file if line.strip()]
+                except (FileNotFoundError, ValueError):
+                    continue
+                conn.executemany(
+                    "INSERT INTO games (difficulty, score, layers) VALUES (?, ?, ?)",
+                    [(difficulty, score, layers) for score in scores])
+                imported += len(scores)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(time.time()),))
+        return imported
+
+    # 写完已提交的记录并关闭数据库
+    def close(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+        else:
+            self._close()
+
+    def _close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class _transaction:
+    # BEGIN IMMEDIATE 在事务开始时就获取写锁，避免多个实例并发写入时的更新丢失
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
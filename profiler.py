@@ -0,0 +1,106 @@
+# 性能分析：记录每帧各阶段（事件、逻辑、绘制、文字、提交到屏幕）的耗时，供游戏中的性能浮层显示，
+# 并导出为 Chrome 的 trace event JSON（在 chrome://tracing 或 https://ui.perfetto.dev 中打开）。
+# 默认关闭，关闭时每个区间只是一次方法调用加一个空的 with 语句，可以一直留在正式版本中
+import collections
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "YLGY_PROFILE"  # 环境变量设为 1 时启动即开启
+MAX_EVENTS = 200000  # 最多保留的区间数，超出时丢弃最早的
+HUD_FRAMES = 60  # 浮层统计最近多少帧
+FRAME = "frame"  # 整帧区间的名字
+
+
+class _NullSpan:
+    # 关闭时所有区间共用的空对象
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._add(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    def __init__(self, trace_path=None):
+        self.enabled = False
+        self.trace_path = trace_path  # 关闭时把区间写到这个文件
+        self.origin = time.perf_counter_ns()
+        self.events = collections.deque(maxlen=MAX_EVENTS)  # (名字, 开始, 结束, 线程)，单位纳秒
+        self.frames = collections.deque(maxlen=HUD_FRAMES)  # 最近每帧的 {阶段: 耗时}，包括整帧
+        self.current = {}  # 当前帧各阶段的累计耗时
+
+    # 计时一个阶段：with profiler.span("draw_board"): ...
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    # 计时整帧，结束时把这一帧各阶段的耗时计入浮层统计
+    def frame(self):
+        return self.span(FRAME)
+
+    def _add(self, name, start, end):
+        self.events.append((name, start, end, threading.get_ident()))
+        self.current[name] = self.current.get(name, 0) + end - start
+        if name == FRAME:
+            self.frames.append(self.current)
+            self.current = {}
+
+    def enable(self):
+        self.enabled = True
+
+    # 关闭并写出 trace 文件，返回写出的路径（没有区间或没有设置路径时返回 None）
+    def disable(self):
+        self.enabled = False
+        self.current = {}
+        if self.trace_path is None or not self.events:
+            return None
+        self.save_trace(self.trace_path)
+        return self.trace_path
+
+    # 最近若干帧的统计：[(阶段, 平均毫秒, 最大毫秒)]，整帧排在最前，其余按首次出现的顺序
+    def summary(self):
+        totals = {FRAME: []}
+        for phases in self.frames:
+            for name, ns in phases.items():
+                totals.setdefault(name, []).append(ns / 1e6)
+        count = len(self.frames) or 1
+        return [(name, sum(values) / count, max(values)) for name, values in totals.items() if values]
+
+    # Chrome trace event 格式：每个区间是一个完整事件（ph = "X"），时间单位为微秒
+    def trace(self):
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000,
+                   "pid": pid, "tid": tid} for name, start, end, tid in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_trace(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.trace(), file)
+
+
+# 全局共用的分析器，由前端设置 trace 文件路径并开关
+profiler = Profiler()
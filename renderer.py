@@ -0,0 +1,70 @@
+# 脏矩形渲染：背景和游戏板的所有层预先合成到一张缓存表面上，
+# 图案被移除时只重新合成受影响的区域，每帧只把变化的矩形提交给显示器。
+# 缓存与窗口一样大，图案按窗口的缩放比例放置；tile_size 和 layer_offset 是逻辑尺寸，
+# 脏矩形都是窗口像素。图案的位置和重叠关系由游戏提供，经典网格游戏板和通用布局（layout.py）都可以绘制
+import pygame
+
+
+class BoardRenderer:
+    # viewport 为窗口的 Viewport，patterns 为按它的比例缩放好的图案
+    def __init__(self, viewport, patterns, tile_size, layer_offset, bg_color):
+        self.viewport = viewport
+        self.patterns = patterns
+        self.tile_size = tile_size
+        self.layer_offset = layer_offset
+        self.bg_color = bg_color
+        self.cache = pygame.Surface(viewport.surface.get_size()).convert()  # 背景 + 游戏板的合成结果
+        self.dirty = []  # 尚未提交到屏幕的矩形
+        self.rects = {}  # 图案位置 -> 窗口中的矩形；窗口大小变化时整个渲染器重新创建
+
+    # position 处（(层, 行, 列)，通用布局为 (编号,)）图案在窗口中的矩形
+    def tile_rect(self, game, *position):
+        rect = self.rects.get(position)
+        if rect is None:
+            x, y = game.tile_origin(*position, self.tile_size, self.layer_offset)
+            rect = self.rects[position] = self.viewport.rect((x, y, self.tile_size, self.tile_size))
+        return rect
+
+    # 缓存是否仍然与窗口一样大（窗口大小变化后需要重新创建）
+    def matches(self, viewport):
+        return self.viewport is viewport and self.cache.get_size() == viewport.surface.get_size()
+
+    # 新的一局：完整合成一次缓存，并把整个屏幕标记为脏
+    def rebuild(self, game):
+        self.cache.fill(self.bg_color)
+        tiles, xs, ys = game.tile_origins(self.tile_size, self.layer_offset)
+        for tile, rect in zip(tiles.tolist(), self.viewport.rects(xs, ys, self.tile_size, self.tile_size)):
+            self.cache.blit(self.patterns[tile], rect)
+        self.invalidate()
+
+    # 整个屏幕需要重新提交（例如从其他界面返回）
+    def invalidate(self):
+        self.dirty = [self.cache.get_rect()]
+
+    # 把屏幕上的一块区域恢复为缓存内容（例如擦除提示框）
+    def mark_dirty(self, rect):
+        self.dirty.append(pygame.Rect(rect))
+
+    # 图案被移除或放回后，按游戏板的当前内容重新合成它占据的区域
+    def redraw_tile(self, game, *position):
+        region = self.tile_rect(game, *position)
+        self.cache.set_clip(region)
+        self.cache.fill(self.bg_color)
+        # 只有附近的少数图案可能与该区域重叠，按从下到上的顺序绘制，与完整绘制的遮挡关系一致
+        for other in game.nearby_tiles(*position, self.tile_size, self.layer_offset):
+            rect = self.tile_rect(game, *other)
+            if rect.colliderect(region):
+                self.cache.blit(self.patterns[game.boards[other]], rect)
+        self.cache.set_clip(None)
+        self.dirty.append(region)
+
+    # 把缓存中变化的区域复制到屏幕，返回这些矩形
+    def flush(self, screen):
+        dirty, self.dirty = self.dirty, []
+        for rect in dirty:
+            screen.blit(self.cache, rect, rect)
+        return dirty
+
+    # 用缓存内容擦除屏幕上的一块区域（例如倒计时文字下方）
+    def restore(self, screen, rect):
+        screen.blit(self.cache, rect, rect)
@@ -0,0 +1,218 @@
+# 录像与回放：每局保存种子、难度和带时间戳的输入流（点击坐标、提示键、撤销与重做、复活选择），
+# 时间以固定逻辑步数计，相对上一个输入差分编码为变长整数，一局通常只有几百字节。
+# 回放时用相同的种子重新生成牌局、在相同的逻辑时间送入相同的输入，结果与录制时完全一致。
+# 用法：python replay.py recordings/*.rec              只用核心规则快速回放并校验结果
+#       python replay.py game.rec --render             无窗口完整渲染，以最快速度回放并统计帧耗时
+#       python replay.py game.rec --realtime           打开窗口按原速度回放
+import argparse
+import glob
+import os
+import struct
+import time
+
+from core import DIFFICULTIES, LOST, PLAYING, REVIVE, TIMEOUT, WON, Game
+from generator import make_boards
+
+MAGIC = b"YLRP"
+VERSION = 1
+# 魔数、版本、种子、层数、图案种类数、是否有解生成、图案边长、层偏移、逻辑频率、时限、难度、
+# 结局、得分、步数、结束时的逻辑步数、输入数
+HEADER = struct.Struct("<4sBQBB?HHHH12sBIIII")
+STATES = [PLAYING, REVIVE, WON, LOST, TIMEOUT]
+
+# 输入类型
+CLICK = 1  # 鼠标点击，附带坐标
+HINT = 2  # 按 H 键请求提示
+REVIVE_ACCEPT = 3  # 看广告复活
+REVIVE_DECLINE = 4  # 放弃复活
+UNDO = 5  # 撤销上一步
+REDO = 6  # 重做
+COORDS = struct.Struct("<HH")
+
+
+class Recording:
+    def __init__(self, seed, difficulty, layers, num_patterns, solvable, tile_size, layer_offset,
+                 logic_hz, time_limit):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.layers = layers
+        self.num_patterns = num_patterns
+        self.solvable = solvable
+        self.tile_size = tile_size
+        self.layer_offset = layer_offset
+        self.logic_hz = logic_hz
+        self.time_limit = time_limit
+        self.events = []  # (逻辑步数, 类型, x, y)，按时间排序
+        self.result = (PLAYING, 0, 0, 0)  # 录制结束时的 (结局, 得分, 步数, 逻辑步数)
+
+    @property
+    def step_ms(self):
+        return 1000 / self.logic_hz
+
+    # 用录制时的参数重新创建这一局
+    def new_game(self):
+        boards = make_boards(self.layers, self.seed, self.solvable, self.num_patterns)
+        return Game(self.layers, num_patterns=self.num_patterns, seed=self.seed,
+                    time_limit=self.time_limit, boards=boards)
+
+    # 记录一个输入，elapsed 为游戏已用时间（毫秒）
+    def add(self, elapsed, kind, x=0, y=0):
+        self.events.append((round(elapsed / self.step_ms), kind, x, y))
+
+    # 记录这一局的最终结果
+    def finish(self, game):
+        self.result = (game.state, game.score, game.moves, round(game.elapsed / self.step_ms))
+
+    def encode(self):
+        state, score, moves, steps = self.result
+        parts = [HEADER.pack(MAGIC, VERSION, self.seed, self.layers, self.num_patterns, self.solvable,
+                             self.tile_size, self.layer_offset, self.logic_hz, self.time_limit,
+                             self.difficulty.encode(), STATES.index(state), score, moves, steps,
+                             len(self.events))]
+        last = 0
+        for step, kind, x, y in self.events:
+            parts.append(varint(step - last))
+            parts.append(bytes([kind]))
+            if kind == CLICK:
+                parts.append(COORDS.pack(x, y))
+            last = step
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data):
+        (magic, version, seed, layers, num_patterns, solvable, tile_size, layer_offset, logic_hz, time_limit,
+         difficulty, state, score, moves, steps, count) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不是有效的录像文件")
+        recording = cls(seed, difficulty.rstrip(b"\0").decode(), layers, num_patterns, solvable,
+                        tile_size, layer_offset, logic_hz, time_limit)
+        recording.result = (STATES[state], score, moves, steps)
+        offset = HEADER.size
+        step = 0
+        for _ in range(count):
+            delta, offset = read_varint(data, offset)
+            step += delta
+            kind = data[offset]
+            offset += 1
+            x = y = 0
+            if kind == CLICK:
+                x, y = COORDS.unpack_from(data, offset)
+                offset += COORDS.size
+            recording.events.append((step, kind, x, y))
+        return recording
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.decode(file.read())
+
+
+# 无符号变长整数：每字节 7 位，最高位表示后面还有字节
+def varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+# 从 data[offset] 读取一个变长整数，返回 (值, 下一个字节的位置)
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# 把游戏推进到第 step 个逻辑步
+def advance_to(game, recording, step):
+    target = step * recording.step_ms
+    if target > game.elapsed:
+        game.advance(target - game.elapsed)
+
+
+# 只用核心规则回放，不需要 pygame，返回回放结束时的游戏
+def play(recording):
+    game = recording.new_game()
+    for step, kind, x, y in recording.events:
+        advance_to(game, recording, step)
+        if game.finished:
+            break
+        if kind == CLICK:
+            tile = game.tile_at(x, y, recording.tile_size, recording.layer_offset)
+            if tile is not None:
+                game.pick(*tile)
+        elif kind in (REVIVE_ACCEPT, REVIVE_DECLINE) and game.state == REVIVE:
+            game.revive(kind == REVIVE_ACCEPT)
+        elif kind == UNDO:
+            game.undo()
+        elif kind == REDO:
+            game.redo()
+    if not game.finished:
+        advance_to(game, recording, recording.result[3])
+    return game
+
+
+# 回放结果是否与录制时一致
+def matches(recording, game):
+    state, score, moves, _ = recording.result
+    return (game.state, game.score, game.moves) == (state, score, moves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录像")
+    parser.add_argument("paths", nargs="+", help="录像文件或目录")
+    parser.add_argument("--render", action="store_true", help="经过完整的渲染流程回放，统计帧耗时")
+    parser.add_argument("--realtime", action="store_true", help="打开窗口，按录制时的速度回放（包含 --render）")
+    args = parser.parse_args()
+    args.render = args.render or args.realtime
+
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(glob.glob(os.path.join(path, "*.rec"))) if os.path.isdir(path) else [path])
+
+    if args.render:
+        if not args.realtime:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import game as frontend  # 需要 pygame，只在渲染回放时导入
+        frontend.init()
+
+    failed = 0
+    for path in paths:
+        recording = Recording.load(path)
+        if recording.difficulty not in DIFFICULTIES:
+            print(f"{path}: 未知难度 {recording.difficulty}")
+            failed += 1
+            continue
+        start = time.perf_counter()
+        if args.render:
+            game, frame_times = frontend.run_replay(recording, args.realtime)
+        else:
+            game, frame_times = play(recording), []
+        elapsed = (time.perf_counter() - start) * 1000
+        ok = matches(recording, game)
+        failed += not ok
+        line = (f"{path}: {recording.difficulty} 种子 {recording.seed} 输入 {len(recording.events)} 个，"
+                f"结局 {game.state} 得分 {game.score}，{'一致' if ok else '与录制时不一致'}，耗时 {elapsed:.1f} ms")
+        if frame_times:
+            frame_times.sort()
+            line += (f"\n    {len(frame_times)} 帧，平均 {sum(frame_times) / len(frame_times):.2f} ms，"
+                     f"p95 {frame_times[int(len(frame_times) * 0.95)]:.2f} ms，最大 {frame_times[-1]:.2f} ms")
+        print(line)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# 存档与续玩：每一局的存档是一个只追加的文件。开头记录牌局参数（种子、难度、层数、图案种类数、是否有解生成），
+# 之后每个检查点追加一帧：自上一个检查点以来的操作（取走的位置、撤销、重做、复活选择）和当前已用时间。
+# 一帧只有几个字节，写入量与棋盘大小无关；写文件和 fsync 在后台线程中完成，不占用渲染帧。
+# 续玩时用种子重新生成牌局并依次重放操作；断电时只写了一半的最后一帧会被忽略
+import os
+import queue
+import struct
+import threading
+
+from core import Game
+from generator import make_boards
+from replay import read_varint, varint
+
+MAGIC = b"YLSV"
+VERSION = 1
+# 魔数、版本、种子、层数、图案种类数、是否有解生成、难度
+HEADER = struct.Struct("<4sBQBB?12s")
+
+# 操作类型
+PICK = 1  # 取走一个图案，附带层、行、列各一个字节
+UNDO = 2
+REDO = 3
+REVIVE_ACCEPT = 4
+REVIVE_DECLINE = 5
+
+
+class CheckpointWriter:
+    # 后台写入线程：按提交的顺序追加、截断或删除存档文件，每次写入后 fsync
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    # 把 data 写入 path；truncate 为 True 时覆盖原文件，否则追加
+    def write(self, path, data, truncate=False):
+        self.jobs.put((path, data, truncate))
+
+    def delete(self, path):
+        self.jobs.put((path, None, False))
+
+    # 等待所有已提交的写入完成
+    def flush(self):
+        self.jobs.join()
+
+    # 写完所有已提交的存档并停止后台线程
+    def close(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            path, data, truncate = job
+            try:
+                if data is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    with open(path, "wb" if truncate else "ab") as file:
+                        file.write(data)
+                        file.flush()
+                        os.fsync(file.fileno())
+            except OSError as e:
+                print(f"无法写入存档 {path}: {e}")
+            finally:
+                self.jobs.task_done()
+
+
+class SaveGame:
+    def __init__(self, path, writer, seed, difficulty, layers, num_patterns, solvable):
+        self.path = path
+        self.writer = writer
+        self.seed = seed
+        self.difficulty = difficulty
+        self.layers = layers
+        self.num_patterns = num_patterns
+        self.solvable = solvable
+        self.pending = bytearray()  # 尚未写入检查点的操作
+        self.saved_elapsed = 0.0  # 上一个检查点的游戏时间（毫秒）
+
+    # 新的一局：覆盖旧存档，写入牌局参数
+    def start(self):
+        self.writer.write(self.path, HEADER.pack(MAGIC, VERSION, self.seed, self.layers, self.num_patterns,
+                                                 self.solvable, self.difficulty.encode()), truncate=True)
+
+    # 用存档中的参数重新创建这一局
+    def new_game(self):
+        boards = make_boards(self.layers, self.seed, self.solvable, self.num_patterns)
+        return Game(self.layers, num_patterns=self.num_patterns, seed=self.seed, boards=boards)
+
+    def add(self, kind, position=()):
+        self.pending.append(kind)
+        self.pending.extend(position)
+
+    # 追加一个检查点：新增的操作和当前游戏时间，长度前缀用来识别写了一半的帧
+    def checkpoint(self, elapsed):
+        payload = varint(int(elapsed)) + bytes(self.pending)
+        self.writer.write(self.path, varint(len(payload)) + payload)
+        self.pending.clear()
+        self.saved_elapsed = elapsed
+
+    # 这一局已经结束，删除存档
+    def discard(self):
+        self.pending.clear()
+        self.writer.delete(self.path)
+
+
+# 读取存档并重放到最后一个完整的检查点，返回 (SaveGame, Game)；之后的检查点继续追加到同一个文件
+def load(path, writer):
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, seed, layers, num_patterns, solvable, difficulty = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("不是有效的存档文件")
+    save = SaveGame(path, writer, seed, difficulty.rstrip(b"\0").decode(), layers, num_patterns, solvable)
+    game = save.new_game()
+
+    offset = HEADER.size
+    while offset < len(data):
+        try:
+            length, start = read_varint(data, offset)
+        except IndexError:
+            break
+        end = start + length
+        if end > len(data):
+            break  # 断电时写了一半的帧
+        elapsed, pos = read_varint(data, start)
+        while pos < end:
+            kind = data[pos]
+            if kind == PICK:
+                game.pick(*data[pos + 1:pos + 4])
+                pos += 4
+                continue
+            pos += 1
+            if kind == UNDO:
+                game.undo()
+            elif kind == REDO:
+                game.redo()
+            elif kind in (REVIVE_ACCEPT, REVIVE_DECLINE):
+                game.revive(kind == REVIVE_ACCEPT)
+            else:
+                raise ValueError(f"存档中有未知的操作 {kind}")
+        game.elapsed = save.saved_elapsed = float(elapsed)
+        offset = end
+    return save, game
@@ -0,0 +1,124 @@
+# 场景管理：整个程序只有一个主循环，主菜单、游戏、复活、广告和结算界面都是显式的场景对象。
+# 切换场景时依次调用旧场景的 exit 和新场景的 enter，离开的场景在 exit 中释放自己持有的状态，
+# 因此不论连续玩多少局，调用栈深度和内存占用都保持不变
+import pygame
+
+from profiler import profiler
+
+
+class Scene:
+    fps = None  # 动画场景的目标帧率；为 None 时是静态场景，没有事件时阻塞等待
+
+    def __init__(self):
+        self.manager = None  # 进入场景时由 SceneManager 设置
+
+    # 成为当前场景时调用
+    def enter(self):
+        pass
+
+    # 离开场景（被替换、弹出或程序退出）时调用，释放场景持有的状态
+    def exit(self):
+        pass
+
+    # 上层场景弹出后，重新成为当前场景时调用
+    def resume(self):
+        pass
+
+    # 推进场景逻辑并绘制一帧
+    def update(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    # 静态场景两次更新之间最多等待的毫秒数，0 表示一直等到有事件为止
+    def wait_ms(self):
+        return 0
+
+
+class SceneManager:
+    # 场景栈：游戏场景被复活、广告场景覆盖时仍然保留，其余切换都替换栈顶的场景。
+    # 切换请求先记录下来，在下一次循环开始时统一执行，场景的回调中不会嵌套进入另一个场景
+    def __init__(self, scheduler, on_event=None, overlay=None):
+        self.scheduler = scheduler
+        self.on_event = on_event  # 每个事件先交给它处理（例如音轨切换）
+        self.overlay = overlay  # 每次场景绘制之后调用，在最上层绘制（例如性能浮层）
+        self.stack = []
+        self.pending = []  # 尚未执行的切换请求 (操作, 场景)
+
+    @property
+    def scene(self):
+        return self.stack[-1] if self.stack else None
+
+    # 用新场景替换当前场景
+    def switch(self, scene):
+        self.pending.append(("switch", scene))
+
+    # 把新场景压在当前场景上方，当前场景保留
+    def push(self, scene):
+        self.pending.append(("push", scene))
+
+    # 关闭当前场景，回到下方的场景
+    def pop(self):
+        self.pending.append(("pop", None))
+
+    # 关闭所有场景，结束主循环
+    def quit(self):
+        self.pending.append(("quit", None))
+
+    def _apply(self):
+        while self.pending:
+            op, scene = self.pending.pop(0)
+            if op == "quit":
+                while self.stack:
+                    self.stack.pop().exit()
+                self.pending.clear()
+                return
+            if op != "push" and self.stack:
+                self.stack.pop().exit()
+            if op == "pop":
+                if self.stack:
+                    self.stack[-1].resume()
+            else:
+                scene.manager = self
+                self.stack.append(scene)
+                scene.enter()
+
+    # 主循环的一次迭代：执行切换请求，更新当前场景，再收集并分发事件。没有场景时返回 False
+    def step(self):
+        with profiler.frame():
+            return self._step()
+
+    def _step(self):
+        if self.pending:
+            with profiler.span("switch_scene"):
+                self._apply()
+        scene = self.scene
+        if scene is None:
+            return False
+        with profiler.span("update"):
+            scene.update()
+        if self.overlay is not None:
+            self.overlay()
+        if self.pending:
+            return True  # 场景已请求切换，不再等待
+        with profiler.span("event_pump"):
+            if scene.fps is None:
+                events = self.scheduler.wait(scene.wait_ms())
+            else:
+                self.scheduler.tick(scene.fps)
+                events = pygame.event.get()
+        with profiler.span("handle_event"):
+            for event in events:
+                if self.on_event is not None:
+                    self.on_event(event)
+                if event.type == pygame.QUIT:
+                    self.quit()
+                elif not self.pending:
+                    scene.handle_event(event)  # 请求切换之后，剩余的事件不再交给旧场景
+        return True
+
+    def run(self, scene):
+        self.switch(scene)
+        while self.step():
+            pass
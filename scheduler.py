@@ -0,0 +1,85 @@
+# 帧调度：整个程序共用一个时钟。游戏逻辑按固定步长推进，与渲染帧率无关；
+# 静态界面（主菜单、复活界面）阻塞等待事件，有变化时才重绘。同时统计帧耗时和空闲比例
+import time
+
+import pygame
+
+LOGIC_HZ = 60  # 游戏逻辑的固定更新频率
+STATS_WINDOW = 60  # 统计最近多少帧
+
+
+class FrameScheduler:
+    def __init__(self, logic_hz=LOGIC_HZ):
+        self.clock = pygame.time.Clock()
+        self.step_ms = 1000 / logic_hz  # 每个逻辑步长的毫秒数
+        self.accumulator = 0.0  # 尚未消耗的逻辑时间
+        self.frame_times = []  # 最近若干帧的总耗时（毫秒）
+        self.busy_times = []  # 其中实际工作（非等待）的耗时
+        self.last_frame = time.perf_counter()
+
+    # 渲染循环每帧调用一次，限制帧率并返回这一帧经过的毫秒数
+    def tick(self, fps):
+        busy = (time.perf_counter() - self.last_frame) * 1000
+        dt = self.clock.tick(fps)
+        self.last_frame = time.perf_counter()
+        self._record(dt, min(busy, dt))
+        self.accumulator += dt
+        return dt
+
+    # 本帧需要执行的固定步长逻辑更新次数
+    def fixed_steps(self):
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        return steps
+
+    # 开始新的固定步长计时（例如新的一局开始时），丢弃之前积累的时间
+    def reset(self):
+        self.accumulator = 0.0
+        self.clock.tick()
+        self.last_frame = time.perf_counter()
+
+    # 静态界面：阻塞等待下一个事件，返回本次取到的所有事件；
+    # timeout 毫秒内没有事件时返回空列表，timeout 为 0 表示一直等待
+    def wait(self, timeout=0):
+        start = time.perf_counter()
+        busy = (start - self.last_frame) * 1000
+        event = pygame.event.wait(timeout) if timeout > 0 else pygame.event.wait()
+        self.last_frame = time.perf_counter()
+        dt = self.clock.tick()  # 阻塞的时间同样计入逻辑时间
+        self._record(dt, min(busy, dt))
+        self.accumulator += dt
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def _record(self, frame_ms, busy_ms):
+        self.frame_times.append(frame_ms)
+        self.busy_times.append(busy_ms)
+        if len(self.frame_times) > STATS_WINDOW:
+            del self.frame_times[0]
+            del self.busy_times[0]
+
+    # 这一帧开始的时刻（毫秒）；补间动画按它插值，与帧率和逻辑步长无关
+    @property
+    def now_ms(self):
+        return self.last_frame * 1000
+
+    # 最近若干帧的平均帧耗时（毫秒）
+    @property
+    def frame_time(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    @property
+    def fps(self):
+        frame_time = self.frame_time
+        return 1000 / frame_time if frame_time else 0.0
+
+    # 最近若干帧中等待（空闲）时间所占的百分比
+    @property
+    def idle_percent(self):
+        total = sum(self.frame_times)
+        if not total:
+            return 0.0
+        return 100 * (1 - sum(self.busy_times) / total)
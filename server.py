@@ -0,0 +1,272 @@
+# 多会话游戏服务器：一个进程内用 asyncio 托管成千上万局互相独立的游戏，供浏览器和手机客户端（经由网关）使用。
+# 每个会话只保存核心规则的状态（游戏板、槽、计时和复活标记），规则与单机版完全相同（Game.pick）。
+# 没有逐局的循环：游戏时间在收到消息时按实际经过的时间补齐，超时由事件循环的定时器堆统一触发，
+# 复活界面期间暂停计时。
+#
+# 协议：本地 TCP 或 Unix 套接字上每行一个 JSON 对象。请求可以带 "id"，回复原样带回，便于在一个连接上并发多个请求；
+# 每个连接可以开多局，连接断开时这些局一起释放。
+#   {"op": "new", "difficulty": "hell", "seed": 可选}      -> {"ok", "session", "seed", "layers", "rows", "cols",
+#                                                              "board": 按层、行、列展开的图案编号（-1 为空）, "seconds_left"}
+#   {"op": "click", "session": 1, "tile": [层, 行, 列]}    -> {"ok", "picked", "matched", "state", "score", "slot",
+#                                                              "seconds_left"}
+#   {"op": "revive", "session": 1, "accept": true}        -> {"ok", "state", "seconds_left"}
+#   {"op": "state", "session": 1}                         -> {"ok", "state", "score", "moves", "slot", "seconds_left"}
+#   {"op": "close", "session": 1}                         -> {"ok"}
+#   {"op": "stats"}                                       -> {"ok", "sessions", "moves", "cpu", "uptime"}
+# 出错时回复 {"ok": false, "error": 原因}。超时由服务器主动推送 {"event": "timeout", "session", "score"}
+# 用法：python server.py --port 8765
+#       python server.py --unix /tmp/ylgy.sock --solvable
+#       python server.py --telemetry telemetry/       把每个会话的统计事件写到该目录（见 telemetry.py）
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from core import DIFFICULTIES, NUM_PATTERNS, PLAYING, REVIVE, Game
+from generator import make_boards
+from telemetry import GameTracker, Telemetry
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_SESSIONS = 100000  # 同时存在的会话上限
+WRITE_BUFFER_LIMIT = 64 * 1024  # 发送缓冲超过这个大小时等待客户端读取
+
+
+# 一条消息编码为一行 JSON
+def encode_line(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class Session:
+    __slots__ = ("id", "difficulty", "game", "writer", "last", "timer", "tracker")
+
+    def __init__(self, session_id, difficulty, game, writer, now):
+        self.id = session_id
+        self.difficulty = difficulty
+        self.game = game
+        self.writer = writer  # 推送超时通知的连接
+        self.last = now  # 游戏时间补齐到的时刻（事件循环时间，秒）
+        self.timer = None  # 超时定时器
+        self.tracker = None  # 数据统计，服务器没有开启统计时为 None
+
+    # 把游戏时间补齐到 now；复活界面期间不计时（由 Game.advance 处理）
+    def sync(self, now):
+        self.game.advance((now - self.last) * 1000)
+        self.last = now
+
+    # 距离超时还有多少毫秒
+    def remaining_ms(self):
+        return self.game.time_limit * 1000 - self.game.elapsed
+
+    def cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class GameServer:
+    def __init__(self, solvable=False, num_patterns=NUM_PATTERNS, max_sessions=MAX_SESSIONS, telemetry=None):
+        self.solvable = solvable
+        self.num_patterns = num_patterns
+        self.max_sessions = max_sessions
+        self.telemetry = telemetry  # Telemetry，为 None 时不统计
+        self.sessions = {}  # 会话编号 -> Session
+        self.next_id = 1
+        self.seeds = random.SystemRandom()
+        self.moves = 0  # 所有会话累计的点击数
+        self.started = time.monotonic()
+        self.loop = None
+        self.handlers = {
+            "new": self.new_session,
+            "click": self.click,
+            "revive": self.revive,
+            "state": self.state,
+            "close": self.close,
+            "stats": self.stats,
+        }
+
+    async def handle_connection(self, reader, writer):
+        owned = set()  # 这个连接开的会话
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 一行超过了 StreamReader 的长度上限，剩下的部分无法与下一个请求区分，回复错误后断开
+                    writer.write(encode_line({"ok": False, "error": "请求过长"}))
+                    break
+                if not line:
+                    break
+                reply = self.handle_line(line, writer, owned)
+                writer.write(encode_line(reply))
+                if writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.drop(session_id)
+            writer.close()
+
+    # 处理一行请求，返回回复
+    def handle_line(self, line, writer, owned):
+        message = None
+        try:
+            message = json.loads(line)
+            handler = self.handlers[message["op"]]
+            reply = handler(message, writer, owned)
+            reply["ok"] = True
+        except KeyError as e:
+            reply = {"ok": False, "error": f"缺少字段或未知的值: {e}"}
+        except (ValueError, TypeError, AttributeError) as e:
+            reply = {"ok": False, "error": str(e)}
+        if isinstance(message, dict) and "id" in message:
+            reply["id"] = message["id"]
+        return reply
+
+    def session(self, message, owned):
+        session_id = message["session"]
+        if session_id not in owned:
+            raise ValueError(f"没有会话 {session_id}")
+        session = self.sessions[session_id]
+        session.sync(self.loop.time())
+        if session.game.finished:
+            session.cancel_timer()  # 补齐时间时已经超时，回复中会带上结局
+        return session
+
+    def new_session(self, message, writer, owned):
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("服务器已满")
+        difficulty = message.get("difficulty", "easy")
+        layers = DIFFICULTIES[difficulty]
+        seed = message.get("seed")
+        if seed is None:
+            seed = self.seeds.getrandbits(32)
+        boards = make_boards(layers, seed, self.solvable, self.num_patterns)
+        game = Game(layers, num_patterns=self.num_patterns, seed=seed, boards=boards)
+        game.rng = None  # 牌局已经生成，不再需要每局的随机数生成器，节省内存
+
+        session = Session(self.next_id, difficulty, game, writer, self.loop.time())
+        if self.telemetry is not None:
+            session.tracker = GameTracker(self.telemetry, difficulty, game)
+        self.next_id += 1
+        self.sessions[session.id] = session
+        owned.add(session.id)
+        self.schedule_timeout(session)
+        return {"session": session.id, "seed": seed, "layers": layers, "rows": game.rows, "cols": game.cols,
+                "board": game.boards.reshape(-1).tolist(), "seconds_left": game.seconds_left}
+
+    def click(self, message, writer, owned):
+        session = self.session(message, owned)
+        game = session.game
+        layer, row, col = map(int, message["tile"])
+        if not (0 <= layer < game.layers and 0 <= row < game.rows and 0 <= col < game.cols):
+            raise ValueError(f"位置超出游戏板: {message['tile']}")
+        picked = game.pick(layer, row, col)
+        if picked:
+            self.moves += 1
+            if session.tracker is not None:
+                session.tracker.moved(game)
+            if game.state != PLAYING:
+                session.cancel_timer()  # 进入复活界面或这一局结束
+        return {"picked": picked, "matched": game.last_matched if picked else [], "state": game.state,
+                "score": game.score, "slot": list(game.slot), "seconds_left": game.seconds_left}
+
+    def revive(self, message, writer, owned):
+        session = self.session(message, owned)
+        game = session.game
+        if game.state != REVIVE:
+            raise ValueError("当前不能复活")
+        accept = bool(message["accept"])
+        if session.tracker is not None:
+            session.tracker.revived(accept)
+        if game.revive(accept):
+            self.schedule_timeout(session)
+        return {"state": game.state, "seconds_left": game.seconds_left}
+
+    def state(self, message, writer, owned):
+        game = self.session(message, owned).game
+        return {"state": game.state, "score": game.score, "moves": game.moves, "slot": list(game.slot),
+                "seconds_left": game.seconds_left}
+
+    def close(self, message, writer, owned):
+        session_id = message["session"]
+        if session_id in owned:
+            owned.discard(session_id)
+            self.drop(session_id)
+        return {}
+
+    def stats(self, message, writer, owned):
+        return {"sessions": len(self.sessions), "moves": self.moves, "cpu": time.process_time(),
+                "uptime": time.monotonic() - self.started}
+
+    def drop(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.cancel_timer()
+            if session.tracker is not None:
+                session.sync(self.loop.time())
+                session.tracker.ended(session.game)
+
+    # 在这一局剩余时间用完时触发超时；所有会话的定时器都在事件循环的同一个堆里
+    def schedule_timeout(self, session):
+        session.cancel_timer()
+        session.last = self.loop.time()
+        delay = max(session.remaining_ms(), 0) / 1000
+        session.timer = self.loop.call_at(session.last + delay, self.expire, session)
+
+    def expire(self, session):
+        session.timer = None
+        if self.sessions.get(session.id) is not session:
+            return
+        session.sync(self.loop.time())
+        if session.game.state == PLAYING:
+            session.game.advance(max(session.remaining_ms(), 0))  # 补上定时器的舍入误差
+        if session.game.state == PLAYING:
+            self.schedule_timeout(session)
+            return
+        writer = session.writer
+        if not writer.is_closing():
+            notice = {"event": "timeout", "session": session.id, "score": session.game.score}
+            writer.write(encode_line(notice))
+
+    async def serve(self, host=HOST, port=PORT, unix=None):
+        self.loop = asyncio.get_running_loop()
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, unix)
+            print(f"游戏服务器已启动: {unix}", flush=True)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"游戏服务器已启动: {host}:{server.sockets[0].getsockname()[1]}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多会话游戏服务器")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="监听 Unix 套接字而不是 TCP 端口")
+    parser.add_argument("--solvable", action="store_true", help="只生成保证有解的牌局")
+    parser.add_argument("--patterns", type=int, default=NUM_PATTERNS, help="图案种类数")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--telemetry", metavar="DIR", help="把每个会话的统计事件写到这个目录")
+    args = parser.parse_args()
+
+    telemetry = None
+    if args.telemetry:
+        telemetry = Telemetry(args.telemetry)
+        telemetry.start()
+    server = GameServer(args.solvable, args.patterns, args.max_sessions, telemetry)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# 批量模拟：在进程池中用脚本策略或随机策略自动对局，用于调整难度和回归测试
+# 用法：python simulate.py --difficulty hell --games 10000 --policy greedy
+import argparse
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from core import DIFFICULTIES, NUM_PATTERNS, Game, PLAYING, REVIVE, WON
+from generator import make_boards, make_tiles
+from layout import LAYOUTS, LayoutGame
+
+
+# 策略函数接收当前局面和可点击的图案位置列表，返回要点击的位置
+# 随机策略：在所有可点击的图案中随机选择
+def random_policy(game, tiles, rng):
+    return rng.choice(tiles)
+
+
+# 贪心策略：优先选择槽中已有数量最多的图案，否则随机选择
+def greedy_policy(game, tiles, rng):
+    ids = game.boards[tuple(np.array(tiles).T)]
+    in_slot = np.asarray(game.slot.counts)[ids]
+    candidates = np.flatnonzero(in_slot == in_slot.max())
+    return tiles[candidates[rng.randrange(len(candidates))]]
+
+
+# 脚本策略：总是点击扫描顺序中的第一个可点击图案，结果完全确定
+def first_policy(game, tiles, rng):
+    return tiles[0]
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "first": first_policy,
+}
+
+
+_layouts = {}  # (布局名, 层数) -> Layout，每个进程只构建一次
+
+
+# 创建一局游戏：layout 为 None 时使用经典的网格游戏板，否则使用 LAYOUTS 中的通用布局
+def make_game(layers, seed, solvable=False, num_patterns=NUM_PATTERNS, layout=None):
+    if layout is None:
+        boards = make_boards(layers, seed, solvable, num_patterns)
+        return Game(layers, num_patterns=num_patterns, seed=seed, boards=boards)
+    key = (layout, layers)
+    if key not in _layouts:
+        _layouts[key] = LAYOUTS[layout](layers)
+    tiles = make_tiles(_layouts[key], seed, solvable, num_patterns)
+    return LayoutGame(_layouts[key], num_patterns=num_patterns, seed=seed, tiles=tiles)
+
+
+# 进行一局游戏，返回结果摘要
+def play_game(layers, seed, policy="random", revive=True, solvable=False, num_patterns=NUM_PATTERNS,
+              layout=None):
+    choose = POLICIES[policy]
+    game = make_game(layers, seed, solvable, num_patterns, layout)
+    rng = random.Random(seed)
+    while not game.finished:
+        if game.state == REVIVE:
+            game.revive(revive)
+            continue
+        tiles = game.available_tiles()
+        if game.state != PLAYING or not tiles:
+            break
+        game.pick(*choose(game, tiles, rng))
+    return {
+        "seed": seed,
+        "won": game.state == WON,
+        "state": game.state,
+        "score": game.score,
+        "moves": game.moves,
+    }
+
+
+def _play_chunk(args):
+    layers, seeds, policy, revive, solvable, num_patterns, layout = args
+    return [play_game(layers, seed, policy, revive, solvable, num_patterns, layout) for seed in seeds]
+
+
+# 在进程池中批量对局，种子为 seed, seed + 1, ..., seed + games - 1
+def run_batch(difficulty, games, policy="random", seed=0, processes=None, revive=True, chunk_size=200,
+              solvable=False, num_patterns=NUM_PATTERNS, layout=None):
+    layers = DIFFICULTIES[difficulty]
+    seeds = list(range(seed, seed + games))
+    chunks = [(layers, seeds[i:i + chunk_size], policy, revive, solvable, num_patterns, layout)
+              for i in range(0, games, chunk_size)]
+    results = []
+    with multiprocessing.Pool(processes) as pool:
+        for chunk in pool.imap_unordered(_play_chunk, chunks):
+            results.extend(chunk)
+    results.sort(key=lambda r: r["seed"])
+    return results
+
+
+# 汇总批量对局结果
+def summarize(results):
+    games = len(results)
+    wins = sum(1 for r in results if r["won"])
+    states = {}
+    for r in results:
+        states[r["state"]] = states.get(r["state"], 0) + 1
+    return {
+        "games": games,
+        "win_rate": wins / games if games else 0.0,
+        "avg_score": sum(r["score"] for r in results) / games if games else 0.0,
+        "avg_moves": sum(r["moves"] for r in results) / games if games else 0.0,
+        "states": states,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量模拟对局")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="easy")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--no-revive", action="store_true", help="槽溢出时放弃复活")
+    parser.add_argument("--solvable", action="store_true", help="使用保证有解的牌局")
+    parser.add_argument("--patterns", type=int, default=NUM_PATTERNS, help="图案种类数")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), help="使用通用布局（默认为经典网格游戏板）")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(args.difficulty, args.games, args.policy, args.seed, args.processes, not args.no_revive,
+                        solvable=args.solvable, num_patterns=args.patterns, layout=args.layout)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+
+    print(f"难度: {args.difficulty}  策略: {args.policy}  对局数: {summary['games']}")
+    print(f"胜率: {summary['win_rate']:.2%}  平均得分: {summary['avg_score']:.1f}  "
+          f"平均步数: {summary['avg_moves']:.1f}")
+    print(f"结局分布: {summary['states']}")
+    print(f"耗时: {elapsed:.2f}s  ({summary['games'] / elapsed:.0f} 局/秒)")
+
+
+if __name__ == "__main__":
+    main()
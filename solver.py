@@ -0,0 +1,206 @@
+# 求解器：在游戏板和槽的模型上做深度优先搜索，判断当前局面能否清空游戏板。
+# 局面用 Zobrist 哈希表示，已证明无解的局面记在置换表中；槽溢出的走法直接剪枝。
+# 搜索可以分多次进行（每次限定节点数或时间），在游戏中作为提示功能按帧推进。
+# 离线用法：python solver.py --games 50 --node-limit 200000
+import argparse
+import random
+import time
+
+from core import DIFFICULTIES, EMPTY, NUM_PATTERNS, Game
+from generator import make_boards
+
+ZOBRIST_SEED = 20240101
+TABLE_LIMIT = 2_000_000  # 置换表最多保存的局面数，超出后清空
+
+
+class Solver:
+    def __init__(self, game):
+        self.rows = game.rows
+        self.cols = game.cols
+        self.capacity = game.slot.capacity
+        cells = game.rows * game.cols
+        # 每个格子的图案栈（从下到上）和当前高度；游戏中每个格子只能取走最上层的图案
+        self.stacks = []
+        self.heights = []
+        for row in range(game.rows):
+            for col in range(game.cols):
+                top = int(game.top[row, col])
+                stack = [int(tile) for tile in game.boards[:top + 1, row, col]]
+                assert EMPTY not in stack
+                self.stacks.append(stack)
+                self.heights.append(len(stack))
+        self.root_heights = list(self.heights)
+        self.counts = list(game.slot.counts)
+        self.size = len(game.slot)
+        self.remaining = game.remaining
+
+        # Zobrist 随机数：每个 (格子, 高度) 和每个 (图案, 槽中数量) 各一个
+        rng = random.Random(ZOBRIST_SEED)
+        max_height = max(self.heights, default=0) + 1
+        self.z_height = [[rng.getrandbits(64) for _ in range(max_height)] for _ in range(cells)]
+        self.z_count = [[rng.getrandbits(64) for _ in range(3)] for _ in range(len(self.counts))]
+        self.hash = 0
+        for cell, height in enumerate(self.heights):
+            self.hash ^= self.z_height[cell][height]
+        for tile, count in enumerate(self.counts):
+            self.hash ^= self.z_count[tile][count]
+
+        self.dead = set()  # 置换表：已证明无解的局面
+        self.path = []  # 当前搜索路径上的走法 (格子, 图案, 是否消除)
+        self.best_path = []  # 目前取走图案最多的路径
+        self.frames = [self._moves()]  # 显式的搜索栈，每层是 [候选走法, 下一个下标]
+        self.nodes = 0
+        self.solution = None
+        self.done = self.remaining == 0
+        if self.done:
+            self.solution = []
+
+    # 当前局面的候选走法，按优先级排序：能凑齐三个的优先，其次是槽中已有的图案，再其次是较高的格子
+    def _moves(self):
+        moves = []
+        room = self.capacity - self.size
+        for cell, height in enumerate(self.heights):
+            if height:
+                tile = self.stacks[cell][height - 1]
+                count = self.counts[tile]
+                if room <= 0 and count < 2:
+                    continue  # 槽已满，只有凑齐三个的走法不会溢出
+                moves.append((-count, -height, cell))
+        moves.sort()
+        return [[cell for _, _, cell in moves], 0]
+
+    def _apply(self, cell):
+        height = self.heights[cell]
+        tile = self.stacks[cell][height - 1]
+        self.heights[cell] = height - 1
+        self.hash ^= self.z_height[cell][height] ^ self.z_height[cell][height - 1]
+        self.remaining -= 1
+        count = self.counts[tile]
+        matched = count == 2
+        new_count = 0 if matched else count + 1
+        self.counts[tile] = new_count
+        self.hash ^= self.z_count[tile][count] ^ self.z_count[tile][new_count]
+        self.size += -2 if matched else 1
+        self.path.append((cell, tile, matched))
+
+    def _undo(self):
+        cell, tile, matched = self.path.pop()
+        height = self.heights[cell]
+        self.heights[cell] = height + 1
+        self.hash ^= self.z_height[cell][height] ^ self.z_height[cell][height + 1]
+        self.remaining += 1
+        count = self.counts[tile]
+        old_count = 2 if matched else count - 1
+        self.counts[tile] = old_count
+        self.hash ^= self.z_count[tile][count] ^ self.z_count[tile][old_count]
+        self.size += 2 if matched else -1
+
+    # 继续搜索，最多扩展 max_nodes 个节点或用时 max_ms 毫秒，返回搜索是否已结束
+    def step(self, max_nodes=None, max_ms=None):
+        deadline = None if max_ms is None else time.perf_counter() + max_ms / 1000
+        budget = max_nodes
+        frames = self.frames
+        while frames and not self.done:
+            # 每次循环都检查用时（剪枝和回溯也算），读时钟的开销远小于扩展一个节点
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            moves, index = frames[-1]
+            if index == len(moves):
+                # 所有走法都失败，记录为无解局面并回溯
+                self.dead.add(self.hash)
+                frames.pop()
+                if self.path:
+                    self._undo()
+                continue
+            frames[-1][1] = index + 1
+            self._apply(moves[index])
+            if self.size > self.capacity or self.hash in self.dead:
+                self._undo()
+                continue
+
+            self.nodes += 1
+            if len(self.path) > len(self.best_path):
+                self.best_path = list(self.path)
+            if self.remaining == 0:
+                self.solution = list(self.path)
+                self.done = True
+                break
+            frames.append(self._moves())
+
+            if len(self.dead) > TABLE_LIMIT:
+                self.dead.clear()
+            if budget is not None:
+                budget -= 1
+                if budget <= 0:
+                    break
+        if not frames:
+            self.done = True  # 搜索完毕，没有解
+        return self.done
+
+    # 是否已证明无解
+    @property
+    def unsolvable(self):
+        return self.done and self.solution is None
+
+    # 把格子编号转换为搜索开始时该格子最上层图案的 (层, 行, 列)
+    def _position(self, cell):
+        return self.root_heights[cell] - 1, cell // self.cols, cell % self.cols
+
+    # 当前最好的提示：找到解时返回解的第一步，否则返回目前走得最远的路径的第一步
+    def hint(self):
+        path = self.solution if self.solution is not None else self.best_path
+        if not path:
+            return None
+        return self._position(path[0][0])
+
+    # 完整的解（按顺序点击的 (层, 行, 列)），尚未找到时返回 None
+    def moves(self):
+        if self.solution is None:
+            return None
+        heights = list(self.root_heights)
+        moves = []
+        for cell, _, _ in self.solution:
+            heights[cell] -= 1
+            moves.append((heights[cell], cell // self.cols, cell % self.cols))
+        return moves
+
+
+# 求解一个新局面，返回 (是否有解, 是否在节点上限内得出结论, 扩展的节点数)
+def solve(game, node_limit=None):
+    solver = Solver(game)
+    solver.step(node_limit)
+    return solver.solution is not None, solver.done, solver.nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计各难度牌局的可解率和求解速度")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), action="append",
+                        help="只统计指定难度，可重复指定；默认统计全部难度")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--node-limit", type=int, default=200_000, help="每局最多扩展的节点数")
+    parser.add_argument("--solvable", action="store_true", help="使用保证有解的牌局生成器")
+    parser.add_argument("--patterns", type=int, default=NUM_PATTERNS, help="图案种类数")
+    args = parser.parse_args()
+
+    print(f"{'难度':<10} {'可解':>6} {'无解':>6} {'未知':>6} {'节点/秒':>10}")
+    for difficulty in args.difficulty or DIFFICULTIES:
+        solved = unsolvable = nodes = 0
+        start = time.perf_counter()
+        layers = DIFFICULTIES[difficulty]
+        for seed in range(args.seed, args.seed + args.games):
+            boards = make_boards(layers, seed, args.solvable, args.patterns)
+            game = Game(layers, num_patterns=args.patterns, seed=seed, boards=boards)
+            found, finished, count = solve(game, args.node_limit)
+            nodes += count
+            if found:
+                solved += 1
+            elif finished:
+                unsolvable += 1
+        elapsed = time.perf_counter() - start
+        unknown = args.games - solved - unsolvable
+        print(f"{difficulty:<10} {solved:>6} {unsolvable:>6} {unknown:>6} {nodes / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# 游戏数据统计：每局的开始、每一步（距上一步的游戏时间、槽中图案数）、复活选择和结局（原因、导致失败的图案）
+# 写成紧凑的事件，用于调整关卡难度。
+# 记录事件只是往内存中的环形缓冲追加一个元组，不做任何 I/O；后台线程定期把缓冲写入本地的 gzip 文件，
+# 文件按大小和日期轮换，只保留最近的若干个。写入跟不上时丢弃新的事件并计数，不会阻塞渲染循环。
+# 每次写入是一个独立的 gzip 成员，程序崩溃时最多丢失最后一次写入。
+#
+# 事件（每行一个 JSON 数组，时间为 Unix 秒）：
+#   ["s", 时间, 局, 难度, 层数, 种子, 图案种类数, 是否从存档继续]
+#   ["m", 时间, 局, 距上一步的毫秒数, 槽中图案数, 是否凑齐消除]
+#   ["r", 时间, 局, 是否看广告复活]
+#   ["e", 时间, 局, 结局, 原因, 得分, 步数, 用时毫秒, 导致失败的图案]
+# 原因：won、timeout（超时）、slot（复活后槽又满了）、declined（放弃复活）、quit（中途退出）
+#
+# 用法：python telemetry.py telemetry/                       汇总目录下的所有文件，按难度输出统计
+#       python telemetry.py telemetry/ --since 2026-10-01 --json
+import argparse
+import collections
+import glob
+import gzip
+import json
+import os
+import random
+import threading
+import time
+
+from core import LOST, REVIVE, TIMEOUT, WON
+
+BUFFER_EVENTS = 4096  # 环形缓冲最多容纳的事件数，写满后丢弃新事件
+FLUSH_SECONDS = 5.0  # 后台线程每隔多少秒写一次
+MAX_FILE_BYTES = 256 * 1024  # 单个文件（压缩后）超过这个大小时换新文件
+MAX_FILES = 500  # 最多保留的文件数，超出时删除最旧的
+FILE_SUFFIX = ".jsonl.gz"
+MOVE_BIN_MS = 100  # 汇总时每步耗时的直方图精度
+MAX_MOVE_BIN = 600  # 超过 60 秒的一步都计入最后一格
+
+
+class Telemetry:
+    def __init__(self, directory, capacity=BUFFER_EVENTS, flush_seconds=FLUSH_SECONDS,
+                 max_file_bytes=MAX_FILE_BYTES, max_files=MAX_FILES):
+        self.directory = directory
+        self.capacity = capacity
+        self.flush_seconds = flush_seconds
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.buffer = collections.deque()  # 尚未写入的事件；追加和取出都是线程安全的
+        self.emitted = 0
+        self.dropped = 0  # 缓冲已满而丢弃的事件数
+        self.written = 0
+        self.path = None  # 正在写入的文件
+        self.day = None  # 正在写入的文件所属的日期
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    # 记录一个事件（事件类型和各字段），缓冲已满时直接丢弃
+    def emit(self, kind, *fields):
+        if len(self.buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self.buffer.append((kind, int(time.time())) + fields)
+        self.emitted += 1
+        if len(self.buffer) == self.capacity // 2:
+            self.wake.set()  # 缓冲过半，提前写入
+
+    # 写入剩余的事件并停止后台线程
+    def close(self):
+        self.closed = True
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        else:
+            self._flush()
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_seconds)
+            self.wake.clear()
+            self._flush()
+            if self.closed:
+                return
+
+    def _flush(self):
+        events = []
+        while self.buffer:
+            events.append(self.buffer.popleft())
+        if not events:
+            return
+        data = "".join(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n" for event in events)
+        try:
+            with gzip.open(self._current_path(), "ab") as file:
+                file.write(data.encode())
+            self.written += len(events)
+        except OSError as e:
+            self.dropped += len(events)
+            print(f"无法写入统计数据 {self.path}: {e}")
+
+    # 当前应该写入的文件：日期变化或文件太大时换新文件，并删除超出数量的旧文件
+    def _current_path(self):
+        day = time.strftime("%Y%m%d")
+        if (self.path is None or day != self.day or
+                (os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_file_bytes)):
+            os.makedirs(self.directory, exist_ok=True)
+            self.day = day
+            self.path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{FILE_SUFFIX}")
+            old_files = list_files(self.directory)
+            for old in old_files[:max(len(old_files) - self.max_files + 1, 0)]:  # 加上新文件不超过 max_files 个
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        return self.path
+
+
+class GameTracker:
+    # 一局游戏的统计：由前端在开始、每一步、复活选择和离开时调用，换算成事件
+    def __init__(self, telemetry, difficulty, game, resumed=False):
+        self.telemetry = telemetry
+        self.session = random.getrandbits(48)  # 局的编号，多个实例的文件放在一起汇总时也不会重复
+        self.last_move = game.elapsed
+        self.declined = False
+        self.cause = None  # 让槽满的那个图案
+        telemetry.emit("s", self.session, difficulty, game.layers, game.seed, game.num_patterns, resumed)
+
+    # 成功取走一个图案之后
+    def moved(self, game):
+        if game.state in (REVIVE, LOST):
+            self.cause = game.history[-1][1]
+        self.telemetry.emit("m", self.session, round(game.elapsed - self.last_move), len(game.slot),
+                            bool(game.last_matched))
+        self.last_move = game.elapsed
+
+    def revived(self, accept):
+        self.declined = not accept
+        self.telemetry.emit("r", self.session, accept)
+
+    # 这一局结束或中途离开
+    def ended(self, game):
+        if game.state == WON:
+            reason = "won"
+        elif game.state == TIMEOUT:
+            reason = "timeout"
+        elif game.state == LOST:
+            reason = "declined" if self.declined else "slot"
+        else:
+            reason = "quit"
+        self.telemetry.emit("e", self.session, game.state, reason, game.score, game.moves, round(game.elapsed),
+                            self.cause if reason in ("slot", "declined") else None)
+
+
+# 目录下的统计文件，按文件名（即创建时间）排序
+def list_files(directory):
+    return sorted(glob.glob(os.path.join(directory, "*" + FILE_SUFFIX)))
+
+
+# 逐行读取一个文件中的事件；崩溃时写了一半的最后一个 gzip 成员被忽略
+def read_events(path):
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                yield json.loads(line)
+    except (EOFError, gzip.BadGzipFile, json.JSONDecodeError, OSError):
+        return
+
+
+class DifficultyStats:
+    # 一个难度的汇总，只保存计数和直方图，内存占用与事件数无关
+    def __init__(self):
+        self.games = 0
+        self.resumed = 0
+        self.results = collections.Counter()  # 原因 -> 局数
+        self.score = 0
+        self.moves = 0
+        self.elapsed_ms = 0
+        self.move_bins = collections.Counter()  # 每步耗时（MOVE_BIN_MS 一格）-> 步数
+        self.slot = collections.Counter()  # 每一步之后槽中的图案数 -> 步数
+        self.matched = 0
+        self.revive_offers = 0
+        self.revive_accepted = 0
+        self.loss_patterns = collections.Counter()  # 导致失败的图案 -> 局数
+
+    def start(self, resumed):
+        if resumed:
+            self.resumed += 1
+        else:
+            self.games += 1
+
+    def move(self, move_ms, slot, matched):
+        self.move_bins[min(move_ms // MOVE_BIN_MS, MAX_MOVE_BIN)] += 1
+        self.slot[slot] += 1
+        self.matched += matched
+
+    def revive(self, accept):
+        self.revive_offers += 1
+        self.revive_accepted += accept
+
+    def end(self, reason, score, moves, elapsed_ms, cause):
+        self.results[reason] += 1
+        self.score += score
+        self.moves += moves
+        self.elapsed_ms += elapsed_ms
+        if cause is not None:
+            self.loss_patterns[cause] += 1
+
+    # 每步耗时的分位数（毫秒，精确到直方图的一格）
+    def move_percentile(self, fraction):
+        total = sum(self.move_bins.values())
+        if not total:
+            return 0
+        seen = 0
+        for bin_index in sorted(self.move_bins):
+            seen += self.move_bins[bin_index]
+            if seen >= fraction * total:
+                return (bin_index + 1) * MOVE_BIN_MS
+        return MAX_MOVE_BIN * MOVE_BIN_MS
+
+    def summary(self):
+        ended = sum(self.results.values())
+        steps = sum(self.slot.values())
+        finished = ended - self.results["quit"]
+        return {
+            "games": self.games,
+            "resumed": self.resumed,
+            "ended": ended,
+            "results": dict(self.results),
+            "win_rate": self.results["won"] / finished if finished else 0.0,
+            "avg_score": self.score / ended if ended else 0.0,
+            "avg_moves": self.moves / ended if ended else 0.0,
+            "avg_seconds": self.elapsed_ms / ended / 1000 if ended else 0.0,
+            "move_ms_p50": self.move_percentile(0.5),
+            "move_ms_p90": self.move_percentile(0.9),
+            "avg_slot": sum(size * count for size, count in self.slot.items()) / steps if steps else 0.0,
+            "slot_histogram": {size: self.slot[size] for size in sorted(self.slot)},
+            "match_rate": self.matched / steps if steps else 0.0,
+            "revive_offers": self.revive_offers,
+            "revive_accept_rate": self.revive_accepted / self.revive_offers if self.revive_offers else 0.0,
+            "loss_patterns": dict(self.loss_patterns.most_common()),
+        }
+
+
+# 一遍扫描所有文件，按难度汇总；只为尚未结束的局记住它的难度
+def aggregate(paths):
+    stats = collections.defaultdict(DifficultyStats)
+    sessions = {}  # 局 -> 难度
+    events = 0
+    for path in paths:
+        for event in read_events(path):
+            events += 1
+            kind, session = event[0], event[2]
+            if kind == "s":
+                sessions[session] = event[3]
+                stats[event[3]].start(event[7])
+                continue
+            difficulty = sessions.get(session)
+            if difficulty is None:
+                continue  # 开始事件在更早、已经删除的文件中
+            if kind == "m":
+                stats[difficulty].move(*event[3:6])
+            elif kind == "r":
+                stats[difficulty].revive(event[3])
+            elif kind == "e":
+                del sessions[session]
+                stats[difficulty].end(*event[4:9])
+    return events, {difficulty: stats[difficulty].summary() for difficulty in sorted(stats)}
+
+
+# 文件名开头的日期在 [since, until] 之内（YYYY-MM-DD，None 表示不限）
+def in_range(path, since, until):
+    day = os.path.basename(path)[:8]
+    return ((since is None or day >= since.replace("-", "")) and
+            (until is None or day <= until.replace("-", "")))
+
+
+def print_summary(difficulty, summary):
+    print(f"== {difficulty}：{summary['games']} 局（另有 {summary['resumed']} 次从存档继续），"
+          f"胜率 {summary['win_rate']:.1%}")
+    print("   结局: " + "，".join(f"{reason} {count}" for reason, count in summary["results"].items()))
+    print(f"   平均得分 {summary['avg_score']:.0f}，平均 {summary['avg_moves']:.1f} 步，"
+          f"平均用时 {summary['avg_seconds']:.1f} 秒")
+    print(f"   每步耗时 p50 {summary['move_ms_p50']} ms，p90 {summary['move_ms_p90']} ms；"
+          f"槽中平均 {summary['avg_slot']:.2f} 个图案，{summary['match_rate']:.1%} 的点击凑齐消除")
+    print("   槽中图案数分布: " + "  ".join(f"{size}:{count}" for size, count in summary["slot_histogram"].items()))
+    print(f"   复活: {summary['revive_offers']} 次，接受 {summary['revive_accept_rate']:.1%}")
+    if summary["loss_patterns"]:
+        print("   导致失败的图案: " + "  ".join(f"{tile}:{count}" for tile, count in summary["loss_patterns"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按难度汇总游戏统计数据")
+    parser.add_argument("paths", nargs="+", help="统计文件或目录")
+    parser.add_argument("--since", help="只统计这一天（YYYY-MM-DD）及以后的文件")
+    parser.add_argument("--until", help="只统计这一天（YYYY-MM-DD）及以前的文件")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        paths.extend(list_files(path) if os.path.isdir(path) else [path])
+    paths = [path for path in paths if in_range(path, args.since, args.until)]
+
+    start = time.perf_counter()
+    events, summaries = aggregate(paths)
+    if args.json:
+        print(json.dumps(summaries, ensure_ascii=False, indent=2))
+        return
+    print(f"{len(paths)} 个文件，{events} 个事件，耗时 {time.perf_counter() - start:.2f} 秒")
+    for difficulty, summary in summaries.items():
+        print_summary(difficulty, summary)
+
+
+if __name__ == "__main__":
+    main()
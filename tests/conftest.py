@@ -0,0 +1,5 @@
+# 测试在没有显示器和声卡的环境中运行：pygame 使用 SDL 的虚拟驱动
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,159 @@
+import random
+
+import numpy as np
+import pytest
+
+from core import EMPTY, LOST, PLAYING, REVIVE, SCORE_PER_TILE, TIMEOUT, WON, Game, Slot, generate_boards
+from layout import LayoutGame, offset_layout
+
+
+# 单层、一行的游戏板，图案从左到右依次为 tiles
+def row_game(tiles, num_patterns=5, slot_capacity=7):
+    return Game(1, rows=1, cols=len(tiles), num_patterns=num_patterns, slot_capacity=slot_capacity,
+                boards=np.array([[tiles]]))
+
+
+def test_slot_groups_same_patterns_and_matches_three():
+    slot = Slot(capacity=7, num_patterns=3)
+    assert not slot.add(0)
+    assert not slot.add(1)
+    assert not slot.add(0)
+    assert list(slot) == [0, 0, 1]
+    assert slot.add(0)
+    assert list(slot) == [1]
+    assert len(slot) == 1
+
+
+def test_slot_unmatch_restores_group_position():
+    slot = Slot(capacity=7, num_patterns=3)
+    for tile in (2, 2, 1):
+        slot.add(tile)
+    index = slot.groups.index(2)
+    slot.add(2)
+    slot.unmatch(2, index)
+    assert list(slot) == [2, 2, 1]
+    assert len(slot) == 3
+
+
+def test_slot_remove_and_overflow():
+    slot = Slot(capacity=2, num_patterns=3)
+    for tile in (0, 1, 2):
+        slot.add(tile)
+    assert slot.is_full and slot.overflow
+    slot.remove(2)
+    assert list(slot) == [0, 1]
+    assert not slot.overflow
+    with pytest.raises(ValueError):
+        slot.remove(2)
+
+
+def test_generate_boards_uses_every_pattern_evenly():
+    boards = generate_boards(8, 15, 15, num_patterns=5, rng=random.Random(1))
+    assert boards.dtype == np.int8
+    assert np.bincount(boards.reshape(-1), minlength=5).tolist() == [360] * 5
+
+
+def test_pick_only_takes_uncovered_tiles():
+    boards = np.array([[[0, 1]], [[2, EMPTY]]])
+    game = Game(2, rows=1, cols=2, boards=boards)
+    assert not game.pick(0, 0, 0)  # 被第 1 层的图案压住
+    assert game.pick(1, 0, 0)
+    assert game.pick(0, 0, 0)
+    assert list(game.slot) == [2, 0]
+    assert game.score == 2 * SCORE_PER_TILE
+    assert not game.pick(0, 0, 0)  # 已经取走
+
+
+def test_matching_last_tiles_wins():
+    game = row_game([3, 3, 3])
+    for col in range(3):
+        assert game.pick(0, 0, col)
+    assert game.last_matched == [3]
+    assert len(game.slot) == 0
+    assert game.state == WON
+
+
+def test_overflow_asks_for_revive_once():
+    game = row_game([0, 1, 2, 3, 4], slot_capacity=2)
+    for col in range(3):
+        game.pick(0, 0, col)
+    assert game.state == REVIVE
+    assert not game.pick(0, 0, 3)  # 等待复活时不能点击
+    assert game.revive(True)
+    assert game.state == PLAYING
+    game.pick(0, 0, 3)
+    assert game.state == LOST  # 只有一次复活机会
+
+
+def test_undo_unmatches_and_redo_matches_again():
+    game = row_game([1, 0, 1, 1, 2])
+    for col in range(4):
+        game.pick(0, 0, col)
+    assert list(game.slot) == [0]
+    assert game.undo() == (0, 0, 3)
+    assert list(game.slot) == [1, 1, 0]
+    assert game.boards[0, 0, 3] == 1
+    assert game.score == 3 * SCORE_PER_TILE
+    assert game.redo() == (0, 0, 3)
+    assert list(game.slot) == [0]
+    assert game.moves == 4
+
+
+def test_new_pick_clears_redo():
+    game = row_game([0, 1, 2])
+    game.pick(0, 0, 0)
+    game.undo()
+    game.pick(0, 0, 1)
+    assert game.redo() is None
+
+
+def test_overflow_waits_for_revive_and_undo_keeps_the_chance():
+    game = row_game([0, 1, 2, 3], slot_capacity=2)
+    for col in range(3):
+        game.pick(0, 0, col)
+    assert game.state == REVIVE
+    assert game.undo() == (0, 0, 2)
+    assert game.state == PLAYING
+    assert not game.revive_used
+    game.pick(0, 0, 3)
+    assert game.state == REVIVE
+    game.revive(False)
+    assert game.state == LOST
+    assert game.undo() is None
+
+
+def test_clock_stops_while_waiting_for_revive():
+    game = row_game([0, 1, 2, 3], slot_capacity=2)
+    game.advance(1000)
+    for col in range(3):
+        game.pick(0, 0, col)
+    game.advance(game.time_limit * 1000)
+    assert game.state == REVIVE
+    assert game.elapsed == 1000
+    game.revive(True)
+    game.advance(game.time_limit * 1000)
+    assert game.state == TIMEOUT
+
+
+def test_tile_at_finds_the_highest_tile_under_the_point():
+    game = Game(3, seed=7)
+    for layer, row, col in game.available_tiles():
+        x, y = game.tile_origin(layer, row, col, 100, 5)
+        hit = game.tile_at(x + 99, y + 99, 100, 5)
+        assert hit is not None and hit[0] >= layer
+    assert game.tile_at(-1, 0, 100, 5) is None
+
+
+def test_layout_game_uncovers_tiles_and_undoes():
+    game = LayoutGame(offset_layout(2, rows=3, cols=3), num_patterns=3, seed=1)
+    free = set(game.available_tiles())
+    assert all(game.layout.layer[tile] == 1 for tile, in free)
+    tile, = min(free)
+    x, y = game.tile_origin(tile, 100)
+    assert game.tile_at(x + 50, y + 50, 100) == (tile,)
+    assert game.pick(tile)
+    assert (tile,) not in game.available_tiles()
+    covered = [other for other in game.layout.below[tile] if game.covers[other] == 0]
+    assert all((other,) in game.available_tiles() for other in covered)
+    game.undo()
+    assert set(game.available_tiles()) == free
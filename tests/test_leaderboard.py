@@ -0,0 +1,44 @@
+import sqlite3
+import time
+
+from leaderboard import Leaderboard
+
+
+def test_top_scores_by_difficulty(tmp_path):
+    board = Leaderboard(str(tmp_path / "scores.db"))
+    for score in (30, 90, 60, 10):
+        board.record("easy", score)
+    board.record("hell", 500)
+    assert board.top_scores("easy") == [90, 60, 30]
+    assert board.history("hell")[0]["score"] == 500
+    board.close()
+
+
+def test_legacy_scores_are_imported_once(tmp_path):
+    (tmp_path / "scores_easy.txt").write_text("40\n70\n")
+    path = str(tmp_path / "scores.db")
+    board = Leaderboard(path, str(tmp_path), {"easy": 2})
+    assert board.top_scores("easy") == [70, 40]
+    board.close()
+    board = Leaderboard(path, str(tmp_path), {"easy": 2})
+    assert board.top_scores("easy", 5) == [70, 40]
+    board.close()
+
+
+# 另一个实例持有写锁时，submit 立即返回，锁释放后在后台完成写入
+def test_submit_does_not_wait_for_the_write_lock(tmp_path):
+    path = str(tmp_path / "scores.db")
+    board = Leaderboard(path)
+    board.submit("easy", 10).result(timeout=5)
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    start = time.perf_counter()
+    future = board.submit("easy", 80, 2, 12.5, "won")
+    assert time.perf_counter() - start < 0.05
+    time.sleep(0.2)
+    assert not future.done()
+    other.execute("COMMIT")
+    other.close()
+    assert future.result(timeout=5) == [80, 10]
+    board.close()
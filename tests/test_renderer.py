@@ -0,0 +1,58 @@
+import random
+
+import pygame
+import pytest
+
+from core import Game
+from layout import LayoutGame, offset_layout
+from renderer import BoardRenderer
+from viewport import Viewport
+
+TILE_SIZE = 100
+LAYER_OFFSET = 5
+BG_COLOR = (30, 30, 30)
+
+
+@pytest.fixture
+def viewport():
+    pygame.display.init()
+    viewport = Viewport((700, 850), TILE_SIZE)
+    viewport.resize(pygame.display.set_mode((1050, 1275)))  # 1.5 倍缩放
+    yield viewport
+    pygame.display.quit()
+
+
+# 每种图案一张纯色图片
+def pattern_images(viewport, count):
+    images = []
+    for tile in range(count):
+        image = pygame.Surface(viewport.scaled_size(TILE_SIZE, TILE_SIZE)).convert()
+        image.fill((40 * tile + 20, 255 - 30 * tile, 60 + 25 * tile))
+        image.fill((0, 0, 0), image.get_rect().inflate(-20, -20))  # 边框和中间颜色不同，遮挡关系画错时看得出来
+        images.append(image)
+    return images
+
+
+# 每次取走或放回图案后，只重绘受影响区域的缓存应与完整合成的结果一致
+@pytest.mark.parametrize("make_game", [
+    lambda: Game(4, seed=5),
+    lambda: LayoutGame(offset_layout(4), seed=5),
+], ids=["grid", "layout"])
+def test_redraw_tile_matches_full_rebuild(viewport, make_game):
+    game = make_game()
+    patterns = pattern_images(viewport, game.num_patterns)
+    renderer = BoardRenderer(viewport, patterns, TILE_SIZE, LAYER_OFFSET, BG_COLOR)
+    renderer.rebuild(game)
+    rng = random.Random(1)
+    for _ in range(30):
+        if game.history and rng.random() < 0.3:
+            position = game.undo()
+        else:
+            position = rng.choice(game.available_tiles())
+            game.pick(*position)
+        if position is None or game.finished:
+            break
+        renderer.redraw_tile(game, *position)
+        expected = BoardRenderer(viewport, patterns, TILE_SIZE, LAYER_OFFSET, BG_COLOR)
+        expected.rebuild(game)
+        assert pygame.image.tobytes(renderer.cache, "RGB") == pygame.image.tobytes(expected.cache, "RGB")
@@ -0,0 +1,52 @@
+import pytest
+
+import replay
+from core import PLAYING
+from replay import CLICK, HINT, REDO, REVIVE_ACCEPT, UNDO, Recording
+
+
+def new_recording(seed=3):
+    return Recording(seed, "hell", 4, 5, False, 100, 5, 60, 120)
+
+
+def test_encode_decode_round_trip():
+    recording = new_recording()
+    recording.add(0, CLICK, 12, 340)
+    recording.add(250, HINT)
+    recording.add(1000, UNDO)
+    recording.add(1000, REDO)
+    recording.add(70000, REVIVE_ACCEPT)
+    recording.add(70500, CLICK, 699, 0)
+    recording.result = ("lost", 120, 12, 4300)
+
+    decoded = Recording.decode(recording.encode())
+    assert decoded.events == recording.events
+    assert decoded.result == recording.result
+    assert (decoded.seed, decoded.difficulty, decoded.layers, decoded.num_patterns, decoded.solvable,
+            decoded.tile_size, decoded.layer_offset, decoded.logic_hz, decoded.time_limit) == \
+        (3, "hell", 4, 5, False, 100, 5, 60, 120)
+
+
+def test_decode_rejects_other_files():
+    data = bytearray(new_recording().encode())
+    data[:4] = b"YLSV"
+    with pytest.raises(ValueError):
+        Recording.decode(bytes(data))
+
+
+def test_play_reproduces_the_recorded_game():
+    recording = new_recording(seed=11)
+    game = recording.new_game()
+    while game.state == PLAYING:
+        layer, row, col = game.available_tiles()[-1]
+        x, y = game.tile_origin(layer, row, col, recording.tile_size, recording.layer_offset)
+        game.advance(400)
+        recording.add(game.elapsed, CLICK, x + 50, y + 50)
+        tile = game.tile_at(x + 50, y + 50, recording.tile_size, recording.layer_offset)
+        if tile is not None:
+            game.pick(*tile)
+    recording.finish(game)
+
+    replayed = replay.play(Recording.decode(recording.encode()))
+    assert replay.matches(recording, replayed)
+    assert replayed.moves == game.moves > 0
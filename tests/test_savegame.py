@@ -0,0 +1,80 @@
+import pytest
+
+import savegame
+
+
+@pytest.fixture
+def writer():
+    writer = savegame.CheckpointWriter()
+    writer.start()
+    yield writer
+    writer.close()
+
+
+# 在新的一局中取走 count 个可以点击的图案，同时记入存档
+def play(save, game, count):
+    for _ in range(count):
+        position = game.available_tiles()[0]
+        assert game.pick(*position)
+        save.add(savegame.PICK, position)
+
+
+def test_checkpoints_round_trip(tmp_path, writer):
+    path = str(tmp_path / "current.sav")
+    save = savegame.SaveGame(path, writer, 42, "hard", 3, 7, True)
+    save.start()
+    game = save.new_game()
+    play(save, game, 3)
+    save.checkpoint(1500)
+    game.undo()
+    save.add(savegame.UNDO)
+    play(save, game, 2)
+    save.checkpoint(4200)
+    writer.flush()
+
+    loaded, restored = savegame.load(path, writer)
+    assert (loaded.seed, loaded.difficulty, loaded.layers, loaded.num_patterns, loaded.solvable) == \
+        (42, "hard", 3, 7, True)
+    assert (restored.boards == game.boards).all()
+    assert list(restored.slot) == list(game.slot)
+    assert (restored.score, restored.moves, restored.elapsed) == (game.score, game.moves, 4200)
+    assert restored.history == game.history
+
+
+def test_partial_checkpoint_is_ignored(tmp_path, writer):
+    path = str(tmp_path / "current.sav")
+    save = savegame.SaveGame(path, writer, 5, "easy", 2, 5, False)
+    save.start()
+    game = save.new_game()
+    play(save, game, 2)
+    save.checkpoint(800)
+    writer.flush()
+    with open(path, "ab") as file:
+        file.write(bytes([10, 1]))  # 断电时只写了一半的帧
+
+    _, restored = savegame.load(path, writer)
+    assert restored.moves == 2
+    assert restored.elapsed == 800
+
+
+def test_discard_deletes_the_save(tmp_path, writer):
+    path = tmp_path / "current.sav"
+    save = savegame.SaveGame(str(path), writer, 5, "easy", 2, 5, False)
+    save.start()
+    writer.flush()
+    assert path.exists()
+    save.discard()
+    writer.flush()
+    assert not path.exists()
+
+
+def test_close_writes_queued_checkpoints(tmp_path):
+    path = str(tmp_path / "current.sav")
+    writer = savegame.CheckpointWriter()
+    writer.start()
+    save = savegame.SaveGame(path, writer, 9, "hell", 4, 5, False)
+    save.start()
+    save.checkpoint(100)
+    writer.close()
+    _, restored = savegame.load(path, writer)
+    assert restored.elapsed == 100
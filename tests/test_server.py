@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from server import GameServer
+
+
+# 在随机端口上启动服务器，依次发送 lines，返回收到的所有回复（直到服务器断开或超时）
+async def exchange(server, lines):
+    server.loop = asyncio.get_running_loop()
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for line in lines:
+            writer.write(line)
+        await writer.drain()
+        replies = []
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 2)
+                if not line:
+                    break
+                replies.append(json.loads(line))
+                if len(replies) == len(lines):
+                    break
+        finally:
+            writer.close()
+    return replies
+
+
+def test_new_session_and_click():
+    server = GameServer()
+    new, click = asyncio.run(exchange(server, [
+        b'{"op": "new", "difficulty": "easy", "seed": 1, "id": 7}\n',
+        b'{"op": "click", "session": 1, "tile": [1, 0, 0]}\n',
+    ]))
+    assert new["ok"] and new["id"] == 7 and new["layers"] == 2
+    assert click["ok"] and click["picked"]
+    assert not server.sessions  # 连接断开时释放会话
+
+
+def test_bad_request_gets_an_error_reply():
+    replies = asyncio.run(exchange(GameServer(), [b'{"op": "jump"}\n', b"not json\n"]))
+    assert [reply["ok"] for reply in replies] == [False, False]
+
+
+def test_overlong_line_gets_an_error_reply_and_closes():
+    server = GameServer()
+    replies = asyncio.run(exchange(server, [b'{"op": "new", "pad": "' + b"x" * 70000 + b'"}\n',
+                                            b'{"op": "stats"}\n']))
+    assert replies == [{"ok": False, "error": "请求过长"}]
@@ -0,0 +1,35 @@
+import time
+
+from core import DIFFICULTIES, Game
+from generator import make_boards
+from solver import Solver
+
+
+def test_step_finds_a_valid_solution():
+    layers = DIFFICULTIES["hard"]
+    game = Game(layers, seed=4, boards=make_boards(layers, 4, True))
+    solver = Solver(game)
+    assert solver.step()
+    for position in solver.moves():
+        assert game.pick(*position)
+    assert game.remaining == 0
+
+
+# 游戏中每帧只搜索 max_ms 毫秒：剪枝、回溯多的局面也不能超出太多。
+# 偶尔有一次调用被系统调度打断，所以检查中位数和 90% 分位数而不是最大值
+def test_step_respects_its_time_budget():
+    layers = DIFFICULTIES["purgatory"]
+    budget_ms = 1.0
+    durations = []
+    for seed in range(5):
+        solver = Solver(Game(layers, seed=seed, boards=make_boards(layers, seed, True)))
+        for _ in range(200):
+            start = time.perf_counter()
+            done = solver.step(max_ms=budget_ms)
+            durations.append((time.perf_counter() - start) * 1000)
+            if done:
+                break
+    assert len(durations) > 5  # 搜索确实被分成了多帧
+    durations.sort()
+    assert durations[len(durations) // 2] < budget_ms + 0.5
+    assert durations[len(durations) * 9 // 10] < budget_ms + 1.0
@@ -0,0 +1,57 @@
+import numpy as np
+
+from core import Game
+from telemetry import GameTracker, Telemetry, aggregate, list_files
+
+
+# 单层、一行的游戏板，槽只能放两个图案
+def small_game():
+    return Game(1, rows=1, cols=5, slot_capacity=2, boards=np.array([[[0, 1, 2, 3, 4]]]))
+
+
+def test_aggregate_summarises_tracked_games(tmp_path):
+    telemetry = Telemetry(str(tmp_path))
+    telemetry.start()
+
+    declined = small_game()
+    tracker = GameTracker(telemetry, "easy", declined)
+    for col in range(3):
+        declined.advance(250)
+        declined.pick(0, 0, col)
+        tracker.moved(declined)
+    tracker.revived(False)
+    declined.revive(False)
+    tracker.ended(declined)
+
+    quit_game = small_game()
+    tracker = GameTracker(telemetry, "easy", quit_game, resumed=True)
+    quit_game.advance(1200)
+    quit_game.pick(0, 0, 4)
+    tracker.moved(quit_game)
+    tracker.ended(quit_game)
+
+    GameTracker(telemetry, "hell", small_game())  # 没有结束事件的局只计入开始
+    telemetry.close()
+
+    events, summary = aggregate(list_files(str(tmp_path)))
+    assert events == 10
+    assert telemetry.dropped == 0
+    easy = summary["easy"]
+    assert (easy["games"], easy["resumed"], easy["ended"]) == (1, 1, 2)
+    assert easy["results"] == {"declined": 1, "quit": 1}
+    assert easy["win_rate"] == 0.0
+    assert (easy["revive_offers"], easy["revive_accept_rate"]) == (1, 0.0)
+    assert easy["loss_patterns"] == {2: 1}
+    assert easy["slot_histogram"] == {1: 2, 2: 1, 3: 1}
+    assert easy["move_ms_p50"] == 300
+    assert summary["hell"]["games"] == 1 and summary["hell"]["ended"] == 0
+
+
+def test_full_buffer_drops_events(tmp_path):
+    telemetry = Telemetry(str(tmp_path), capacity=4)
+    for i in range(6):
+        telemetry.emit("m", 1, i, 0, False)
+    assert (telemetry.emitted, telemetry.dropped) == (4, 2)
+    telemetry.close()
+    events, _ = aggregate(list_files(str(tmp_path)))
+    assert events == 4
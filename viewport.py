@@ -0,0 +1,89 @@
+# 分辨率无关的绘制：界面按固定的逻辑尺寸（700x850）布局，窗口可以是任意大小（可调整大小或全屏）。
+# 逻辑坐标按统一的缩放比例换算为窗口像素，宽高比不同时两侧或上下留边。
+# 图片和文字按当前比例从原图重新缩放、按实际字号渲染后直接画到窗口上，不需要每帧把整个画面放大一次
+import math
+
+import numpy as np
+import pygame
+
+
+class Viewport:
+    # unit：缩放比例取整到 unit 个逻辑像素恰好对应整数个窗口像素（取图块大小），相邻图块之间不会出现缝隙或重叠
+    def __init__(self, logical_size, unit=1):
+        self.logical_size = logical_size
+        self.unit = unit
+        self.surface = None  # 窗口的显示表面
+        self.window_size = (0, 0)
+        self.scale = 1.0
+        self.origin = (0, 0)  # 逻辑区域左上角在窗口中的位置
+
+    # 窗口创建、调整大小或切换全屏之后调用，返回缩放比例是否发生变化（需要重新缩放图片）
+    def resize(self, surface):
+        self.surface = surface
+        self.window_size = width, height = surface.get_size()
+        logical_width, logical_height = self.logical_size
+        scale = min(width / logical_width, height / logical_height)
+        scale = max(int(scale * self.unit), 1) / self.unit
+        self.origin = ((width - round(logical_width * scale)) // 2, (height - round(logical_height * scale)) // 2)
+        changed = scale != self.scale
+        self.scale = scale
+        return changed
+
+    # 逻辑尺寸对应的窗口像素尺寸，用于缩放图片
+    def scaled_size(self, width, height):
+        return max(round(width * self.scale), 1), max(round(height * self.scale), 1)
+
+    # 逻辑字号对应的实际字号
+    def font_size(self, size):
+        return max(round(size * self.scale), 1)
+
+    # 逻辑坐标 -> 窗口像素
+    def point(self, pos):
+        return self.origin[0] + round(pos[0] * self.scale), self.origin[1] + round(pos[1] * self.scale)
+
+    # 逻辑矩形 -> 窗口矩形；按四条边分别换算，相邻的矩形换算后仍然恰好相接
+    def rect(self, rect):
+        x, y, w, h = rect
+        left, top = self.point((x, y))
+        right, bottom = self.point((x + w, y + h))
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    # 一次换算多个同样大小的逻辑矩形，xs 和 ys 为 numpy 数组（取整方式与 rect 相同）
+    def rects(self, xs, ys, width, height):
+        lefts = (self.origin[0] + np.rint(xs * self.scale)).astype(int).tolist()
+        tops = (self.origin[1] + np.rint(ys * self.scale)).astype(int).tolist()
+        rights = (self.origin[0] + np.rint((xs + width) * self.scale)).astype(int).tolist()
+        bottoms = (self.origin[1] + np.rint((ys + height) * self.scale)).astype(int).tolist()
+        return [pygame.Rect(left, top, right - left, bottom - top)
+                for left, top, right, bottom in zip(lefts, tops, rights, bottoms)]
+
+    # 窗口像素 -> 逻辑坐标（鼠标事件），留边区域换算为逻辑区域之外的坐标
+    def to_logical(self, pos):
+        return (math.floor((pos[0] - self.origin[0]) / self.scale),
+                math.floor((pos[1] - self.origin[1]) / self.scale))
+
+    # 以下绘制函数的位置都是逻辑坐标，返回窗口中被修改的矩形
+
+    # 绘制已经按当前比例缩放好的图片或文字
+    def blit(self, source, pos):
+        return self.surface.blit(source, self.point(pos))
+
+    # 一次绘制多张图片，xs 和 ys 为逻辑坐标的 numpy 数组（取整方式与 point 相同）
+    def blits(self, sources, xs, ys):
+        xs = (self.origin[0] + np.rint(xs * self.scale)).astype(int).tolist()
+        ys = (self.origin[1] + np.rint(ys * self.scale)).astype(int).tolist()
+        self.surface.blits(zip(sources, zip(xs, ys)), doreturn=False)
+
+    # 水平居中于逻辑坐标 center_x
+    def blit_centered(self, source, center_x, y):
+        x, y = self.point((center_x, y))
+        return self.surface.blit(source, (x - source.get_width() // 2, y))
+
+    # rect 为 None 时填充整个窗口（包括留边）
+    def fill(self, color, rect=None):
+        return self.surface.fill(color, None if rect is None else self.rect(rect))
+
+    def draw_rect(self, color, rect, width=0):
+        if width:
+            width = max(round(width * self.scale), 1)
+        return pygame.draw.rect(self.surface, color, self.rect(rect), width)
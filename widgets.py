@@ -0,0 +1,72 @@
+# 界面控件：按钮由鼠标事件驱动，不在绘制时轮询鼠标状态，也不阻塞等待。
+# 按下和松开都在按钮上才算一次点击，按住不放不会重复触发；悬停状态变化时才重绘该按钮。
+# 按钮的位置和事件坐标都是逻辑坐标，绘制时由 Viewport 换算为窗口像素
+import pygame
+
+
+class Button:
+    # label 返回按当前缩放比例渲染好的文字（由文字缓存缓存），action 在点击完成（松开鼠标）时调用
+    def __init__(self, rect, label, inactive_color, active_color, action=None):
+        self.rect = pygame.Rect(rect)
+        self.label = label
+        self.inactive_color = inactive_color
+        self.active_color = active_color
+        self.action = action
+        self.hover = False
+        self.pressed = False  # 鼠标在按钮上按下、尚未松开
+        self.dirty = True
+
+    # 绘制到 Viewport 上，返回窗口中的矩形
+    def draw(self, screen):
+        color = self.active_color if self.hover else self.inactive_color
+        rect = screen.draw_rect(color, self.rect)
+        label = self.label()
+        screen.surface.blit(label, label.get_rect(center=rect.center))
+        self.dirty = False
+        return rect
+
+    # 处理一个事件，返回事件是否由按钮消费
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            self.set_hover(self.rect.collidepoint(event.pos))
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.set_hover(self.rect.collidepoint(event.pos))
+            self.pressed = self.hover
+            return self.pressed
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            clicked = self.pressed and self.rect.collidepoint(event.pos)
+            self.pressed = False
+            if clicked and self.action is not None:
+                self.action()
+            return clicked
+        return False
+
+    def set_hover(self, hover):
+        if hover != self.hover:
+            self.hover = hover
+            self.dirty = True
+
+
+class WidgetGroup:
+    # 一个界面上的所有控件，统一分发事件和重绘
+    def __init__(self, widgets=()):
+        self.widgets = list(widgets)
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    # 进入界面时按当前鼠标位置初始化悬停状态
+    def sync_hover(self, pos):
+        for widget in self.widgets:
+            widget.set_hover(widget.rect.collidepoint(pos))
+
+    def handle_event(self, event):
+        for widget in self.widgets:
+            if widget.handle_event(event):
+                return True
+        return False
+
+    # 绘制需要重绘的控件（force 为 True 时全部重绘），返回绘制过的窗口矩形
+    def draw(self, screen, force=False):
+        return [widget.draw(screen) for widget in self.widgets if force or widget.dirty]